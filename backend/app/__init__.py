@@ -18,15 +18,47 @@ def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
     
+    from app.utils.db_pool import configure_engine_options
+    configure_engine_options(app)
+    
     db.init_app(app)
     jwt.init_app(app)
     
+    from app.utils.json_provider import configure_json_provider
+    configure_json_provider(app)
+    
     CORS(app, 
          origins=app.config.get('CORS_ORIGINS', ['http://localhost:4200']),
          methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'],
          allow_headers=['Content-Type', 'Authorization'],
          supports_credentials=True)
     
+    from app.models.user import User
+    from app.utils.user_cache import init_user_cache, register_invalidation_hooks
+    init_user_cache(app)
+    register_invalidation_hooks(User)
+    
+    from app.utils.hashing_executor import hashing_executor
+    hashing_executor.init_app(app)
+    
+    from app.utils.security import configure_password_hashing
+    configure_password_hashing(app)
+    
+    from app.utils.login_attempts import login_tracker
+    login_tracker.init_app(app)
+    
+    from app.utils.task_events import task_events
+    task_events.init_app(app)
+    
+    from app.utils.health import db_probe
+    db_probe.init_app(app)
+    
+    from app.utils.metrics import metrics
+    metrics.init_app(app)
+    
+    from app.utils.sql_profiler import sql_profiler
+    sql_profiler.init_app(app)
+    
     from app.middleware.security_headers import setup_security_headers
     setup_security_headers(app)
     
@@ -39,29 +71,13 @@ def create_app(config_class=Config):
     
     from app.routes.auth import auth_bp
     from app.routes.tasks import tasks_bp
+    from app.routes.health import health_bp
+    from app.routes.metrics import metrics_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(tasks_bp, url_prefix='/api/tasks')
-    
-    @app.route('/health')
-    def health_check():
-        try:
-            # Testa conexão à base de dados
-            db.session.execute(db.text('SELECT 1'))
-            return {
-                'status': 'healthy',
-                'database': 'connected',
-                'message': 'API operacional'
-            }, 200
-        except Exception as e:
-            return {
-                'status': 'unhealthy',
-                'database': 'disconnected',
-                'error': str(e)
-            }, 503
-    
-    with app.app_context():
-        db.create_all()
+    app.register_blueprint(health_bp)
+    app.register_blueprint(metrics_bp)
     
     return app
 
@@ -10,7 +10,9 @@ class HTTPStatus(IntEnum):
     FORBIDDEN = 403
     NOT_FOUND = 404
     CONFLICT = 409
+    PAYLOAD_TOO_LARGE = 413
     UNPROCESSABLE_ENTITY = 422
     TOO_MANY_REQUESTS = 429
     INTERNAL_SERVER_ERROR = 500
+    SERVICE_UNAVAILABLE = 503
 
@@ -5,7 +5,9 @@ from app.exceptions.custom_exceptions import (
     AuthorizationException,
     ResourceNotFoundException,
     ResourceAlreadyExistsException,
-    DatabaseException
+    DatabaseException,
+    RateLimitExceededException,
+    ServiceUnavailableException
 )
 
 __all__ = [
@@ -15,6 +17,8 @@ __all__ = [
     'AuthorizationException',
     'ResourceNotFoundException',
     'ResourceAlreadyExistsException',
-    'DatabaseException'
+    'DatabaseException',
+    'RateLimitExceededException',
+    'ServiceUnavailableException'
 ]
 
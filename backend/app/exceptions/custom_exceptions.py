@@ -86,3 +86,28 @@ class DatabaseException(AppException):
             details=details
         )
 
+class RateLimitExceededException(AppException):
+    """Exceção para pedidos rejeitados por excesso de carga ou de pedidos"""
+    def __init__(self, message: str = "Demasiados pedidos. Tente novamente mais tarde", details: dict = None):
+        super().__init__(
+            message=message,
+            error_code=ErrorCode.RATE_LIMIT_EXCEEDED,
+            status_code=HTTPStatus.TOO_MANY_REQUESTS,
+            details=details
+        )
+
+class ServiceUnavailableException(AppException):
+    """Exceção para pedidos rejeitados por falta de capacidade momentânea (503)"""
+    def __init__(
+        self,
+        message: str = "Serviço temporariamente indisponível. Tente novamente mais tarde",
+        details: dict = None,
+        retry_after: int = None
+    ):
+        super().__init__(
+            message=message,
+            error_code=ErrorCode.SERVICE_UNAVAILABLE,
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            details=details
+        )
+        self.retry_after = retry_after
@@ -2,22 +2,23 @@ from flask import jsonify
 from app.exceptions.custom_exceptions import AppException
 from app.enums.error_codes import ErrorCode
 from app.enums.http_status import HTTPStatus
+from app.utils.metrics import metrics
+from app.utils.validators import format_validation_errors
 from pydantic import ValidationError
 
 def register_error_handlers(app):
     @app.errorhandler(AppException)
     def handle_app_exception(e: AppException):
-        return jsonify(e.to_dict()), e.status_code.value
+        metrics.record_error(e.error_code.value)
+        response = jsonify(e.to_dict())
+        if getattr(e, 'retry_after', None) is not None:
+            response.headers['Retry-After'] = str(e.retry_after)
+        return response, e.status_code.value
     
     @app.errorhandler(ValidationError)
     def handle_validation_error(e: ValidationError):
-        errors = []
-        for error in e.errors():
-            errors.append({
-                'loc': list(error.get('loc', [])),
-                'msg': str(error.get('msg', '')),
-                'type': str(error.get('type', ''))
-            })
+        errors = format_validation_errors(e)
+        metrics.record_error(ErrorCode.VALIDATION_ERROR.value)
         
         return jsonify({
             'message': 'Dados inválidos',
@@ -28,14 +29,26 @@ def register_error_handlers(app):
     
     @app.errorhandler(404)
     def handle_not_found(e):
+        metrics.record_error(ErrorCode.RESOURCE_NOT_FOUND.value)
         return jsonify({
             'message': 'Rota não encontrada',
             'error_code': ErrorCode.RESOURCE_NOT_FOUND.value,
             'status_code': HTTPStatus.NOT_FOUND.value
         }), HTTPStatus.NOT_FOUND.value
     
+    @app.errorhandler(413)
+    def handle_payload_too_large(e):
+        metrics.record_error(ErrorCode.PAYLOAD_TOO_LARGE.value)
+        return jsonify({
+            'message': 'Pedido demasiado grande',
+            'error_code': ErrorCode.PAYLOAD_TOO_LARGE.value,
+            'status_code': HTTPStatus.PAYLOAD_TOO_LARGE.value,
+            'details': {'max_content_length': app.config.get('MAX_CONTENT_LENGTH')}
+        }), HTTPStatus.PAYLOAD_TOO_LARGE.value
+    
     @app.errorhandler(500)
     def handle_internal_error(e):
+        metrics.record_error(ErrorCode.INTERNAL_SERVER_ERROR.value)
         return jsonify({
             'message': 'Erro interno do servidor',
             'error_code': ErrorCode.INTERNAL_SERVER_ERROR.value,
@@ -50,6 +63,7 @@ def register_error_handlers(app):
         # Log do erro completo no console
         app.logger.error(f"Exceção não tratada: {str(e)}")
         app.logger.error(traceback.format_exc())
+        metrics.record_error(ErrorCode.INTERNAL_SERVER_ERROR.value)
         
         # Em desenvolvimento, mostrar detalhes do erro
         response_data = {
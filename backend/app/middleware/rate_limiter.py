@@ -1,20 +1,451 @@
 """Rate Limiting middleware (opcional)"""
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from flask import request
+import hashlib
+import math
+import mmap
+import multiprocessing
+import os
+import re
+import socket
+import struct
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import wraps
+from typing import List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from flask import request, g, current_app
+from app.exceptions.custom_exceptions import RateLimitExceededException
+
+_PERIODS = {
+    'second': 1,
+    'minute': 60,
+    'hour': 3600,
+    'day': 86400
+}
+
+_LIMIT_PATTERN = re.compile(r'^\s*(\d+)\s*(?:per|/)\s*(\d+\s*)?(second|minute|hour|day)s?\s*$', re.IGNORECASE)
+
+def parse_limits(value: str) -> List[Tuple[int, int, str]]:
+    """
+    Converte uma string de limites em tuplos (pedidos, janela em segundos, texto)
+    
+    Aceita formatos como "100 per hour", "10/minute" ou "5 per 10 seconds",
+    separados por ';' para combinar vários limites.
+    
+    Raises:
+        ValueError: Se algum limite for inválido
+    """
+    limits = []
+    for part in value.split(';'):
+        if not part.strip():
+            continue
+        match = _LIMIT_PATTERN.match(part)
+        if not match:
+            raise ValueError(f"Limite inválido: {part.strip()}")
+        amount, multiplier, period = match.groups()
+        window = int(multiplier or 1) * _PERIODS[period.lower()]
+        limits.append((int(amount), window, part.strip()))
+    return limits
+
+class RateLimitStorage(ABC):
+    """
+    Interface de armazenamento dos contadores do rate limiter
+    
+    Os contadores são por chave e janela fixa; o limitador combina a janela
+    atual com a anterior (sliding window counter).
+    """
+    
+    @abstractmethod
+    def incr_and_get(self, key: str, previous_key: str, expiry: float) -> Tuple[int, int]:
+        """
+        Incrementa atomicamente key e devolve (valor de key, valor de previous_key)
+        
+        Args:
+            key: Contador da janela atual
+            previous_key: Contador da janela anterior
+            expiry: Tempo de vida do contador em segundos
+        """
+    
+    @abstractmethod
+    def decr(self, key: str) -> None:
+        """Desfaz um incremento de key"""
+    
+    @abstractmethod
+    def reset(self) -> None:
+        """Remove todos os contadores"""
+
+class MemoryRateLimitStorage(RateLimitStorage):
+    """Contadores na memória do processo (um conjunto por worker)"""
+    
+    def __init__(self, sweep_interval: float = 60):
+        self._counters = {}
+        self._lock = threading.Lock()
+        self._sweep_interval = sweep_interval
+        self._next_sweep = 0.0
+    
+    def _get(self, key: str, now: float) -> int:
+        entry = self._counters.get(key)
+        if entry is None or entry[1] <= now:
+            return 0
+        return entry[0]
+    
+    def incr_and_get(self, key: str, previous_key: str, expiry: float) -> Tuple[int, int]:
+        now = time.time()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._counters = {k: v for k, v in self._counters.items() if v[1] > now}
+                self._next_sweep = now + self._sweep_interval
+            
+            value = self._get(key, now) + 1
+            self._counters[key] = (value, now + expiry)
+            return value, self._get(previous_key, now)
+    
+    def decr(self, key: str) -> None:
+        with self._lock:
+            entry = self._counters.get(key)
+            if entry is not None:
+                self._counters[key] = (max(0, entry[0] - 1), entry[1])
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+
+class SharedMemoryRateLimitStorage(RateLimitStorage):
+    """
+    Contadores numa região de memória partilhada entre workers
+    
+    A região (mmap anónimo) e o lock são criados no processo principal; com
+    preload_app=True os workers do Gunicorn herdam-nos no fork e partilham
+    os mesmos contadores. Sem preload cada worker teria a sua região, pelo
+    que o gunicorn.conf.py substitui shm:// por memory:// com um aviso.
+    
+    É uma tabela de hash de tamanho fixo com sondagem linear; quando uma
+    vizinhança está cheia, é reutilizado o contador que expira primeiro.
+    """
+    
+    _SLOT = struct.Struct('=QdI4x')
+    _PROBES = 8
+    
+    def __init__(self, slots: int = 65536):
+        self.slots = slots
+        self._buffer = mmap.mmap(-1, slots * self._SLOT.size)
+        self._lock = multiprocessing.Lock()
+    
+    @staticmethod
+    def _hash(key: str) -> int:
+        # 0 indica slot vazio
+        return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little') or 1
+    
+    def _find(self, key_hash: int, now: float, create: bool) -> Optional[int]:
+        start = key_hash % self.slots
+        free = None
+        oldest = None
+        oldest_expiry = math.inf
+        for probe in range(self._PROBES):
+            index = (start + probe) % self.slots
+            slot_hash, expires_at, _ = self._SLOT.unpack_from(self._buffer, index * self._SLOT.size)
+            if slot_hash == key_hash and expires_at > now:
+                return index
+            if not create:
+                continue
+            if slot_hash == 0 or expires_at <= now:
+                if free is None:
+                    free = index
+            elif expires_at < oldest_expiry:
+                oldest, oldest_expiry = index, expires_at
+        return free if free is not None else oldest
+    
+    def _read(self, index: Optional[int]) -> int:
+        if index is None:
+            return 0
+        return self._SLOT.unpack_from(self._buffer, index * self._SLOT.size)[2]
+    
+    def incr_and_get(self, key: str, previous_key: str, expiry: float) -> Tuple[int, int]:
+        now = time.time()
+        key_hash = self._hash(key)
+        with self._lock:
+            index = self._find(key_hash, now, create=True)
+            slot_hash, expires_at, value = self._SLOT.unpack_from(self._buffer, index * self._SLOT.size)
+            if slot_hash != key_hash or expires_at <= now:
+                value = 0
+            value += 1
+            self._SLOT.pack_into(self._buffer, index * self._SLOT.size, key_hash, now + expiry, value)
+            previous = self._read(self._find(self._hash(previous_key), now, create=False))
+        return value, previous
+    
+    def decr(self, key: str) -> None:
+        now = time.time()
+        key_hash = self._hash(key)
+        with self._lock:
+            index = self._find(key_hash, now, create=False)
+            if index is not None:
+                _, expires_at, value = self._SLOT.unpack_from(self._buffer, index * self._SLOT.size)
+                self._SLOT.pack_into(self._buffer, index * self._SLOT.size, key_hash, expires_at, max(0, value - 1))
+    
+    def reset(self) -> None:
+        with self._lock:
+            self._buffer[:] = bytes(len(self._buffer))
+
+class RedisProtocolError(Exception):
+    """Erro devolvido pelo servidor Redis"""
+
+class RedisRateLimitStorage(RateLimitStorage):
+    """
+    Contadores num servidor compatível com o protocolo Redis (RESP)
+    
+    Fala diretamente o protocolo através de um socket, sem dependências
+    adicionais. O incremento e a leitura da janela anterior são feitos numa
+    transação MULTI/EXEC.
+    """
+    
+    def __init__(self, host: str = 'localhost', port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, timeout: float = 1.0):
+        self.host = host
+        self.port = port
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self._local = threading.local()
+    
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+            conn = (sock, sock.makefile('rb'))
+            handshake = []
+            if self.password:
+                handshake.append(('AUTH', self.password))
+            if self.db:
+                handshake.append(('SELECT', self.db))
+            try:
+                if handshake:
+                    self._send(conn, handshake)
+            except Exception:
+                conn[1].close()
+                conn[0].close()
+                raise
+            # Só fica em cache depois de o AUTH/SELECT ter sucesso
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def _close(self) -> None:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn[1].close()
+            conn[0].close()
+        self._local.conn = None
+    
+    @staticmethod
+    def _encode(command) -> bytes:
+        parts = [f'*{len(command)}\r\n'.encode()]
+        for arg in command:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            parts.append(f'${len(data)}\r\n'.encode() + data + b'\r\n')
+        return b''.join(parts)
+    
+    def _read_reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Ligação ao servidor Redis fechada")
+        prefix, payload = line[:1], line[1:-2]
+        if prefix == b'+':
+            return payload.decode()
+        if prefix == b'-':
+            raise RedisProtocolError(payload.decode())
+        if prefix == b':':
+            return int(payload)
+        if prefix == b'$':
+            length = int(payload)
+            if length == -1:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if prefix == b'*':
+            length = int(payload)
+            if length == -1:
+                return None
+            return [self._read_reply(reader) for _ in range(length)]
+        raise RedisProtocolError(f"Resposta inválida: {line!r}")
+    
+    def _send(self, conn, commands):
+        sock, reader = conn
+        sock.sendall(b''.join(self._encode(command) for command in commands))
+        return [self._read_reply(reader) for _ in commands]
+    
+    def _execute(self, commands):
+        """Envia os comandos em pipeline e devolve as respostas"""
+        conn = self._connection()
+        try:
+            return self._send(conn, commands)
+        except (OSError, ConnectionError, RedisProtocolError):
+            # Após um erro podem ficar respostas por ler: a ligação é descartada
+            self._close()
+            raise
+    
+    def incr_and_get(self, key: str, previous_key: str, expiry: float) -> Tuple[int, int]:
+        replies = self._execute([
+            ('MULTI',),
+            ('INCR', key),
+            ('PEXPIRE', key, int(expiry * 1000)),
+            ('GET', previous_key),
+            ('EXEC',)
+        ])
+        value, _, previous = replies[-1]
+        return int(value), int(previous or 0)
+    
+    def decr(self, key: str) -> None:
+        self._execute([('DECR', key)])
+    
+    def reset(self) -> None:
+        self._execute([('FLUSHDB',)])
+
+def create_storage(uri: str) -> RateLimitStorage:
+    """
+    Cria o armazenamento a partir de um URI
+    
+    - memory:// - por processo
+    - shm://?slots=65536 - memória partilhada entre workers
+    - redis://[:password@]host:port/db - servidor Redis (ou compatível)
+    """
+    parsed = urlparse(uri)
+    if parsed.scheme == 'memory':
+        return MemoryRateLimitStorage()
+    if parsed.scheme == 'shm':
+        slots = int(parse_qs(parsed.query).get('slots', ['65536'])[0])
+        return SharedMemoryRateLimitStorage(slots=slots)
+    if parsed.scheme == 'redis':
+        return RedisRateLimitStorage(
+            host=parsed.hostname or 'localhost',
+            port=parsed.port or 6379,
+            db=int(parsed.path.lstrip('/') or 0),
+            password=parsed.password
+        )
+    raise ValueError(f"Armazenamento de rate limiting inválido: {uri}")
+
+class RateLimiter:
+    """
+    Rate limiter com janela deslizante (sliding window counter)
+    
+    Estima os pedidos no último período combinando o contador da janela
+    fixa atual com uma fração do contador da janela anterior, o que exige
+    apenas dois contadores por chave e limite.
+    """
+    
+    def __init__(self, app=None):
+        self.app = None
+        self.storage: Optional[RateLimitStorage] = None
+        self.default_limits: List[Tuple[int, int, str]] = []
+        if app is not None:
+            self.init_app(app)
+    
+    def init_app(self, app) -> None:
+        self.app = app
+        self.storage = create_storage(app.config.get('RATELIMIT_STORAGE_URI', 'memory://'))
+        self.default_limits = parse_limits(app.config.get('RATELIMIT_DEFAULT', '100 per hour'))
+        self.headers_enabled = app.config.get('RATELIMIT_HEADERS_ENABLED', True)
+        app.extensions['rate_limiter'] = self
+        
+        app.before_request(self._check_request)
+    
+    def _identity(self) -> str:
+        return request.remote_addr or 'unknown'
+    
+    def hit(self, key: str, amount: int, window: int) -> Tuple[bool, int, int]:
+        """
+        Regista um pedido para a chave
+        
+        Returns:
+            tuple: (permitido, pedidos restantes, instante epoch de reposição)
+        """
+        return self._hit(key, amount, window)[:3]
+    
+    def _hit(self, key: str, amount: int, window: int) -> Tuple[bool, int, int, str]:
+        """Como hit, devolvendo também o contador incrementado (se o pedido for permitido)"""
+        now = time.time()
+        window_index = int(now // window)
+        current_key = f'rl:{key}:{window}:{window_index}'
+        previous_key = f'rl:{key}:{window}:{window_index - 1}'
+        
+        current, previous = self.storage.incr_and_get(current_key, previous_key, window * 2)
+        elapsed_fraction = (now % window) / window
+        estimated = previous * (1 - elapsed_fraction) + current
+        reset_at = int((window_index + 1) * window)
+        
+        if estimated > amount:
+            # O pedido rejeitado não conta para o limite
+            self.storage.decr(current_key)
+            return False, 0, reset_at, current_key
+        
+        return True, max(0, int(amount - estimated)), reset_at, current_key
+    
+    def check(self, limits: List[Tuple[int, int, str]], scope: str) -> None:
+        """
+        Aplica os limites ao pedido atual
+        
+        Se um limite rejeitar o pedido, os incrementos já feitos nos limites
+        anteriores são desfeitos: pedidos rejeitados não gastam a quota.
+        
+        Raises:
+            RateLimitExceededException: Se algum limite for excedido
+        """
+        identity = self._identity()
+        tightest = None
+        counted = []
+        for amount, window, text in limits:
+            try:
+                allowed, remaining, reset_at, counter = self._hit(f'{scope}:{identity}:{text}', amount, window)
+                if not allowed:
+                    for previous_counter in counted:
+                        self.storage.decr(previous_counter)
+            except (OSError, ConnectionError, RedisProtocolError) as e:
+                # Falha do armazenamento não deve bloquear a API
+                current_app.logger.warning(f"Rate limiter indisponível: {e}")
+                return
+            
+            state = (amount, remaining, reset_at)
+            if tightest is None or remaining < tightest[1]:
+                tightest = state
+            
+            if allowed:
+                counted.append(counter)
+            else:
+                g._rate_limit_state = state
+                raise RateLimitExceededException(
+                    message=f"Limite de pedidos excedido: {text}",
+                    details={"limit": text, "retry_after": max(0, reset_at - int(time.time()))}
+                )
+        
+        g._rate_limit_state = tightest
+    
+    def _check_request(self):
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, '_rate_limit_exempt', False):
+            return None
+        
+        limits = getattr(view, '_rate_limits', None) or self.default_limits
+        self.check(limits, request.endpoint)
+        return None
 
 def setup_rate_limiter(app):
     """Configura rate limiting na aplicação"""
-    limiter = Limiter(
-        app=app,
-        key_func=get_remote_address,
-        default_limits=["100 per hour"],
-        storage_uri="memory://"
-    )
+    limiter = RateLimiter(app)
     
     @app.after_request
     def add_rate_limit_headers(response):
         """Adiciona headers de rate limiting nas respostas"""
+        state = g.get('_rate_limit_state')
+        if state is not None and limiter.headers_enabled:
+            amount, remaining, reset_at = state
+            response.headers['X-RateLimit-Limit'] = str(amount)
+            response.headers['X-RateLimit-Remaining'] = str(remaining)
+            response.headers['X-RateLimit-Reset'] = str(reset_at)
+            if response.status_code == 429:
+                response.headers['Retry-After'] = str(max(0, reset_at - int(time.time())))
         return response
     
     return limiter
@@ -23,16 +454,23 @@ def rate_limit(limit: str):
     """
     Decorator para aplicar rate limiting
     
+    Substitui os limites por omissão (RATELIMIT_DEFAULT) na rota decorada.
+    Os limites são aplicados pelo RateLimiter antes da execução da rota.
+    
     Args:
         limit: String no formato "100 per hour"
     """
-    from functools import wraps
-    from flask import current_app
+    limits = parse_limits(limit)
     
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
             return f(*args, **kwargs)
+        decorated_function._rate_limits = limits
         return decorated_function
     return decorator
 
+def rate_limit_exempt(f):
+    """Decorator que isenta a rota de rate limiting"""
+    f._rate_limit_exempt = True
+    return f
@@ -1,5 +1,6 @@
 from app.models.user import User
 from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.task_tombstone import TaskTombstone
 
-__all__ = ['User', 'Task']
-
+__all__ = ['User', 'Task', 'TaskCounter', 'TaskTombstone']
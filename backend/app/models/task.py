@@ -1,6 +1,9 @@
 from app import db
 from datetime import datetime, timezone
-from sqlalchemy import Index
+from collections.abc import Mapping
+from sqlalchemy import Index, Row
+
+TASK_COLUMNS = ('id', 'title', 'description', 'completed', 'created_at', 'updated_at', 'user_id')
 
 class Task(db.Model):
     __tablename__ = 'tasks'
@@ -14,22 +17,45 @@ class Task(db.Model):
     
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
     
+    # Versão dos contadores do utilizador (TaskCounter.version) da última
+    # escrita sobre a tarefa; cursor da sincronização incremental (/changes)
+    change_seq = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
     __table_args__ = (
         Index('idx_user_completed_created', 'user_id', 'completed', 'created_at'),
         Index('idx_user_created', 'user_id', 'created_at'),
+        Index('idx_user_change_seq', 'user_id', 'change_seq'),
     )
     
     def __repr__(self):
         return f'<Task {self.title}>'
     
-    def to_dict(self):
+    @staticmethod
+    def serialize(task) -> dict:
+        """
+        Serializa uma tarefa a partir de uma instância, de um dicionário ou de
+        uma linha de resultado (ou tuplo) com as colunas pela ordem de TASK_COLUMNS
+        
+        As linhas são desempacotadas por posição, que é bastante mais rápido
+        do que o acesso por nome.
+        """
+        if isinstance(task, (Row, tuple)):
+            task_id, title, description, completed, created_at, updated_at, user_id = task
+        else:
+            if not isinstance(task, Mapping):
+                task = {column: getattr(task, column) for column in TASK_COLUMNS}
+            task_id, title, description, completed, created_at, updated_at, user_id = (
+                task[column] for column in TASK_COLUMNS
+            )
         return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'completed': self.completed,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
-            'user_id': self.user_id
+            'id': task_id,
+            'title': title,
+            'description': description,
+            'completed': completed,
+            'created_at': created_at.isoformat() if created_at else None,
+            'updated_at': updated_at.isoformat() if updated_at else None,
+            'user_id': user_id
         }
-
+    
+    def to_dict(self):
+        return Task.serialize(self)
@@ -0,0 +1,32 @@
+from app import db
+
+class TaskCounter(db.Model):
+    """Contadores de tarefas por utilizador, mantidos pelo TaskService"""
+    __tablename__ = 'task_counters'
+    
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('users.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    total = db.Column(db.Integer, default=0, nullable=False)
+    completed = db.Column(db.Integer, default=0, nullable=False)
+    # Incrementado em cada escrita sobre as tarefas do utilizador (ETag das listagens)
+    version = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Maior versão das eliminações já removidas (purge): um cursor de /changes
+    # abaixo dela perdeu eliminações e obriga a uma sincronização completa
+    purged_seq = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    def __repr__(self):
+        return f'<TaskCounter user={self.user_id} total={self.total}>'
+    
+    @property
+    def pending(self):
+        return self.total - self.completed
+    
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'completed': self.completed,
+            'pending': self.pending
+        }
@@ -0,0 +1,25 @@
+from app import db
+from datetime import datetime, timezone
+from sqlalchemy import Index
+
+class TaskTombstone(db.Model):
+    """Registo de uma tarefa eliminada, usado pela sincronização incremental"""
+    __tablename__ = 'task_tombstones'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, nullable=False)
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False
+    )
+    deleted_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    # Versão dos contadores do utilizador na eliminação (como Task.change_seq)
+    change_seq = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    __table_args__ = (
+        Index('idx_tombstone_user_seq', 'user_id', 'change_seq'),
+    )
+    
+    def __repr__(self):
+        return f'<TaskTombstone task={self.task_id}>'
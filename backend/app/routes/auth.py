@@ -2,12 +2,14 @@ from flask import Blueprint, request, jsonify
 from app.schemas.user import UserCreate, UserLogin
 from app.services.auth_service import AuthService
 from app.middleware.security_headers import validate_json_content_type
+from app.middleware.rate_limiter import rate_limit
 from app.enums.http_status import HTTPStatus
 from pydantic import ValidationError
 
 auth_bp = Blueprint('auth', __name__)
 
 @auth_bp.route('/register', methods=['POST'])
+@rate_limit("5 per minute;50 per day")
 @validate_json_content_type
 def register():
     try:
@@ -27,6 +29,7 @@ def register():
         raise
 
 @auth_bp.route('/login', methods=['POST'])
+@rate_limit("10 per minute")
 @validate_json_content_type
 def login():
     try:
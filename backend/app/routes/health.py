@@ -0,0 +1,48 @@
+from flask import Blueprint, current_app
+from app import db
+from app.enums.http_status import HTTPStatus
+from app.middleware.rate_limiter import rate_limit_exempt
+from app.utils.health import check_readiness
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/livez')
+@rate_limit_exempt
+def livez():
+    """Liveness: o processo responde (sem acesso à base de dados)"""
+    return {'status': 'alive'}, HTTPStatus.OK.value
+
+@health_bp.route('/readyz')
+@rate_limit_exempt
+def readyz():
+    """Readiness: base de dados acessível (estado em cache) e pool com ligações livres"""
+    ready, details = check_readiness(
+        db.engine,
+        current_app.config.get('HEALTH_POOL_SATURATION_THRESHOLD', 0.9)
+    )
+    status_code = HTTPStatus.OK if ready else HTTPStatus.SERVICE_UNAVAILABLE
+    return {'status': 'ready' if ready else 'not_ready', **details}, status_code.value
+
+@health_bp.route('/health')
+@rate_limit_exempt
+def health_check():
+    """Estado geral (compatibilidade); usa o mesmo estado em cache que /readyz"""
+    _, details = check_readiness(
+        db.engine,
+        current_app.config.get('HEALTH_POOL_SATURATION_THRESHOLD', 0.9)
+    )
+    database = details['database']
+    
+    if database['connected']:
+        return {
+            'status': 'healthy',
+            'database': 'connected',
+            'pool': details['pool'],
+            'message': 'API operacional'
+        }, HTTPStatus.OK.value
+    
+    return {
+        'status': 'unhealthy',
+        'database': 'disconnected',
+        'error': database.get('error')
+    }, HTTPStatus.SERVICE_UNAVAILABLE.value
@@ -0,0 +1,24 @@
+import hmac
+from flask import Blueprint, abort, current_app, request
+from app.enums.http_status import HTTPStatus
+from app.exceptions.custom_exceptions import AuthenticationException
+from app.middleware.rate_limiter import rate_limit_exempt
+from app.utils.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('/metrics')
+@rate_limit_exempt
+def export_metrics():
+    """Métricas no formato Prometheus (agregadas por todos os workers)"""
+    if not metrics.enabled:
+        abort(HTTPStatus.NOT_FOUND.value)
+    
+    token = current_app.config.get('METRICS_TOKEN')
+    if token:
+        provided = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(provided.encode(), f'Bearer {token}'.encode()):
+            raise AuthenticationException("Token de métricas inválido")
+    
+    body, content_type = metrics.render()
+    return current_app.response_class(body, status=HTTPStatus.OK.value, content_type=content_type)
@@ -1,9 +1,18 @@
-from flask import Blueprint, request, jsonify
-from app.schemas.task import TaskCreate, TaskUpdate
+import io
+import time
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+from app import db
+from app.schemas.task import TaskCreate, TaskUpdate, TaskBulkRequest
+from app.models.task import Task
 from app.services.task_service import TaskService
 from app.utils.decorators import require_auth
+from app.utils.task_events import task_events
+from app.utils.task_export import EXPORT_FORMATS, csv_chunks, ndjson_chunks
+from app.utils.task_import import iter_csv_records, iter_ndjson_records, resolve_import_format
+from app.utils.http_cache import compute_etag, apply_cache_headers, not_modified_response
 from app.middleware.security_headers import validate_json_content_type
 from app.enums.http_status import HTTPStatus
+from app.exceptions.custom_exceptions import ValidationException
 from pydantic import ValidationError
 
 tasks_bp = Blueprint('tasks', __name__)
@@ -12,17 +21,54 @@ tasks_bp = Blueprint('tasks', __name__)
 @require_auth
 def list_tasks(current_user):
     try:
+        counter = TaskService.get_tasks_counter(current_user)
+        etag = compute_etag(
+            'tasks',
+            current_user.id,
+            counter.version,
+            sorted(request.args.items(multi=True))
+        )
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         status_filter = request.args.get('status', None)
         
         per_page = min(per_page, 100)
         
-        result = TaskService.get_user_tasks(current_user, page, per_page, status_filter)
+        if 'cursor' in request.args:
+            include_total = request.args.get('include_total', 'false').lower() == 'true'
+            result = TaskService.get_user_tasks_keyset(
+                current_user,
+                cursor=request.args.get('cursor') or None,
+                per_page=per_page,
+                status_filter=status_filter,
+                include_total=include_total
+            )
+            pagination = {
+                'per_page': result['per_page'],
+                'next_cursor': result['next_cursor'],
+                'has_next': result['has_next']
+            }
+            if include_total:
+                pagination['total'] = result['total']
+            
+            response = jsonify({
+                'message': 'Tarefas listadas com sucesso',
+                'tasks': [Task.serialize(task) for task in result['tasks']],
+                'pagination': pagination
+            })
+            return apply_cache_headers(response, etag), HTTPStatus.OK.value
         
-        return jsonify({
+        result = TaskService.get_user_tasks(
+            current_user, page, per_page, status_filter, counts=counter.to_dict()
+        )
+        
+        response = jsonify({
             'message': 'Tarefas listadas com sucesso',
-            'tasks': [task.to_dict() for task in result['tasks']],
+            'tasks': [Task.serialize(task) for task in result['tasks']],
             'pagination': {
                 'total': result['total'],
                 'page': result['page'],
@@ -31,7 +77,8 @@ def list_tasks(current_user):
                 'has_next': result['has_next'],
                 'has_prev': result['has_prev']
             }
-        }), HTTPStatus.OK.value
+        })
+        return apply_cache_headers(response, etag), HTTPStatus.OK.value
     except Exception as e:
         raise
 
@@ -47,9 +94,217 @@ def create_task(current_user):
         
         return jsonify({
             'message': 'Tarefa criada com sucesso',
-            'task': new_task.to_dict()
+            'task': Task.serialize(new_task)
         }), HTTPStatus.CREATED.value
+    
+    except ValidationError as e:
+        raise
+    except Exception as e:
+        raise
+
+@tasks_bp.route('/stream', methods=['GET'])
+@require_auth(locations=['headers', 'query_string'])
+def stream_tasks(current_user):
+    """
+    Stream SSE com os eventos das tarefas do utilizador
+    
+    O token pode ser enviado no header Authorization ou no parâmetro jwt
+    (o EventSource do browser não permite headers). O stream termina ao fim
+    de TASK_EVENTS_MAX_STREAM_SECONDS e o cliente volta a ligar-se; se o
+    cliente não acompanhar os eventos é enviado um evento resync, após o
+    qual deve sincronizar por /changes.
+    """
+    subscription = task_events.subscribe(current_user.id, engine=db.engine)
+    heartbeat = current_app.config.get('TASK_EVENTS_HEARTBEAT', 15)
+    max_seconds = current_app.config.get('TASK_EVENTS_MAX_STREAM_SECONDS', 300)
+    json_provider = current_app.json
+    
+    # O stream não usa a base de dados: devolve já a ligação ao pool
+    db.session.close()
+    
+    def generate():
+        deadline = time.monotonic() + max_seconds
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                
+                task_event = subscription.get(timeout=min(heartbeat, remaining))
+                if subscription.overflowed:
+                    yield 'event: resync\ndata: {}\n\n'
+                    break
+                if task_event is None:
+                    yield ': keepalive\n\n'
+                    continue
+                
+                yield f"event: task.{task_event['type']}\ndata: {json_provider.dumps(task_event)}\n\n"
+        finally:
+            task_events.unsubscribe(subscription)
+    
+    return Response(
+        generate(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@tasks_bp.route('/search', methods=['GET'])
+@require_auth
+def search_tasks(current_user):
+    try:
+        per_page = min(request.args.get('per_page', 20, type=int), 100)
+        
+        result = TaskService.search_tasks(
+            current_user,
+            request.args.get('q', ''),
+            cursor=request.args.get('cursor') or None,
+            per_page=per_page
+        )
+        
+        return jsonify({
+            'message': 'Pesquisa concluída com sucesso',
+            'tasks': [Task.serialize(task) for task in result['tasks']],
+            'pagination': {
+                'per_page': result['per_page'],
+                'next_cursor': result['next_cursor'],
+                'has_next': result['has_next']
+            }
+        }), HTTPStatus.OK.value
+    except Exception as e:
+        raise
+
+@tasks_bp.route('/changes', methods=['GET'])
+@require_auth
+def list_changes(current_user):
+    try:
+        since = request.args.get('since') or None
+        limit = min(request.args.get('limit', 500, type=int), 1000)
+        
+        if since is not None:
+            if not since.isdigit():
+                raise ValidationException(
+                    message="Parâmetro since inválido: use o next_since da sincronização anterior",
+                    details={"since": since}
+                )
+            since = int(since)
         
+        result = TaskService.get_changes(current_user, since=since, limit=limit)
+        
+        return jsonify({
+            'message': 'Alterações listadas com sucesso',
+            'tasks': [Task.serialize(task) for task in result['tasks']],
+            'deleted': result['deleted'],
+            'next_since': result['next_since'],
+            'has_more': result['has_more']
+        }), HTTPStatus.OK.value
+    except Exception as e:
+        raise
+
+@tasks_bp.route('/export', methods=['GET'])
+@require_auth
+def export_tasks(current_user):
+    """
+    Exporta todas as tarefas do utilizador num só pedido (NDJSON ou CSV)
+    
+    O corpo é gerado à medida que as linhas chegam da base de dados, em lotes
+    de TASK_EXPORT_BATCH_SIZE, pelo que a memória do worker não depende do
+    número de tarefas exportadas.
+    """
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in EXPORT_FORMATS:
+        raise ValidationException(
+            message="Formato de exportação inválido",
+            details={"format": export_format, "allowed": sorted(EXPORT_FORMATS)}
+        )
+    
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    batches = TaskService.iter_user_tasks(
+        current_user,
+        status_filter=request.args.get('status', None),
+        batch_size=current_app.config.get('TASK_EXPORT_BATCH_SIZE', 1000)
+    )
+    if export_format == 'csv':
+        chunks = csv_chunks(batches)
+    else:
+        chunks = ndjson_chunks(batches, current_app.json.dumps)
+    
+    # O contexto do pedido (e a sessão da base de dados) mantém-se até o
+    # gerador terminar
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={
+            'Content-Disposition': f'attachment; filename="{filename}"',
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        }
+    )
+
+@tasks_bp.route('/import', methods=['POST'])
+@require_auth
+def import_tasks(current_user):
+    """
+    Importa tarefas de um ficheiro NDJSON ou CSV
+    
+    O ficheiro pode ser o corpo do pedido (Content-Type application/x-ndjson
+    ou text/csv) ou o campo file de um formulário multipart; o parâmetro
+    format sobrepõe-se ao tipo detetado. É lido linha a linha e as tarefas
+    são inseridas em lotes de TASK_IMPORT_BATCH_SIZE, cada um na sua
+    transação, pelo que o ficheiro nunca é carregado de uma vez.
+    """
+    upload = request.files.get('file')
+    if upload is not None:
+        binary, mimetype, filename = upload.stream, upload.mimetype, upload.filename
+    else:
+        binary, mimetype, filename = request.stream, request.mimetype, None
+    
+    import_format = resolve_import_format(request.args.get('format'), mimetype, filename)
+    stream = io.TextIOWrapper(binary, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        records = iter_csv_records(stream)
+    else:
+        records = iter_ndjson_records(stream, current_app.config.get('TASK_IMPORT_MAX_LINE_LENGTH'))
+    
+    result = TaskService.import_tasks(
+        records,
+        current_user,
+        batch_size=current_app.config.get('TASK_IMPORT_BATCH_SIZE', 500),
+        max_errors=current_app.config.get('TASK_IMPORT_MAX_ERRORS', 100)
+    )
+    
+    return jsonify({
+        'message': 'Importação concluída',
+        'summary': {
+            'total': result['total'],
+            'imported': result['imported'],
+            'failed': result['failed']
+        },
+        'errors': result['errors'],
+        'errors_truncated': result['errors_truncated']
+    }), HTTPStatus.OK.value
+
+@tasks_bp.route('/bulk', methods=['POST'])
+@require_auth
+@validate_json_content_type
+def bulk_tasks(current_user):
+    try:
+        data = request.get_json()
+        bulk_request = TaskBulkRequest(**data)
+        
+        results = TaskService.bulk_operations(bulk_request.operations, current_user)
+        
+        failed = sum(1 for result in results if 'error' in result)
+        return jsonify({
+            'message': 'Operações em lote processadas',
+            'results': results,
+            'summary': {
+                'total': len(results),
+                'succeeded': len(results) - failed,
+                'failed': failed
+            }
+        }), HTTPStatus.OK.value
+    
     except ValidationError as e:
         raise
     except Exception as e:
@@ -61,10 +316,16 @@ def get_task(current_user, task_id):
     try:
         task = TaskService.get_task_by_id(task_id, current_user)
         
-        return jsonify({
+        etag = compute_etag('task', task.id, task.updated_at.isoformat() if task.updated_at else '')
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            return not_modified
+        
+        response = jsonify({
             'message': 'Tarefa encontrada',
             'task': task.to_dict()
-        }), HTTPStatus.OK.value
+        })
+        return apply_cache_headers(response, etag), HTTPStatus.OK.value
     except Exception as e:
         raise
 
@@ -80,9 +341,9 @@ def update_task(current_user, task_id):
         
         return jsonify({
             'message': 'Tarefa atualizada com sucesso',
-            'task': updated_task.to_dict()
+            'task': Task.serialize(updated_task)
         }), HTTPStatus.OK.value
-        
+    
     except ValidationError as e:
         raise
     except Exception as e:
@@ -1,8 +1,11 @@
 from app.schemas.user import UserCreate, UserLogin, UserResponse
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse
+from app.schemas.task import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskBulkOperation, TaskBulkRequest
+)
 
 __all__ = [
     'UserCreate', 'UserLogin', 'UserResponse',
-    'TaskCreate', 'TaskUpdate', 'TaskResponse'
+    'TaskCreate', 'TaskUpdate', 'TaskResponse',
+    'TaskBulkOperation', 'TaskBulkRequest'
 ]
 
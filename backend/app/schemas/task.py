@@ -1,5 +1,7 @@
 from pydantic import BaseModel, Field, model_validator
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
+
+BULK_MAX_OPERATIONS = 500
 
 class TaskCreate(BaseModel):
     """Schema para criação de tarefa"""
@@ -21,6 +23,16 @@ class TaskUpdate(BaseModel):
             raise ValueError('title não pode ser None')
         return data
 
+class TaskBulkOperation(BaseModel):
+    """Schema de uma operação em lote (os dados são validados por item)"""
+    op: Literal['create', 'update', 'delete']
+    id: Optional[int] = None
+    data: Dict[str, Any] = Field(default_factory=dict)
+
+class TaskBulkRequest(BaseModel):
+    """Schema do pedido de operações em lote"""
+    operations: List[TaskBulkOperation] = Field(..., min_length=1, max_length=BULK_MAX_OPERATIONS)
+
 class TaskResponse(BaseModel):
     """Schema de resposta da tarefa"""
     id: int
@@ -1,5 +1,5 @@
 from app.services.auth_service import AuthService
 from app.services.task_service import TaskService
+from app.services.task_counter_service import TaskCounterService
 
-__all__ = ['AuthService', 'TaskService']
-
+__all__ = ['AuthService', 'TaskService', 'TaskCounterService']
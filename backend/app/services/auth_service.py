@@ -1,13 +1,15 @@
+from sqlalchemy import update
 from app import db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserLogin
-from app.utils.security import verify_password, get_password_hash
+from app.utils.security import verify_and_update_password, get_password_hash
 from app.utils.login_attempts import login_tracker
 from app.exceptions.custom_exceptions import (
     AuthenticationException,
     ResourceAlreadyExistsException,
     DatabaseException
 )
+from flask import current_app
 from flask_jwt_extended import create_access_token
 
 class AuthService:
@@ -70,7 +72,11 @@ class AuthService:
         
         user = User.query.filter_by(username=login_data.username).first()
         
-        if not user or not verify_password(login_data.password, user.hashed_password):
+        valid, new_hash = (False, None)
+        if user:
+            valid, new_hash = verify_and_update_password(login_data.password, user.hashed_password)
+        
+        if not valid:
             login_tracker.record_failed_attempt(login_data.username)
             remaining = login_tracker.get_remaining_attempts(login_data.username)
             
@@ -87,13 +93,47 @@ class AuthService:
         
         login_tracker.record_successful_login(login_data.username)
         
-        access_token = create_access_token(identity=user.id)
-        
-        return {
+        access_token = create_access_token(
+            identity=user.id,
+            additional_claims={
+                'username': user.username,
+                'email': user.email,
+                'created_at': user.created_at.isoformat() if user.created_at else None
+            }
+        )
+        result = {
             'access_token': access_token,
             'token_type': 'bearer',
             'user': user.to_dict()
         }
+        
+        if new_hash:
+            AuthService._upgrade_password_hash(user.id, new_hash)
+        
+        return result
+    
+    @staticmethod
+    def _upgrade_password_hash(user_id: int, new_hash: str) -> None:
+        """
+        Guarda o hash migrado para a política atual (esquema ou custo)
+        
+        Feito depois de construída a resposta, com um UPDATE direto: o commit
+        expira o utilizador mas já nada o volta a ler (sem SELECT extra).
+        Uma falha aqui não impede o login: o hash será migrado num login futuro.
+        """
+        try:
+            db.session.execute(
+                update(User)
+                .where(User.id == user_id)
+                .values(hashed_password=new_hash)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.warning(
+                f"Falha ao atualizar hash da palavra-passe do utilizador {user_id}: {e}"
+            )
     
     @staticmethod
     def get_user_by_id(user_id: int) -> User:
@@ -0,0 +1,269 @@
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, insert, literal, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+
+# INSERT ... ON CONFLICT DO NOTHING dos dialetos suportados
+_DIALECT_INSERTS = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}
+
+class TaskCounterService:
+    """Classe de serviço para os contadores de tarefas por utilizador"""
+    
+    @staticmethod
+    def _aggregate_query(user_id):
+        """
+        Query que conta as tarefas (total e concluídas) de um utilizador
+        
+        A versão inicial é a maior change_seq das tarefas, para que as
+        escritas seguintes recebam sempre sequências superiores.
+        """
+        return select(
+            literal(user_id),
+            func.count(Task.id),
+            func.coalesce(func.sum(case((Task.completed.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.max(Task.change_seq), 0)
+        ).where(Task.user_id == user_id)
+    
+    @staticmethod
+    def _initialize(user_id: int) -> None:
+        """
+        Cria os contadores do utilizador a partir de uma contagem real
+        
+        Usado nas leituras: corre numa ligação e transação próprias, pelo que
+        fica persistida mesmo em pedidos só de leitura, sem confirmar (nem
+        desfazer) a transação da sessão do chamador. As escritas usam
+        _initialize_in_session.
+        """
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(
+                    insert(TaskCounter).from_select(
+                        ['user_id', 'total', 'completed', 'version'],
+                        TaskCounterService._aggregate_query(user_id)
+                    )
+                )
+        except IntegrityError:
+            # Outro pedido inicializou os contadores em simultâneo
+            pass
+    
+    @staticmethod
+    def _initialize_in_session(user_id: int) -> None:
+        """
+        Cria os contadores do utilizador na transação da sessão
+        
+        Usado nas escritas, que já têm a transação de escrita aberta: uma
+        segunda ligação ficaria à espera do lock dessa transação (no SQLite,
+        até ao busy timeout). É chamado antes de qualquer alteração às
+        tarefas, pelo que a contagem é a do estado anterior; se outra
+        transação criar a linha em simultâneo, o INSERT não tem efeito.
+        """
+        columns = ['user_id', 'total', 'completed', 'version']
+        aggregate = TaskCounterService._aggregate_query(user_id)
+        dialect_insert = _DIALECT_INSERTS.get(db.session.get_bind().dialect.name)
+        
+        if dialect_insert is not None:
+            statement = dialect_insert(TaskCounter).from_select(columns, aggregate).on_conflict_do_nothing(
+                index_elements=[TaskCounter.user_id]
+            )
+        else:
+            statement = insert(TaskCounter).from_select(
+                columns,
+                aggregate.where(~select(TaskCounter.user_id).where(TaskCounter.user_id == user_id).exists())
+            )
+        db.session.execute(statement)
+    
+    @staticmethod
+    def _next_version(user_id: int, statement) -> int:
+        """Executa o UPDATE ... RETURNING version, inicializando os contadores se faltarem"""
+        version = db.session.execute(statement).scalar_one_or_none()
+        if version is None:
+            TaskCounterService._initialize_in_session(user_id)
+            version = db.session.execute(statement).scalar_one()
+        return version
+    
+    @staticmethod
+    def apply_delta(user_id: int, total: int = 0, completed: int = 0) -> int:
+        """
+        Aplica uma variação aos contadores do utilizador e incrementa a versão
+        
+        Deve ser chamado em todas as escritas sobre as tarefas, na mesma
+        transação e antes de alterar as tarefas. O UPDATE bloqueia a linha
+        dos contadores até ao commit, pelo que as escritas de um utilizador
+        recebem versões pela ordem em que são confirmadas; a versão devolvida
+        é gravada em change_seq das tarefas e eliminações escritas.
+        
+        Args:
+            user_id: ID do utilizador
+            total: Variação do número total de tarefas
+            completed: Variação do número de tarefas concluídas
+        
+        Returns:
+            int: Nova versão
+        """
+        return TaskCounterService._next_version(
+            user_id,
+            update(TaskCounter)
+            .where(TaskCounter.user_id == user_id)
+            .values(
+                total=TaskCounter.total + total,
+                completed=TaskCounter.completed + completed,
+                version=TaskCounter.version + 1
+            )
+            .returning(TaskCounter.version)
+            .execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def apply_completed_change(user_id: int, task_id: int, completed: bool) -> int:
+        """
+        Ajusta o contador de concluídas para a mudança de estado de uma tarefa
+        e incrementa a versão
+        
+        O estado anterior é lido numa subconsulta do próprio UPDATE, pelo que
+        deve ser executado antes de alterar a tarefa e na mesma transação
+        (como apply_delta). Se a tarefa não existir, não pertencer ao
+        utilizador ou já estiver no estado pedido, a variação é zero.
+        
+        Args:
+            user_id: ID do utilizador
+            task_id: ID da tarefa a alterar
+            completed: Novo estado da tarefa
+        
+        Returns:
+            int: Nova versão
+        """
+        previous = (
+            select(Task.completed)
+            .where(Task.id == task_id, Task.user_id == user_id)
+            .scalar_subquery()
+        )
+        delta = case((previous == (not completed), 1 if completed else -1), else_=0)
+        
+        return TaskCounterService._next_version(
+            user_id,
+            update(TaskCounter)
+            .where(TaskCounter.user_id == user_id)
+            .values(
+                completed=TaskCounter.completed + delta,
+                version=TaskCounter.version + 1
+            )
+            .returning(TaskCounter.version)
+            .execution_options(synchronize_session=False)
+        )
+    
+    @staticmethod
+    def _get_counter(user_id: int) -> TaskCounter:
+        """Obtém os contadores do utilizador, inicializando-os se necessário"""
+        counter = db.session.get(TaskCounter, user_id)
+        if counter is None:
+            TaskCounterService._initialize(user_id)
+            counter = db.session.get(TaskCounter, user_id)
+        
+        return counter
+    
+    @staticmethod
+    def get_counter(user_id: int) -> TaskCounter:
+        """
+        Obtém a linha de contadores do utilizador (contagens e versão)
+        
+        Para quem precisa de ambos no mesmo pedido: uma só leitura e valores
+        coerentes entre si.
+        
+        Args:
+            user_id: ID do utilizador
+        
+        Returns:
+            TaskCounter: Contadores do utilizador
+        """
+        return TaskCounterService._get_counter(user_id)
+    
+    @staticmethod
+    def get_counts(user_id: int) -> Dict[str, int]:
+        """
+        Obtém os contadores de tarefas do utilizador
+        
+        Na primeira leitura os contadores são inicializados a partir de uma
+        contagem real das tarefas; a partir daí são mantidos pelas escritas.
+        
+        Args:
+            user_id: ID do utilizador
+        
+        Returns:
+            dict: total, completed e pending
+        """
+        return TaskCounterService._get_counter(user_id).to_dict()
+    
+    @staticmethod
+    def get_version(user_id: int) -> int:
+        """
+        Obtém a versão das tarefas do utilizador
+        
+        A versão muda sempre que uma tarefa do utilizador é criada, alterada
+        ou eliminada pelo TaskService, pelo que identifica o estado das suas
+        listagens sem as carregar.
+        
+        Args:
+            user_id: ID do utilizador
+        
+        Returns:
+            int: Versão atual
+        """
+        return TaskCounterService._get_counter(user_id).version
+    
+    @staticmethod
+    def reconcile(user_id: Optional[int] = None) -> List[Dict]:
+        """
+        Recalcula os contadores a partir das tarefas e corrige desvios
+        
+        Args:
+            user_id: ID do utilizador a reconciliar (None = todos)
+        
+        Returns:
+            list: Utilizadores corrigidos, com os valores antigos e novos
+        """
+        completed_expr = func.coalesce(func.sum(case((Task.completed.is_(True), 1), else_=0)), 0)
+        actual_query = select(
+            Task.user_id,
+            func.count(Task.id),
+            completed_expr,
+            func.max(Task.change_seq)
+        ).group_by(Task.user_id)
+        counters_query = select(TaskCounter)
+        if user_id is not None:
+            actual_query = actual_query.where(Task.user_id == user_id)
+            counters_query = counters_query.where(TaskCounter.user_id == user_id)
+        
+        actual = {row[0]: (row[1], row[2], row[3]) for row in db.session.execute(actual_query)}
+        fixed = []
+        
+        for counter in db.session.execute(counters_query).scalars():
+            expected_total, expected_completed, _ = actual.pop(counter.user_id, (0, 0, 0))
+            if counter.total != expected_total or counter.completed != expected_completed:
+                fixed.append({
+                    'user_id': counter.user_id,
+                    'old': {'total': counter.total, 'completed': counter.completed},
+                    'new': {'total': expected_total, 'completed': expected_completed}
+                })
+                counter.total = expected_total
+                counter.completed = expected_completed
+                counter.version += 1
+        
+        # Utilizadores com tarefas mas ainda sem contadores
+        for missing_user_id, (expected_total, expected_completed, max_seq) in actual.items():
+            fixed.append({
+                'user_id': missing_user_id,
+                'old': None,
+                'new': {'total': expected_total, 'completed': expected_completed}
+            })
+            db.session.add(TaskCounter(
+                user_id=missing_user_id,
+                total=expected_total,
+                completed=expected_completed,
+                version=max_seq
+            ))
+        
+        db.session.commit()
+        return fixed
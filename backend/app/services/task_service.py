@@ -1,47 +1,466 @@
-from typing import List, Optional, Dict
+import math
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple
+from pydantic import ValidationError
+from sqlalchemy import Double, Row, and_, case, cast, column, delete, func, insert, literal, literal_column, or_, select, table, update
 from app import db
-from app.models.task import Task
+from app.models.task import Task, TASK_COLUMNS
+from app.models.task_tombstone import TaskTombstone
+from app.models.task_counter import TaskCounter
 from app.models.user import User
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import TaskCreate, TaskUpdate, TaskBulkOperation
+from app.services.task_counter_service import TaskCounterService
+from app.utils.pagination import encode_cursor, decode_cursor, parse_cursor_datetime
+from app.utils.validators import format_validation_errors
+from app.utils.task_events import record_task_event
+from app.enums.http_status import HTTPStatus
 from app.exceptions.custom_exceptions import (
+    AppException,
     ResourceNotFoundException,
     AuthorizationException,
-    DatabaseException
+    DatabaseException,
+    ValidationException
 )
 
+MAX_SEARCH_TERMS = 10
+
+BULK_EVENT_TYPES = {'create': 'created', 'update': 'updated', 'delete': 'deleted'}
+
 class TaskService:
     """Classe de serviço para operações com tarefas"""
     
+    @staticmethod
+    def _task_columns() -> List:
+        """Colunas da tarefa pela ordem de TASK_COLUMNS"""
+        return [getattr(Task, column) for column in TASK_COLUMNS]
+    
+    @staticmethod
+    def _listing_query(user: User, status_filter: Optional[str] = None):
+        """
+        SELECT das colunas das tarefas do utilizador, sem carregar instâncias
+        
+        As linhas devolvidas só servem para leitura (listagens) e evitam o
+        custo do identity map e do estado ORM; serializam-se com Task.serialize.
+        """
+        query = select(*TaskService._task_columns()).where(
+            Task.user_id == user.id
+        )
+        
+        if status_filter == 'completed':
+            query = query.where(Task.completed.is_(True))
+        elif status_filter == 'pending':
+            query = query.where(Task.completed.is_(False))
+        
+        return query
+    
     @staticmethod
     def get_user_tasks(
         user: User, 
         page: int = 1, 
         per_page: int = 20,
-        status_filter: Optional[str] = None
+        status_filter: Optional[str] = None,
+        counts: Optional[Dict[str, int]] = None
     ) -> Dict:
-        query = Task.query.filter_by(user_id=user.id)
+        page = max(page, 1)
+        per_page = max(per_page, 1)
         
-        if status_filter == 'completed':
-            query = query.filter_by(completed=True)
-        elif status_filter == 'pending':
-            query = query.filter_by(completed=False)
+        tasks = db.session.execute(
+            TaskService._listing_query(user, status_filter)
+            .order_by(Task.created_at.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        ).all()
+        
+        # counts já lidos no pedido (ex.: com a versão do ETag) evitam nova leitura
+        if counts is None:
+            counts = TaskCounterService.get_counts(user.id)
+        total = counts.get(status_filter, counts['total'])
+        pages = math.ceil(total / per_page) if total else 0
+        
+        return {
+            'tasks': tasks,
+            'total': total,
+            'page': page,
+            'per_page': per_page,
+            'pages': pages,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+    
+    @staticmethod
+    def get_user_tasks_keyset(
+        user: User,
+        cursor: Optional[str] = None,
+        per_page: int = 20,
+        status_filter: Optional[str] = None,
+        include_total: bool = False
+    ) -> Dict:
+        """
+        Lista tarefas do utilizador com paginação por cursor (keyset)
+        
+        Ordena por (created_at, id) descendente e procura a partir da última
+        linha devolvida, usando os índices idx_user_created /
+        idx_user_completed_created. O custo de cada página não depende da
+        profundidade e não é feita contagem, salvo se include_total for True.
+        
+        Args:
+            user: Utilizador autenticado
+            cursor: Cursor opaco devolvido na página anterior (None = início)
+            per_page: Número de tarefas por página
+            status_filter: 'completed', 'pending' ou None
+            include_total: Se deve calcular o total de tarefas
         
-        pagination = query.order_by(Task.created_at.desc()).paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
+        Returns:
+            dict: Tarefas, next_cursor, has_next e opcionalmente total
+        
+        Raises:
+            ValidationException: Se o cursor for inválido
+        """
+        per_page = max(per_page, 1)
+        query = TaskService._listing_query(user, status_filter)
+        
+        total = None
+        if include_total:
+            total = db.session.execute(
+                select(func.count()).select_from(query.subquery())
+            ).scalar_one()
+        
+        if cursor:
+            raw_created_at, last_id = decode_cursor(cursor, 2)
+            last_created_at = parse_cursor_datetime(raw_created_at, cursor)
+            if not isinstance(last_id, int):
+                raise ValidationException(
+                    message="Cursor de paginação inválido",
+                    details={"cursor": cursor}
+                )
+            query = query.where(
+                Task.created_at <= last_created_at,
+                or_(
+                    Task.created_at < last_created_at,
+                    and_(Task.created_at == last_created_at, Task.id < last_id)
+                )
+            )
+        
+        rows = db.session.execute(
+            query.order_by(Task.created_at.desc(), Task.id.desc()).limit(per_page + 1)
+        ).all()
+        
+        has_next = len(rows) > per_page
+        tasks = rows[:per_page]
+        next_cursor = None
+        if has_next:
+            last = tasks[-1]
+            next_cursor = encode_cursor([last.created_at, last.id])
+        
+        result = {
+            'tasks': tasks,
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_next': has_next
+        }
+        if include_total:
+            result['total'] = total
+        return result
+    
+    @staticmethod
+    def _search_statement(user: User, terms: List[str]):
+        """
+        SELECT das tarefas do utilizador que contêm todos os termos (como
+        prefixo), com a pontuação de relevância (maior = mais relevante)
+        """
+        columns = TaskService._task_columns()
+        dialect = db.session.get_bind().dialect.name
+        
+        if dialect == 'postgresql':
+            search_vector = literal_column('tasks.search_vector')
+            ts_query = func.to_tsquery('simple', ' & '.join(f'{term}:*' for term in terms))
+            # ts_rank_cd devolve real (float4): em double precision o valor guardado
+            # no cursor (float do JSON) é comparado exatamente na página seguinte
+            score = cast(func.ts_rank_cd(search_vector, ts_query), Double)
+            return select(*columns, score.label('score')).where(
+                Task.user_id == user.id,
+                search_vector.op('@@')(ts_query)
+            )
+        
+        if dialect == 'sqlite':
+            fts = table('tasks_fts', column('rowid'))
+            fts_table = literal_column('tasks_fts')
+            # bm25 devolve valores negativos (mais negativo = mais relevante); título com peso 2
+            score = -func.bm25(fts_table, 2.0, 1.0)
+            return (
+                select(*columns, score.label('score'))
+                .select_from(Task)
+                .join(fts, fts.c.rowid == Task.id)
+                .where(
+                    Task.user_id == user.id,
+                    fts_table.op('MATCH')(' '.join(f'"{term}"*' for term in terms))
+                )
+            )
+        
+        # Outros motores: sem índice de texto, todos os resultados com a mesma pontuação
+        conditions = [
+            or_(Task.title.ilike(f'%{term}%'), Task.description.ilike(f'%{term}%'))
+            for term in terms
+        ]
+        return select(*columns, literal(0.0).label('score')).where(Task.user_id == user.id, *conditions)
+    
+    @staticmethod
+    def search_tasks(
+        user: User,
+        query: str,
+        cursor: Optional[str] = None,
+        per_page: int = 20
+    ) -> Dict:
+        """
+        Pesquisa as tarefas do utilizador pelo título e descrição
+        
+        Usa o índice de texto do motor (tsvector + GIN no PostgreSQL, FTS5 no
+        SQLite): cada termo é procurado como prefixo e todos têm de existir.
+        Os resultados vêm por relevância e são paginados por cursor sobre
+        (pontuação, id), pelo que o custo depende do número de resultados e
+        não do total de tarefas do utilizador.
+        
+        Args:
+            user: Utilizador autenticado
+            query: Texto a pesquisar
+            cursor: Cursor opaco devolvido na página anterior (None = início)
+            per_page: Número de tarefas por página
+        
+        Returns:
+            dict: Tarefas, next_cursor e has_next
+        
+        Raises:
+            ValidationException: Se a pesquisa não tiver termos ou o cursor for inválido
+        """
+        terms = re.findall(r'\w+', (query or '').lower())[:MAX_SEARCH_TERMS]
+        if not terms:
+            raise ValidationException(
+                message="A pesquisa deve conter pelo menos uma palavra",
+                details={"q": query}
+            )
+        
+        per_page = max(per_page, 1)
+        results = TaskService._search_statement(user, terms).subquery()
+        statement = select(results)
+        
+        if cursor:
+            last_score, last_id = decode_cursor(cursor, 2)
+            if not isinstance(last_score, (int, float)) or not isinstance(last_id, int):
+                raise ValidationException(
+                    message="Cursor de paginação inválido",
+                    details={"cursor": cursor}
+                )
+            statement = statement.where(
+                or_(
+                    results.c.score < last_score,
+                    and_(results.c.score == last_score, results.c.id < last_id)
+                )
+            )
+        
+        rows = db.session.execute(
+            statement.order_by(results.c.score.desc(), results.c.id.desc()).limit(per_page + 1)
+        ).all()
+        
+        has_next = len(rows) > per_page
+        rows = rows[:per_page]
+        next_cursor = None
+        if has_next:
+            last = rows[-1]
+            next_cursor = encode_cursor([last.score, last.id])
+        
+        return {
+            # Sem a pontuação, na ordem de TASK_COLUMNS (Task.serialize)
+            'tasks': [row[:len(TASK_COLUMNS)] for row in rows],
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_next': has_next
+        }
+    
+    @staticmethod
+    def get_changes(user: User, since: Optional[int] = None, limit: int = 500) -> Dict:
+        """
+        Lista as alterações às tarefas do utilizador desde uma versão
+        
+        Cada escrita grava em change_seq (tarefas e eliminações) a versão dos
+        contadores do utilizador que incrementou. Como a linha dos contadores
+        fica bloqueada até ao commit, as versões de um utilizador ficam
+        visíveis por ordem: uma transação lenta nunca confirma uma versão
+        abaixo de um cursor já devolvido, o que não acontece com updated_at
+        (relógio da aplicação, atribuído antes do commit).
+        
+        Devolve as tarefas e as eliminações com change_seq > since, por ordem
+        de versão, usando os índices idx_user_change_seq e
+        idx_tombstone_user_seq. Sem since, devolve todas as tarefas
+        (sincronização completa). O cliente repete o pedido com
+        since=next_since enquanto has_more for True.
+        
+        Uma página nunca termina a meio de um grupo de alterações com a mesma
+        versão (ex.: uma operação em lote), para que nenhuma se perca no
+        pedido seguinte.
+        
+        Args:
+            user: Utilizador autenticado
+            since: next_since da última sincronização ou None
+            limit: Número máximo de alterações por página
+        
+        Returns:
+            dict: tasks (tuplos com as colunas de TASK_COLUMNS, para Task.serialize),
+            deleted (task_id, deleted_at), next_since e has_more
+        
+        Raises:
+            ValidationException: Se since for anterior a eliminações já removidas
+        """
+        limit = max(limit, 1)
+        counter = TaskCounterService.get_counter(user.id)
+        if since is not None and since < counter.purged_seq:
+            raise ValidationException(
+                message="O parâmetro since é anterior à retenção das eliminações; "
+                        "faça uma sincronização completa",
+                details={"since": since, "full_sync_required": True}
+            )
+        # Lida antes das alterações: todas as versões até aqui já estão confirmadas
+        current_version = counter.version
+        
+        task_query = select(Task.change_seq, *TaskService._task_columns()).where(
+            Task.user_id == user.id
         )
+        tombstone_query = select(
+            TaskTombstone.change_seq, TaskTombstone.task_id, TaskTombstone.deleted_at
+        ).where(TaskTombstone.user_id == user.id)
+        if since is not None:
+            task_query = task_query.where(Task.change_seq > since)
+            tombstone_query = tombstone_query.where(TaskTombstone.change_seq > since)
+        
+        changes = [
+            (row[0], row[1:], None)
+            for row in db.session.execute(
+                task_query.order_by(Task.change_seq, Task.id).limit(limit + 1)
+            )
+        ]
+        if since is not None:
+            changes += [
+                (row.change_seq, None, row)
+                for row in db.session.execute(
+                    tombstone_query
+                    .order_by(TaskTombstone.change_seq, TaskTombstone.id)
+                    .limit(limit + 1)
+                )
+            ]
+        changes.sort(key=lambda change: change[0])
+        
+        has_more = len(changes) > limit
+        if has_more:
+            boundary = changes[limit - 1][0]
+            page = [change for change in changes[:limit] if change[0] < boundary]
+            if not page:
+                # Todas as alterações da página têm a mesma versão: devolve o grupo inteiro
+                page = [
+                    (boundary, row[1:], None)
+                    for row in db.session.execute(task_query.where(Task.change_seq == boundary))
+                ]
+                if since is not None:
+                    page += [
+                        (boundary, None, row)
+                        for row in db.session.execute(
+                            tombstone_query.where(TaskTombstone.change_seq == boundary)
+                        )
+                    ]
+            changes = page
+            next_since = changes[-1][0]
+        else:
+            next_since = max(current_version, changes[-1][0] if changes else 0, since or 0)
         
         return {
-            'tasks': pagination.items,
-            'total': pagination.total,
-            'page': pagination.page,
-            'per_page': pagination.per_page,
-            'pages': pagination.pages,
-            'has_next': pagination.has_next,
-            'has_prev': pagination.has_prev
+            'tasks': [task for _, task, _ in changes if task is not None],
+            'deleted': [
+                {
+                    'id': tombstone.task_id,
+                    'deleted_at': tombstone.deleted_at.isoformat()
+                }
+                for _, _, tombstone in changes
+                if tombstone is not None
+            ],
+            'next_since': next_since,
+            'has_more': has_more
         }
     
+    @staticmethod
+    def iter_user_tasks(
+        user: User,
+        status_filter: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[List]:
+        """
+        Percorre todas as tarefas do utilizador em lotes, sem as carregar de uma vez
+        
+        A query é executada uma só vez com yield_per: o driver usa um cursor
+        do lado do servidor (PostgreSQL) e as linhas chegam em lotes de
+        batch_size, pelo que a memória não depende do número de tarefas. As
+        linhas seguem a ordem de TASK_COLUMNS (Task.serialize).
+        
+        Args:
+            user: Utilizador autenticado
+            status_filter: 'completed', 'pending' ou None
+            batch_size: Número de linhas por lote
+        
+        Yields:
+            list: Lote de linhas, da tarefa mais recente para a mais antiga
+        """
+        result = db.session.execute(
+            TaskService._listing_query(user, status_filter)
+            .order_by(Task.created_at.desc(), Task.id.desc())
+            .execution_options(yield_per=max(batch_size, 1))
+        )
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+    
+    @staticmethod
+    def purge_tombstones(older_than_days: int) -> int:
+        """
+        Elimina os registos de tarefas eliminadas mais antigos que o prazo
+        
+        A maior versão removida fica em TaskCounter.purged_seq, para que
+        get_changes recuse cursores que já não veriam essas eliminações.
+        
+        Args:
+            older_than_days: Idade mínima, em dias, dos registos a eliminar
+        
+        Returns:
+            int: Número de registos eliminados
+        """
+        cutoff = datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=older_than_days)
+        expired = TaskTombstone.deleted_at < cutoff
+        purged_seq = (
+            select(func.max(TaskTombstone.change_seq))
+            .where(TaskTombstone.user_id == TaskCounter.user_id, expired)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            update(TaskCounter)
+            .where(TaskCounter.user_id.in_(select(TaskTombstone.user_id).where(expired)))
+            .values(purged_seq=case(
+                (purged_seq > TaskCounter.purged_seq, purged_seq),
+                else_=TaskCounter.purged_seq
+            ))
+            .execution_options(synchronize_session=False)
+        )
+        result = db.session.execute(delete(TaskTombstone).where(expired))
+        db.session.commit()
+        return result.rowcount
+    
+    @staticmethod
+    def get_tasks_counter(user: User) -> TaskCounter:
+        """
+        Contadores das tarefas do utilizador numa só leitura
+        
+        A versão, alterada por cada escrita, permite validar uma listagem em
+        cache (ETag) sem carregar as tarefas; as contagens servem a paginação.
+        """
+        return TaskCounterService.get_counter(user.id)
+    
     @staticmethod
     def get_task_by_id(task_id: int, user: User) -> Task:
         """
@@ -50,10 +469,10 @@ class TaskService:
         Args:
             task_id: ID da tarefa
             user: Utilizador autenticado
-            
+        
         Returns:
             Task: Objeto da tarefa
-            
+        
         Raises:
             ResourceNotFoundException: Se tarefa não for encontrada
             AuthorizationException: Se tarefa não pertencer ao utilizador
@@ -75,30 +494,67 @@ class TaskService:
         return task
     
     @staticmethod
-    def create_task(task_data: TaskCreate, user: User) -> Task:
+    def _raise_missing_or_forbidden(task_id: int, user: User) -> None:
+        """
+        Distingue, após uma escrita que não afetou linhas, se a tarefa não
+        existe ou pertence a outro utilizador
+        
+        Raises:
+            ResourceNotFoundException: Se tarefa não for encontrada
+            AuthorizationException: Se tarefa não pertencer ao utilizador
+        """
+        owner_id = db.session.execute(
+            select(Task.user_id).where(Task.id == task_id)
+        ).scalar_one_or_none()
+        
+        if owner_id is None:
+            raise ResourceNotFoundException(
+                resource="Tarefa",
+                details={"task_id": task_id}
+            )
+        
+        raise AuthorizationException(
+            message="Não tem permissão para aceder a esta tarefa",
+            details={"task_id": task_id, "user_id": user.id}
+        )
+    
+    @staticmethod
+    def create_task(task_data: TaskCreate, user: User) -> Row:
         """
         Cria uma nova tarefa para o utilizador
         
+        A tarefa é inserida com INSERT ... RETURNING das colunas (sem criar uma
+        instância no identity map), pelo que é devolvida sem SELECT extra.
+        
         Args:
             task_data: Dados da tarefa
             user: Utilizador autenticado
-            
+        
         Returns:
-            Task: Tarefa criada
-            
+            Row: Tarefa criada, com as colunas de TASK_COLUMNS (Task.serialize)
+        
         Raises:
             DatabaseException: Se houver erro ao guardar na base de dados
         """
         try:
-            new_task = Task(
-                title=task_data.title,
-                description=task_data.description,
-                completed=task_data.completed,
-                user_id=user.id
+            version = TaskCounterService.apply_delta(
+                user.id,
+                total=1,
+                completed=1 if task_data.completed else 0
             )
-            db.session.add(new_task)
+            new_task = db.session.execute(
+                insert(Task)
+                .values(
+                    title=task_data.title,
+                    description=task_data.description,
+                    completed=task_data.completed,
+                    user_id=user.id,
+                    change_seq=version
+                )
+                .returning(*TaskService._task_columns())
+            ).one()
+            record_task_event(db.session, 'created', user.id, new_task.id, Task.serialize(new_task))
             db.session.commit()
-            db.session.refresh(new_task)
             return new_task
         except Exception as e:
             db.session.rollback()
@@ -108,42 +564,65 @@ class TaskService:
             )
     
     @staticmethod
-    def update_task(task_id: int, task_data: TaskUpdate, user: User) -> Task:
+    def update_task(task_id: int, task_data: TaskUpdate, user: User) -> Row:
         """
         Atualiza uma tarefa existente
         
+        São executados dois UPDATE: o dos contadores do utilizador e o da
+        tarefa, com WHERE id AND user_id RETURNING das colunas, sem a carregar
+        antes nem depois. Os valores vêm sempre da base de dados, mesmo que a
+        tarefa já esteja na sessão. Só quando nenhuma linha é afetada se
+        consulta o dono da tarefa, para distinguir 404 de 403.
+        
         Args:
             task_id: ID da tarefa
             task_data: Dados para atualização
             user: Utilizador autenticado
-            
+        
         Returns:
-            Task: Tarefa atualizada
-            
+            Row: Tarefa atualizada, com as colunas de TASK_COLUMNS (Task.serialize)
+        
         Raises:
             ResourceNotFoundException: Se tarefa não for encontrada
             AuthorizationException: Se tarefa não pertencer ao utilizador
             DatabaseException: Se houver erro ao atualizar na base de dados
         """
-        task = TaskService.get_task_by_id(task_id, user)
+        values = {'updated_at': datetime.now(timezone.utc)}
+        if task_data.title is not None:
+            values['title'] = task_data.title
+        if task_data.description is not None:
+            values['description'] = task_data.description
+        if task_data.completed is not None:
+            values['completed'] = task_data.completed
         
         try:
-            if task_data.title is not None:
-                task.title = task_data.title
-            if task_data.description is not None:
-                task.description = task_data.description
             if task_data.completed is not None:
-                task.completed = task_data.completed
+                version = TaskCounterService.apply_completed_change(user.id, task_id, task_data.completed)
+            else:
+                version = TaskCounterService.apply_delta(user.id)
             
-            db.session.commit()
-            db.session.refresh(task)
-            return task
+            task = db.session.execute(
+                update(Task)
+                .where(Task.id == task_id, Task.user_id == user.id)
+                .values(change_seq=version, **values)
+                .returning(*TaskService._task_columns())
+                .execution_options(synchronize_session=False)
+            ).one_or_none()
+            
+            if task is not None:
+                record_task_event(db.session, 'updated', user.id, task.id, Task.serialize(task))
+                db.session.commit()
+                return task
+            
+            db.session.rollback()
         except Exception as e:
             db.session.rollback()
             raise DatabaseException(
                 message="Erro ao atualizar tarefa na base de dados",
                 details={"error": str(e)}
             )
+        
+        TaskService._raise_missing_or_forbidden(task_id, user)
     
     @staticmethod
     def delete_task(task_id: int, user: User) -> None:
@@ -153,7 +632,7 @@ class TaskService:
         Args:
             task_id: ID da tarefa
             user: Utilizador autenticado
-            
+        
         Raises:
             ResourceNotFoundException: Se tarefa não for encontrada
             AuthorizationException: Se tarefa não pertencer ao utilizador
@@ -162,7 +641,14 @@ class TaskService:
         task = TaskService.get_task_by_id(task_id, user)
         
         try:
+            version = TaskCounterService.apply_delta(
+                user.id,
+                total=-1,
+                completed=-1 if task.completed else 0
+            )
             db.session.delete(task)
+            db.session.add(TaskTombstone(task_id=task.id, user_id=user.id, change_seq=version))
+            record_task_event(db.session, 'deleted', user.id, task.id)
             db.session.commit()
         except Exception as e:
             db.session.rollback()
@@ -170,4 +656,328 @@ class TaskService:
                 message="Erro ao eliminar tarefa na base de dados",
                 details={"error": str(e)}
             )
-
+    
+    @staticmethod
+    def _bulk_error(index: int, op: TaskBulkOperation, error: AppException) -> Dict:
+        """Resultado de uma operação em lote que falhou"""
+        result = {'index': index, 'op': op.op, 'status': error.status_code.value, 'error': error.to_dict()}
+        if op.id is not None:
+            result['id'] = op.id
+        return result
+    
+    @staticmethod
+    def bulk_operations(operations: List[TaskBulkOperation], user: User) -> List[Dict]:
+        """
+        Executa um lote de criações, atualizações e eliminações de tarefas
+        
+        Os dados de cada operação são validados individualmente (TaskCreate /
+        TaskUpdate) e a posse das tarefas referenciadas é verificada com uma
+        única consulta. As operações válidas são aplicadas numa só transação:
+        um INSERT ... RETURNING para as criações, um UPDATE por chave primária
+        em executemany para as atualizações e um DELETE ... IN para as
+        eliminações. As operações inválidas não impedem as restantes.
+        
+        Antes de ler as tarefas referenciadas é bloqueada a linha dos
+        contadores do utilizador (apply_delta), que todas as escritas sobre
+        as tarefas bloqueiam primeiro: até ao commit nenhuma outra escrita as
+        altera, pelo que a variação de concluídas calculada a partir desta
+        leitura não se desvia. Uma atualização seguida de eliminação da mesma
+        tarefa no lote é indicada com deleted_by (índice da eliminação), sem
+        task nem evento de atualização.
+        
+        Args:
+            operations: Operações pela ordem recebida
+            user: Utilizador autenticado
+        
+        Returns:
+            list: Um resultado por operação, com index, op, status e task ou error
+        
+        Raises:
+            DatabaseException: Se houver erro ao aplicar o lote
+        """
+        results: List[Optional[Dict]] = [None] * len(operations)
+        
+        referenced_ids = {op.id for op in operations if op.op != 'create' and op.id is not None}
+        current: Dict[int, Dict] = {}
+        if referenced_ids:
+            try:
+                TaskCounterService.apply_delta(user.id)
+                rows = db.session.execute(
+                    select(
+                        Task.id, Task.title, Task.description, Task.completed,
+                        Task.created_at, Task.updated_at, Task.user_id
+                    ).where(Task.id.in_(referenced_ids))
+                ).mappings()
+                current = {row['id']: dict(row) for row in rows}
+            except Exception as e:
+                db.session.rollback()
+                raise DatabaseException(
+                    message="Erro ao processar operações em lote na base de dados",
+                    details={"error": str(e)}
+                )
+        
+        now = datetime.now(timezone.utc)
+        creates = []
+        updated_ids = []
+        # Índices dos resultados das atualizações de cada tarefa
+        update_results: Dict[int, List[int]] = {}
+        deleted_ids = []
+        completed_delta = 0
+        
+        for index, op in enumerate(operations):
+            if op.op == 'create':
+                try:
+                    task_data = TaskCreate(**op.data)
+                except ValidationError as e:
+                    results[index] = TaskService._bulk_error(index, op, ValidationException(
+                        details={'validation_errors': format_validation_errors(e)}
+                    ))
+                    continue
+                creates.append((index, {
+                    'title': task_data.title,
+                    'description': task_data.description,
+                    'completed': task_data.completed,
+                    'user_id': user.id
+                }))
+                continue
+            
+            if op.id is None:
+                results[index] = TaskService._bulk_error(index, op, ValidationException(
+                    message="O campo id é obrigatório para esta operação"
+                ))
+                continue
+            
+            task = current.get(op.id)
+            if task is None or task.get('deleted'):
+                results[index] = TaskService._bulk_error(index, op, ResourceNotFoundException(
+                    resource="Tarefa",
+                    details={"task_id": op.id}
+                ))
+                continue
+            if task['user_id'] != user.id:
+                results[index] = TaskService._bulk_error(index, op, AuthorizationException(
+                    message="Não tem permissão para aceder a esta tarefa",
+                    details={"task_id": op.id, "user_id": user.id}
+                ))
+                continue
+            
+            if op.op == 'delete':
+                task['deleted'] = True
+                deleted_ids.append(op.id)
+                if task['completed']:
+                    completed_delta -= 1
+                for update_index in update_results.pop(op.id, []):
+                    del results[update_index]['task']
+                    results[update_index]['deleted_by'] = index
+                results[index] = {'index': index, 'op': op.op, 'id': op.id, 'status': HTTPStatus.OK.value}
+                continue
+            
+            try:
+                task_data = TaskUpdate(**op.data)
+            except ValidationError as e:
+                results[index] = TaskService._bulk_error(index, op, ValidationException(
+                    details={'validation_errors': format_validation_errors(e)}
+                ))
+                continue
+            
+            if task_data.title is not None:
+                task['title'] = task_data.title
+            if task_data.description is not None:
+                task['description'] = task_data.description
+            if task_data.completed is not None and task_data.completed != task['completed']:
+                completed_delta += 1 if task_data.completed else -1
+                task['completed'] = task_data.completed
+            task['updated_at'] = now
+            if op.id not in updated_ids:
+                updated_ids.append(op.id)
+            update_results.setdefault(op.id, []).append(index)
+            results[index] = {
+                'index': index,
+                'op': op.op,
+                'id': op.id,
+                'status': HTTPStatus.OK.value,
+                'task': Task.serialize(task)
+            }
+        
+        # Uma tarefa atualizada e depois eliminada no mesmo lote só é eliminada
+        update_params = [
+            {
+                'id': task_id,
+                'title': current[task_id]['title'],
+                'description': current[task_id]['description'],
+                'completed': current[task_id]['completed'],
+                'updated_at': now
+            }
+            for task_id in updated_ids
+            if not current[task_id].get('deleted')
+        ]
+        completed_delta += sum(1 for _, params in creates if params['completed'])
+        
+        try:
+            version = TaskCounterService.apply_delta(
+                user.id,
+                total=len(creates) - len(deleted_ids),
+                completed=completed_delta
+            )
+            
+            if creates:
+                created_rows = db.session.execute(
+                    insert(Task).returning(
+                        Task.id, Task.created_at, Task.updated_at,
+                        sort_by_parameter_order=True
+                    ),
+                    [dict(params, change_seq=version) for _, params in creates]
+                ).all()
+                for (index, params), row in zip(creates, created_rows):
+                    task = dict(params, id=row.id, created_at=row.created_at, updated_at=row.updated_at)
+                    results[index] = {
+                        'index': index,
+                        'op': 'create',
+                        'id': row.id,
+                        'status': HTTPStatus.CREATED.value,
+                        'task': Task.serialize(task)
+                    }
+            
+            if update_params:
+                db.session.execute(
+                    update(Task),
+                    [dict(params, change_seq=version) for params in update_params]
+                )
+            
+            if deleted_ids:
+                db.session.execute(
+                    delete(Task)
+                    .where(Task.id.in_(deleted_ids), Task.user_id == user.id)
+                    .execution_options(synchronize_session=False)
+                )
+                db.session.execute(
+                    insert(TaskTombstone),
+                    [{'task_id': task_id, 'user_id': user.id, 'change_seq': version} for task_id in deleted_ids]
+                )
+            
+            for result in results:
+                if 'error' not in result and 'deleted_by' not in result:
+                    record_task_event(
+                        db.session,
+                        BULK_EVENT_TYPES[result['op']],
+                        user.id,
+                        result['id'],
+                        result.get('task')
+                    )
+            
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            raise DatabaseException(
+                message="Erro ao processar operações em lote na base de dados",
+                details={"error": str(e)}
+            )
+        
+        return results
+    
+    @staticmethod
+    def _import_error(line: int, error: AppException) -> Dict:
+        """Resultado de uma linha da importação que falhou"""
+        return {'line': line, 'status': error.status_code.value, 'error': error.to_dict()}
+    
+    @staticmethod
+    def _insert_import_batch(rows: List[Dict], user: User) -> None:
+        """Insere um lote da importação, com os contadores, numa transação"""
+        version = TaskCounterService.apply_delta(
+            user.id,
+            total=len(rows),
+            completed=sum(1 for row in rows if row['completed'])
+        )
+        db.session.execute(Task.__table__.insert(), [dict(row, change_seq=version) for row in rows])
+        # Um evento por lote; os streams sincronizam as tarefas por /changes
+        record_task_event(db.session, 'imported', user.id, None)
+        db.session.commit()
+    
+    @staticmethod
+    def import_tasks(
+        records: Iterable[Tuple[int, Optional[Dict], Optional[str]]],
+        user: User,
+        batch_size: int = 500,
+        max_errors: int = 100
+    ) -> Dict:
+        """
+        Cria tarefas a partir dos registos lidos de um ficheiro de importação
+        
+        Os registos são consumidos à medida que chegam: cada um é validado com
+        TaskCreate e as tarefas válidas são inseridas em lotes de batch_size
+        (INSERT de várias linhas), cada lote na sua própria transação. Assim
+        nem o ficheiro nem as tarefas ficam todos em memória; as linhas
+        inválidas não impedem as restantes.
+        
+        Args:
+            records: Tuplos (linha, dados, erro de leitura) pela ordem do ficheiro
+            user: Utilizador autenticado
+            batch_size: Tarefas por lote (e por transação)
+            max_errors: Número máximo de erros detalhados na resposta
+        
+        Returns:
+            dict: total, imported, failed, errors e errors_truncated
+        
+        Raises:
+            ValidationException: Se o ficheiro não puder ser lido até ao fim
+            DatabaseException: Se houver erro ao inserir um lote
+        
+        Nos dois casos os lotes anteriores ficam importados e o número de
+        tarefas importadas vem em details.imported.
+        """
+        batch_size = max(batch_size, 1)
+        summary = {'total': 0, 'imported': 0, 'failed': 0}
+        errors = []
+        batch = []
+        
+        def add_error(line: int, error: AppException) -> None:
+            summary['failed'] += 1
+            if len(errors) < max_errors:
+                errors.append(TaskService._import_error(line, error))
+        
+        def flush() -> None:
+            try:
+                TaskService._insert_import_batch(batch, user)
+            except Exception as e:
+                db.session.rollback()
+                raise DatabaseException(
+                    message="Erro ao importar tarefas na base de dados",
+                    details={"error": str(e), "imported": summary['imported']}
+                )
+            summary['imported'] += len(batch)
+            batch.clear()
+        
+        try:
+            for line, data, read_error in records:
+                summary['total'] += 1
+                if read_error is not None:
+                    add_error(line, ValidationException(message=read_error))
+                    continue
+                try:
+                    task_data = TaskCreate(**data)
+                except ValidationError as e:
+                    add_error(line, ValidationException(
+                        details={'validation_errors': format_validation_errors(e)}
+                    ))
+                    continue
+                
+                batch.append({
+                    'title': task_data.title,
+                    'description': task_data.description,
+                    'completed': task_data.completed,
+                    'user_id': user.id
+                })
+                if len(batch) >= batch_size:
+                    flush()
+        except ValidationException as e:
+            e.details['imported'] = summary['imported']
+            raise
+        
+        if batch:
+            flush()
+        
+        return {
+            **summary,
+            'errors': errors,
+            'errors_truncated': summary['failed'] > len(errors)
+        }
@@ -1,4 +1,3 @@
-from app.utils.security import verify_password, get_password_hash
-
-__all__ = ['verify_password', 'get_password_hash']
+from app.utils.security import verify_password, verify_and_update_password, get_password_hash
 
+__all__ = ['verify_password', 'verify_and_update_password', 'get_password_hash']
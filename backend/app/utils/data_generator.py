@@ -0,0 +1,207 @@
+"""Geração em massa de utilizadores e tarefas para testes de capacidade"""
+import csv
+import io
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.user import User
+from app.utils.security import get_password_hash
+
+USERNAME_PREFIX = 'scaleuser'
+DEFAULT_PASSWORD = 'Scale123!'
+TASK_COLUMNS = ('title', 'description', 'completed', 'created_at', 'updated_at', 'user_id')
+
+_VERBS = ('Rever', 'Preparar', 'Atualizar', 'Corrigir', 'Enviar', 'Planear', 'Testar', 'Documentar',
+          'Agendar', 'Validar', 'Migrar', 'Otimizar')
+_OBJECTS = ('relatório mensal', 'proposta do cliente', 'pipeline de deploy', 'testes de integração',
+            'reunião de equipa', 'orçamento trimestral', 'documentação da API', 'base de dados',
+            'contrato de fornecedor', 'apresentação', 'backlog do sprint', 'configuração do servidor')
+_DETAILS = ('Ver comentários da última revisão.', 'Prioridade alta esta semana.',
+            'Confirmar com a equipa antes de fechar.', 'Depende da aprovação do gestor.',
+            'Incluir métricas do último mês.', 'Verificar casos limite.')
+
+def parse_scale(value: str) -> Dict[str, int]:
+    """
+    Converte 'users=N,tasks_per_user=M' num dicionário
+    
+    Os valores aceitam os sufixos k e m (ex.: users=10k,tasks_per_user=1k).
+    
+    Raises:
+        ValueError: Se o formato ou as chaves forem inválidos
+    """
+    multipliers = {'k': 1_000, 'm': 1_000_000}
+    scale = {}
+    for item in value.split(','):
+        key, _, raw = item.partition('=')
+        key, raw = key.strip(), raw.strip().lower().replace('_', '')
+        if key not in ('users', 'tasks_per_user'):
+            raise ValueError(f"Chave inválida em --scale: {key} (válidas: users, tasks_per_user)")
+        multiplier = multipliers.get(raw[-1:], 1)
+        number = raw[:-1] if multiplier > 1 else raw
+        if not number.isdigit():
+            raise ValueError(f"Valor inválido em --scale: {item}")
+        scale[key] = int(number) * multiplier
+    if 'users' not in scale:
+        raise ValueError("--scale requer users=N")
+    scale.setdefault('tasks_per_user', 0)
+    return scale
+
+def _task_rows(rng: random.Random, user_id: int, count: int, now: datetime) -> Iterator[tuple]:
+    """Tarefas de um utilizador, com datas espalhadas pelo último ano"""
+    for _ in range(count):
+        created_at = now - timedelta(seconds=rng.randrange(365 * 24 * 3600))
+        updated_at = created_at + timedelta(seconds=rng.randrange(30 * 24 * 3600))
+        yield (
+            f"{rng.choice(_VERBS)} {rng.choice(_OBJECTS)}",
+            rng.choice(_DETAILS) if rng.random() < 0.7 else None,
+            rng.random() < 0.4,
+            created_at,
+            min(updated_at, now),
+            user_id
+        )
+
+def _copy_rows(connection, table: str, columns: tuple, rows: List[tuple]) -> bool:
+    """
+    Insere as linhas com COPY (PostgreSQL com psycopg2 ou psycopg 3)
+    
+    Returns:
+        bool: False se o driver não suportar COPY
+    """
+    driver = connection.dialect.driver
+    if connection.dialect.name != 'postgresql' or driver not in ('psycopg2', 'psycopg'):
+        return False
+    
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # NULL em CSV é um campo vazio sem aspas
+        writer.writerow(['' if value is None else value for value in row])
+    buffer.seek(0)
+    
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if driver == 'psycopg2':
+            cursor.copy_expert(statement, buffer)
+        else:
+            with cursor.copy(statement) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+    return True
+
+def _next_user_number() -> int:
+    """
+    Número seguinte ao maior sufixo de USERNAME_PREFIX já existente
+    
+    Usa o maior sufixo e não a contagem, que repetiria nomes depois de
+    eliminados utilizadores gerados. Os sufixos numéricos maiores têm mais
+    dígitos, por isso a ordenação é por comprimento e depois pelo nome.
+    """
+    usernames = db.session.execute(
+        select(User.username)
+        .where(User.username.startswith(USERNAME_PREFIX))
+        .order_by(func.length(User.username).desc(), User.username.desc())
+        .execution_options(yield_per=100)
+    ).scalars()
+    for username in usernames:
+        suffix = username[len(USERNAME_PREFIX):]
+        if suffix.isdigit():
+            usernames.close()
+            return int(suffix) + 1
+    return 0
+
+def _insert_tasks(rows: List[tuple]) -> None:
+    connection = db.session.connection()
+    if not _copy_rows(connection, Task.__tablename__, TASK_COLUMNS, rows):
+        db.session.execute(Task.__table__.insert(), [dict(zip(TASK_COLUMNS, row)) for row in rows])
+
+def generate_dataset(
+    users: int,
+    tasks_per_user: int,
+    batch_size: int = 10000,
+    password: str = DEFAULT_PASSWORD,
+    seed: Optional[int] = None,
+    progress: Optional[Callable[[int, int], None]] = None
+) -> Dict:
+    """
+    Gera utilizadores e tarefas em massa
+    
+    Todos os utilizadores partilham um hash calculado uma vez (sem bcrypt
+    por linha). As tarefas são inseridas em lotes de batch_size linhas, com
+    COPY em PostgreSQL e INSERT de várias linhas nos restantes casos, e os
+    contadores de tarefas são criados já com os totais. Cada lote é
+    confirmado (commit) antes do seguinte.
+    
+    Args:
+        users: Número de utilizadores a criar
+        tasks_per_user: Tarefas por utilizador
+        batch_size: Linhas por lote de inserção
+        password: Palavra-passe de todos os utilizadores gerados
+        seed: Semente do gerador aleatório (dados reprodutíveis)
+        progress: Chamado após cada lote com (utilizadores, tarefas) criados
+    
+    Returns:
+        dict: users, tasks, seconds e first_username
+    """
+    started = time.perf_counter()
+    rng = random.Random(seed)
+    hashed_password = get_password_hash(password)
+    now = datetime.now(timezone.utc)
+    
+    # Continua a numeração de gerações anteriores
+    offset = _next_user_number()
+    users_per_batch = max(1, min(users, batch_size // max(tasks_per_user, 1)))
+    created_users = created_tasks = 0
+    
+    while created_users < users:
+        count = min(users_per_batch, users - created_users)
+        numbers = range(offset + created_users, offset + created_users + count)
+        user_ids = db.session.execute(
+            insert(User).returning(User.id, sort_by_parameter_order=True),
+            [
+                {
+                    'username': f'{USERNAME_PREFIX}{n}',
+                    'email': f'{USERNAME_PREFIX}{n}@example.com',
+                    'hashed_password': hashed_password,
+                    'created_at': now
+                }
+                for n in numbers
+            ]
+        ).scalars().all()
+        
+        rows, counters = [], []
+        for user_id in user_ids:
+            # Um utilizador com mais de batch_size tarefas é inserido em vários lotes
+            completed = 0
+            for row in _task_rows(rng, user_id, tasks_per_user, now):
+                rows.append(row)
+                completed += row[2]
+                if len(rows) >= batch_size:
+                    _insert_tasks(rows)
+                    created_tasks += len(rows)
+                    rows = []
+            counters.append({'user_id': user_id, 'total': tasks_per_user, 'completed': completed})
+        if rows:
+            _insert_tasks(rows)
+            created_tasks += len(rows)
+        
+        db.session.execute(insert(TaskCounter), counters)
+        db.session.commit()
+        created_users += count
+        if progress:
+            progress(created_users, created_tasks)
+    
+    return {
+        'users': created_users,
+        'tasks': created_tasks,
+        'seconds': time.perf_counter() - started,
+        'first_username': f'{USERNAME_PREFIX}{offset}'
+    }
@@ -0,0 +1,121 @@
+"""Configuração e métricas do pool de ligações à base de dados"""
+import threading
+import time
+from typing import Any, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+class PoolWaitStats:
+    """Tempos de obtenção de ligações do pool, por processo"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+    
+    def record(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += elapsed
+            self.max_wait = max(self.max_wait, elapsed)
+    
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'wait_avg_ms': round(self.total_wait / attempts * 1000, 3) if attempts else 0.0,
+                'wait_max_ms': round(self.max_wait * 1000, 3)
+            }
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool que mede o tempo de obtenção de cada ligação
+    
+    O tempo inclui a espera por uma ligação livre e, quando o pool cresce,
+    a abertura da nova ligação. As esperas que excedem pool_timeout são
+    contadas como timeouts.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+    
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.wait_stats.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - started)
+        return connection
+
+def configure_engine_options(app) -> None:
+    """
+    Define SQLALCHEMY_ENGINE_OPTIONS a partir de DB_POOL_*
+    
+    Não se aplica ao SQLite, cujo pool é escolhido pelo Flask-SQLAlchemy.
+    As opções definidas explicitamente em SQLALCHEMY_ENGINE_OPTIONS têm
+    precedência.
+    """
+    uri = app.config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if uri.startswith('sqlite'):
+        return
+    
+    options = {
+        'poolclass': InstrumentedQueuePool,
+        'pool_size': app.config.get('DB_POOL_SIZE', 5),
+        'max_overflow': app.config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': app.config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': app.config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': app.config.get('DB_POOL_PRE_PING', True)
+    }
+    options.update(app.config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = options
+
+def get_pool_stats(engine) -> Dict[str, Any]:
+    """
+    Estado do pool de ligações do engine neste processo
+    
+    Returns:
+        dict: Classe do pool e, para QueuePool, tamanho, ligações em uso,
+        livres e em overflow, e os tempos de obtenção (se instrumentado)
+    """
+    pool = engine.pool
+    stats: Dict[str, Any] = {'class': type(pool).__name__}
+    
+    if isinstance(pool, QueuePool):
+        stats.update({
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'checked_in': pool.checkedin(),
+            'overflow': max(0, pool.overflow()),
+            'max_overflow': pool._max_overflow
+        })
+    
+    wait_stats = getattr(pool, 'wait_stats', None)
+    if wait_stats is not None:
+        stats.update(wait_stats.as_dict())
+    
+    return stats
+
+def dispose_engines(app) -> None:
+    """
+    Descarta as ligações herdadas do processo pai (após o fork)
+    
+    Com close=False as ligações do pai não são fechadas, apenas deixam de
+    ser usadas no processo filho, que abre as suas.
+    """
+    from app import db
+    
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -1,22 +1,59 @@
 from functools import wraps
-from flask import jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.models.user import User
+from app.utils.user_cache import CachedUser, get_user_cache
 from app import db
 
 def get_current_user():
-    """Obtém o utilizador atual a partir do token JWT"""
+    """
+    Obtém o utilizador atual a partir do token JWT
+    
+    Com AUTH_TRUST_JWT_CLAIMS, a identidade vem das claims do token sem
+    consultar a base de dados. Caso contrário, é usada a cache de
+    utilizadores (se ativa) antes de recorrer à base de dados.
+    """
     user_id = get_jwt_identity()
-    return User.query.get(user_id)
-
-def require_auth(f):
-    """Decorator para rotas que requerem autenticação"""
-    @wraps(f)
-    @jwt_required()
-    def decorated_function(*args, **kwargs):
-        current_user = get_current_user()
-        if not current_user:
-            return jsonify({'message': 'Utilizador não encontrado'}), 404
-        return f(current_user, *args, **kwargs)
-    return decorated_function
+    
+    if current_app.config.get('AUTH_TRUST_JWT_CLAIMS', False):
+        user = CachedUser.from_jwt_claims(user_id, get_jwt())
+        if user is not None:
+            return user
+    
+    cache = get_user_cache()
+    if cache is None:
+        return db.session.get(User, user_id)
+    
+    user = cache.get(user_id)
+    if user is not None:
+        return user
+    
+    db_user = db.session.get(User, user_id)
+    if db_user is None:
+        return None
+    
+    user = CachedUser.from_user(db_user)
+    cache.set(user)
+    return user
 
+def require_auth(f=None, *, locations=None):
+    """
+    Decorator para rotas que requerem autenticação
+    
+    Args:
+        locations: Onde procurar o token (ex.: ['headers', 'query_string']);
+            por omissão usa JWT_TOKEN_LOCATION
+    """
+    def decorator(f):
+        @wraps(f)
+        @jwt_required(locations=locations)
+        def decorated_function(*args, **kwargs):
+            current_user = get_current_user()
+            if not current_user:
+                return jsonify({'message': 'Utilizador não encontrado'}), 404
+            return f(current_user, *args, **kwargs)
+        return decorated_function
+    
+    if f is None:
+        return decorator
+    return decorator(f)
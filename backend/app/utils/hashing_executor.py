@@ -0,0 +1,180 @@
+"""Executor dedicado para operações de hash de palavras-passe"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional
+
+from app.exceptions.custom_exceptions import RateLimitExceededException, ServiceUnavailableException
+
+# Processos do pool por worker quando PASSWORD_HASH_WORKERS não é indicado;
+# fixo (e não cpu_count) para não multiplicar a memória por núcleos x workers
+DEFAULT_POOL_WORKERS = 1
+
+# Segundos indicados em Retry-After quando um hash excede o timeout
+HASH_RETRY_AFTER = 5
+
+def _timed_call(fn: Callable, *args):
+    """Executa fn no processo do pool e devolve (resultado, duração)"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+class PasswordHashingExecutor:
+    """
+    Executa hashes bcrypt fora das threads dos workers do Gunicorn
+    
+    Em modo 'process' as operações são submetidas a um pool de processos
+    (criado de forma preguiçosa em cada worker, após o fork). O número de
+    operações em curso é limitado a max_workers + max_queue; acima disso o
+    pedido é rejeitado com RateLimitExceededException (429) e, se o hash não
+    terminar dentro do timeout, com ServiceUnavailableException (503). Em
+    modo 'inline' (omissão) as operações correm na thread atual.
+    """
+    
+    def __init__(self, mode: str = 'inline', max_workers: Optional[int] = None,
+                 max_queue: int = 32, timeout: float = 30):
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_pid: Optional[int] = None
+        # Chamado com (tempo do hash, latência total) em cada operação concluída
+        self.observer: Optional[Callable[[float, float], None]] = None
+        self.configure(mode, max_workers, max_queue, timeout)
+    
+    def configure(self, mode: str = 'inline', max_workers: Optional[int] = None,
+                  max_queue: int = 32, timeout: float = 30) -> None:
+        """Configura o executor, descartando o pool existente se necessário"""
+        if mode not in ('inline', 'process'):
+            raise ValueError(f"Modo de hashing inválido: {mode}")
+        
+        with self._lock:
+            self._shutdown_pool()
+            self.mode = mode
+            self.max_workers = max_workers or DEFAULT_POOL_WORKERS
+            self.max_queue = max_queue
+            self.timeout = timeout
+            self._slots = threading.BoundedSemaphore(self.max_workers + self.max_queue)
+            self._reset_stats()
+    
+    def init_app(self, app) -> None:
+        """Configura o executor a partir da configuração da aplicação"""
+        self.configure(
+            mode=app.config.get('PASSWORD_HASH_EXECUTOR', 'inline'),
+            max_workers=app.config.get('PASSWORD_HASH_WORKERS'),
+            max_queue=app.config.get('PASSWORD_HASH_QUEUE_SIZE', 32),
+            timeout=app.config.get('PASSWORD_HASH_TIMEOUT', 30)
+        )
+    
+    def _reset_stats(self) -> None:
+        self._in_flight = 0
+        self._completed = 0
+        self._rejected = 0
+        self._hash_seconds_total = 0.0
+        self._hash_seconds_max = 0.0
+        self._latency_seconds_total = 0.0
+        self._latency_seconds_max = 0.0
+    
+    def _shutdown_pool(self) -> None:
+        if self._pool is not None and self._pool_pid == os.getpid():
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self._pool_pid = None
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            # Após o fork o pool herdado do processo pai não é utilizável
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+    
+    def _run_in_pool(self, fn: Callable, *args):
+        try:
+            future = self._get_pool().submit(_timed_call, fn, *args)
+        except BrokenProcessPool:
+            with self._lock:
+                self._shutdown_pool()
+            future = self._get_pool().submit(_timed_call, fn, *args)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Um hash já iniciado não pode ser interrompido; só sai da fila
+            future.cancel()
+            raise ServiceUnavailableException(
+                message="Servidor ocupado. Tente novamente dentro de instantes",
+                details={"reason": "password_hashing_timeout"},
+                retry_after=HASH_RETRY_AFTER
+            )
+    
+    def submit(self, fn: Callable, *args):
+        """
+        Executa fn(*args) no executor e aguarda o resultado
+        
+        Raises:
+            RateLimitExceededException: Se o executor estiver saturado
+            ServiceUnavailableException: Se o hash exceder o timeout
+        """
+        if self.mode == 'inline':
+            result, elapsed = _timed_call(fn, *args)
+            self._record(elapsed, elapsed)
+            return result
+        
+        slots = self._slots
+        if not slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            raise RateLimitExceededException(
+                message="Servidor ocupado. Tente novamente dentro de instantes",
+                details={"reason": "password_hashing_saturated"}
+            )
+        
+        with self._lock:
+            self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            result, hash_seconds = self._run_in_pool(fn, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            slots.release()
+        
+        self._record(hash_seconds, time.perf_counter() - started)
+        return result
+    
+    def _record(self, hash_seconds: float, latency_seconds: float) -> None:
+        with self._lock:
+            self._completed += 1
+            self._hash_seconds_total += hash_seconds
+            self._hash_seconds_max = max(self._hash_seconds_max, hash_seconds)
+            self._latency_seconds_total += latency_seconds
+            self._latency_seconds_max = max(self._latency_seconds_max, latency_seconds)
+        
+        if self.observer is not None:
+            self.observer(hash_seconds, latency_seconds)
+    
+    def get_stats(self) -> Dict:
+        """Métricas do executor (profundidade da fila e latência dos hashes)"""
+        with self._lock:
+            completed = self._completed
+            return {
+                'mode': self.mode,
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'queue_depth': max(0, self._in_flight - self.max_workers),
+                'completed': completed,
+                'rejected': self._rejected,
+                'hash_seconds_total': self._hash_seconds_total,
+                'hash_seconds_max': self._hash_seconds_max,
+                'hash_seconds_avg': self._hash_seconds_total / completed if completed else 0.0,
+                'latency_seconds_total': self._latency_seconds_total,
+                'latency_seconds_max': self._latency_seconds_max,
+                'latency_seconds_avg': self._latency_seconds_total / completed if completed else 0.0
+            }
+
+hashing_executor = PasswordHashingExecutor()
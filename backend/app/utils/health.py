@@ -0,0 +1,159 @@
+"""Verificações de saúde: estado da base de dados em cache e saturação do pool"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from app.utils.db_pool import get_pool_stats
+
+class DatabaseProbe:
+    """
+    Estado da ligação à base de dados, partilhado pelos pedidos do processo
+    
+    Os endpoints de saúde leem o último resultado em vez de executarem uma
+    query em cada pedido. Com refresh_interval > 0 o estado é atualizado
+    por uma thread em segundo plano; caso contrário, é atualizado pelo
+    primeiro pedido que o encontrar com mais de staleness segundos (os
+    pedidos concorrentes usam o resultado anterior). Um resultado mais
+    antigo do que staleness (por exemplo, com a base de dados bloqueada)
+    é marcado como desatualizado.
+    """
+    
+    def __init__(self, staleness: float = 10.0, refresh_interval: float = 0.0):
+        self._lock = threading.Lock()
+        self._probing = threading.Lock()
+        self._status: Optional[Dict] = None
+        self._checked_at = 0.0
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_pid: Optional[int] = None
+        self._stop = threading.Event()
+        self.configure(staleness, refresh_interval)
+    
+    def configure(self, staleness: float = 10.0, refresh_interval: float = 0.0) -> None:
+        self.staleness = staleness
+        self.refresh_interval = refresh_interval
+    
+    def init_app(self, app) -> None:
+        """Configura a verificação a partir da configuração da aplicação"""
+        self.stop()
+        self.configure(
+            staleness=app.config.get('HEALTH_DB_STALENESS', 10),
+            refresh_interval=app.config.get('HEALTH_DB_REFRESH_INTERVAL', 0)
+        )
+        with self._lock:
+            self._status = None
+            self._checked_at = 0.0
+    
+    def probe(self, engine) -> Dict:
+        """Executa SELECT 1 e guarda o resultado"""
+        started = time.perf_counter()
+        try:
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+            status = {'connected': True, 'latency_ms': round((time.perf_counter() - started) * 1000, 3)}
+        except Exception as e:
+            status = {'connected': False, 'error': str(e)}
+        
+        with self._lock:
+            self._status = status
+            self._checked_at = time.monotonic()
+        return status
+    
+    def get_status(self, engine) -> Dict:
+        """
+        Último estado conhecido da base de dados
+        
+        Returns:
+            dict: connected, age_seconds, stale e latency_ms ou error
+        """
+        if self.refresh_interval > 0:
+            self._ensure_refresher(engine)
+        
+        with self._lock:
+            never_checked = self._status is None
+            age = time.monotonic() - self._checked_at
+        
+        if (never_checked or (self.refresh_interval <= 0 and age >= self.staleness)) \
+                and self._probing.acquire(blocking=never_checked):
+            try:
+                self.probe(engine)
+            finally:
+                self._probing.release()
+        
+        with self._lock:
+            status = dict(self._status)
+            age = time.monotonic() - self._checked_at
+        
+        status['age_seconds'] = round(age, 3)
+        status['stale'] = age > self.staleness
+        return status
+    
+    def stop(self) -> None:
+        """Termina a thread de atualização (se existir)"""
+        self._stop.set()
+        self._refresher = None
+    
+    def _ensure_refresher(self, engine) -> None:
+        with self._lock:
+            # Após o fork a thread do processo pai não existe no worker
+            if self._refresher is not None and self._refresher_pid == os.getpid():
+                return
+            self._stop = threading.Event()
+            self._refresher = threading.Thread(
+                target=self._refresh,
+                args=(engine, self._stop),
+                name='health-db-probe',
+                daemon=True
+            )
+            self._refresher_pid = os.getpid()
+            self._refresher.start()
+    
+    def _refresh(self, engine, stop: threading.Event) -> None:
+        while not stop.wait(self.refresh_interval):
+            self.probe(engine)
+
+def pool_saturation(stats: Dict) -> Optional[float]:
+    """
+    Fração das ligações possíveis do pool que estão em uso
+    
+    Returns:
+        float ou None se o pool não tiver limite conhecido
+    """
+    if 'size' not in stats or stats.get('max_overflow', 0) < 0:
+        return None
+    capacity = stats['size'] + stats['max_overflow']
+    if capacity <= 0:
+        return None
+    return round(stats['checked_out'] / capacity, 3)
+
+def check_readiness(engine, saturation_threshold: float = 0.9) -> Tuple[bool, Dict]:
+    """
+    Indica se o processo pode receber tráfego
+    
+    Não está pronto se a base de dados estiver inacessível, se o último
+    estado conhecido estiver desatualizado ou se o pool estiver perto da
+    saturação (os pedidos seguintes ficariam à espera de uma ligação).
+    
+    Returns:
+        tuple: (pronto, detalhes)
+    """
+    database = db_probe.get_status(engine)
+    pool = get_pool_stats(engine)
+    pool['saturation'] = pool_saturation(pool)
+    
+    reasons: List[str] = []
+    if not database['connected']:
+        reasons.append('database_unavailable')
+    elif database['stale']:
+        reasons.append('database_status_stale')
+    if pool['saturation'] is not None and pool['saturation'] >= saturation_threshold:
+        reasons.append('pool_saturated')
+    
+    details = {'database': database, 'pool': pool}
+    if reasons:
+        details['reasons'] = reasons
+    return not reasons, details
+
+db_probe = DatabaseProbe()
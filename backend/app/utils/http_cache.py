@@ -0,0 +1,36 @@
+"""Utilitários para pedidos condicionais (ETag / If-None-Match)"""
+import hashlib
+from typing import Optional
+
+from flask import current_app, request
+
+def compute_etag(*parts) -> str:
+    """Calcula um ETag a partir das partes que identificam a representação"""
+    raw = ':'.join(str(part) for part in parts)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def apply_cache_headers(response, etag: str):
+    """
+    Define o ETag (fraco) e os headers de cache de uma resposta privada
+    
+    As respostas dependem do utilizador autenticado, pelo que variam com o
+    header Authorization e têm de ser revalidadas a cada utilização.
+    """
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    response.vary.add('Authorization')
+    return response
+
+def not_modified_response(etag: str) -> Optional[object]:
+    """
+    Devolve uma resposta 304 se o cliente já tiver a representação atual
+    
+    Args:
+        etag: ETag da representação atual
+    
+    Returns:
+        Response 304 ou None se o If-None-Match não corresponder
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return apply_cache_headers(current_app.response_class(status=304), etag)
@@ -0,0 +1,62 @@
+"""Fornecedores de JSON da aplicação"""
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependência opcional
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Fornecedor de JSON baseado em orjson
+    
+    Serializa diretamente para bytes e recorre ao conversor do fornecedor
+    por omissão para os tipos que o orjson não trata. As datas também passam
+    por esse conversor, para que a saída seja igual à do fornecedor por
+    omissão. Mantém as opções sort_keys e compact do Flask.
+    """
+    
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+    
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        options = self._options(indent=bool(kwargs.get('indent')))
+        return orjson.dumps(obj, default=self.default, option=options).decode()
+    
+    def loads(self, s, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+    
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=self.default, option=self._options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
+JSON_PROVIDERS = {
+    'default': DefaultJSONProvider,
+    'orjson': OrjsonProvider
+}
+
+def configure_json_provider(app) -> None:
+    """
+    Regista o fornecedor de JSON indicado em JSON_PROVIDER
+    
+    Se for pedido orjson e o pacote não estiver instalado, mantém-se o
+    fornecedor por omissão.
+    """
+    name = app.config.get('JSON_PROVIDER', 'default')
+    if name not in JSON_PROVIDERS:
+        raise ValueError(f"Fornecedor de JSON inválido: {name}")
+    
+    if name == 'orjson' and orjson is None:
+        app.logger.warning("orjson não está instalado; a usar o fornecedor de JSON por omissão")
+        return
+    
+    app.json = JSON_PROVIDERS[name](app)
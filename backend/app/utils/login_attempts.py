@@ -1,60 +1,299 @@
-from datetime import datetime, timedelta, timezone
-from typing import Dict
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+class LoginAttemptStore(ABC):
+    """
+    Interface de armazenamento das tentativas de login
+    
+    Cada chave guarda no máximo max_attempts instantes de falha (buffer
+    circular) e, opcionalmente, o instante até ao qual está bloqueada.
+    Todos os instantes são timestamps epoch em segundos.
+    """
+    
+    def __init__(self, max_attempts: int = 5, window_seconds: float = 900):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+    
+    @abstractmethod
+    def add_failure(self, key: str, now: float) -> int:
+        """Regista uma falha e devolve o número de falhas dentro da janela"""
+    
+    @abstractmethod
+    def count_failures(self, key: str, now: float) -> int:
+        """Número de falhas dentro da janela"""
+    
+    @abstractmethod
+    def set_blocked(self, key: str, until: float) -> None:
+        """Bloqueia a chave até ao instante until"""
+    
+    @abstractmethod
+    def get_blocked_until(self, key: str) -> Optional[float]:
+        """Instante até ao qual a chave está bloqueada (None se não estiver)"""
+    
+    @abstractmethod
+    def clear(self, key: str) -> None:
+        """Remove as falhas e o bloqueio da chave"""
+    
+    @abstractmethod
+    def sweep(self, now: float) -> int:
+        """Remove entradas expiradas e devolve quantas foram removidas"""
+
+class InMemoryLoginAttemptStore(LoginAttemptStore):
+    """
+    Armazenamento em memória do processo, limitado em tamanho
+    
+    As falhas de cada chave ficam num deque(maxlen=max_attempts), pelo que
+    cada verificação é O(1). As entradas expiradas são removidas por
+    varrimentos periódicos e, acima de max_entries, são descartadas as
+    falhas menos recentes (LRU).
+    
+    Os bloqueios ficam num mapa à parte que nunca perde bloqueios ativos:
+    falhar logins com muitos nomes diferentes não consegue empurrar para
+    fora o bloqueio de outro utilizador. Acima de max_entries são removidos
+    os bloqueios já expirados; os ativos são limitados pelo próprio
+    mecanismo (cada um exige max_attempts falhas dentro da janela).
+    """
+    
+    def __init__(self, max_attempts: int = 5, window_seconds: float = 900,
+                 max_entries: int = 10000, sweep_interval: float = 60):
+        super().__init__(max_attempts, window_seconds)
+        self.max_entries = max_entries
+        self.sweep_interval = sweep_interval
+        self._failures: 'OrderedDict[str, deque]' = OrderedDict()
+        self._blocked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = 0.0
+    
+    def _maybe_sweep(self, now: float) -> None:
+        if now >= self._next_sweep:
+            self._sweep_locked(now)
+            self._next_sweep = now + self.sweep_interval
+    
+    def _count_recent(self, failures: deque, now: float) -> int:
+        return sum(1 for failed_at in failures if now - failed_at < self.window_seconds)
+    
+    def add_failure(self, key: str, now: float) -> int:
+        with self._lock:
+            self._maybe_sweep(now)
+            failures = self._failures.get(key)
+            if failures is None:
+                failures = deque(maxlen=self.max_attempts)
+                self._failures[key] = failures
+                while len(self._failures) > self.max_entries:
+                    self._failures.popitem(last=False)
+            else:
+                self._failures.move_to_end(key)
+            
+            failures.append(now)
+            return self._count_recent(failures, now)
+    
+    def count_failures(self, key: str, now: float) -> int:
+        with self._lock:
+            failures = self._failures.get(key)
+            return self._count_recent(failures, now) if failures else 0
+    
+    def set_blocked(self, key: str, until: float) -> None:
+        with self._lock:
+            if key not in self._blocked and len(self._blocked) >= self.max_entries:
+                now = time.time()
+                for expired in [k for k, blocked_until in self._blocked.items() if blocked_until <= now]:
+                    del self._blocked[expired]
+            self._blocked[key] = until
+    
+    def get_blocked_until(self, key: str) -> Optional[float]:
+        with self._lock:
+            return self._blocked.get(key)
+    
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._failures.pop(key, None)
+            self._blocked.pop(key, None)
+    
+    def _sweep_locked(self, now: float) -> int:
+        expired_failures = [
+            key for key, failures in self._failures.items()
+            if not failures or now - failures[-1] >= self.window_seconds
+        ]
+        for key in expired_failures:
+            del self._failures[key]
+        expired_blocks = [key for key, blocked_until in self._blocked.items() if blocked_until <= now]
+        for key in expired_blocks:
+            del self._blocked[key]
+        return len(expired_failures) + len(expired_blocks)
+    
+    def sweep(self, now: float) -> int:
+        with self._lock:
+            return self._sweep_locked(now)
+    
+    def __len__(self):
+        with self._lock:
+            return len(self._failures.keys() | self._blocked.keys())
+
+class SQLiteLoginAttemptStore(LoginAttemptStore):
+    """
+    Armazenamento partilhado entre workers num ficheiro SQLite (modo WAL)
+    
+    Cada chave é uma linha com as falhas (no máximo max_attempts) e o
+    bloqueio; as leituras e escritas são por chave primária, O(1).
+    """
+    
+    def __init__(self, path: str, max_attempts: int = 5, window_seconds: float = 900,
+                 sweep_interval: float = 60):
+        super().__init__(max_attempts, window_seconds)
+        self.path = path
+        self.sweep_interval = sweep_interval
+        self._local = threading.local()
+        self._next_sweep = 0.0
+        self._connect().execute(
+            'CREATE TABLE IF NOT EXISTS login_attempts ('
+            ' key TEXT PRIMARY KEY,'
+            ' failures TEXT NOT NULL,'
+            ' blocked_until REAL,'
+            ' updated_at REAL NOT NULL)'
+        )
+    
+    def _connect(self) -> sqlite3.Connection:
+        # Uma ligação por thread e por processo (os workers são criados por fork)
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+    
+    def _load(self, conn, key: str) -> Tuple[list, Optional[float]]:
+        row = conn.execute(
+            'SELECT failures, blocked_until FROM login_attempts WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return [], None
+        failures = [float(value) for value in row[0].split(',') if value]
+        return failures, row[1]
+    
+    def _recent(self, failures: list, now: float) -> list:
+        return [failed_at for failed_at in failures if now - failed_at < self.window_seconds]
+    
+    def add_failure(self, key: str, now: float) -> int:
+        conn = self._connect()
+        if now >= self._next_sweep:
+            self._next_sweep = now + self.sweep_interval
+            self.sweep(now)
+        
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            failures, blocked_until = self._load(conn, key)
+            failures = (self._recent(failures, now) + [now])[-self.max_attempts:]
+            conn.execute(
+                'INSERT INTO login_attempts (key, failures, blocked_until, updated_at) '
+                'VALUES (?, ?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET failures = excluded.failures, '
+                'updated_at = excluded.updated_at',
+                (key, ','.join(repr(value) for value in failures), blocked_until, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(failures)
+    
+    def count_failures(self, key: str, now: float) -> int:
+        failures, _ = self._load(self._connect(), key)
+        return len(self._recent(failures, now))
+    
+    def set_blocked(self, key: str, until: float) -> None:
+        self._connect().execute(
+            'INSERT INTO login_attempts (key, failures, blocked_until, updated_at) '
+            'VALUES (?, \'\', ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET blocked_until = excluded.blocked_until',
+            (key, until, time.time())
+        )
+    
+    def get_blocked_until(self, key: str) -> Optional[float]:
+        return self._load(self._connect(), key)[1]
+    
+    def clear(self, key: str) -> None:
+        self._connect().execute('DELETE FROM login_attempts WHERE key = ?', (key,))
+    
+    def sweep(self, now: float) -> int:
+        cursor = self._connect().execute(
+            'DELETE FROM login_attempts WHERE updated_at <= ? '
+            'AND (blocked_until IS NULL OR blocked_until <= ?)',
+            (now - self.window_seconds, now)
+        )
+        return cursor.rowcount
 
 class LoginAttemptTracker:
-    def __init__(self):
-        self._attempts: Dict[str, list] = {}
-        self._blocked: Dict[str, datetime] = {}
+    def __init__(self, store: Optional[LoginAttemptStore] = None, max_attempts: int = 5,
+                 window: timedelta = timedelta(minutes=15),
+                 block_duration: timedelta = timedelta(minutes=15)):
+        self.max_attempts = max_attempts
+        self.window = window
+        self.block_duration = block_duration
+        self.store = store or InMemoryLoginAttemptStore(
+            max_attempts=max_attempts,
+            window_seconds=window.total_seconds()
+        )
+    
+    def init_app(self, app) -> None:
+        """Configura o armazenamento a partir da configuração da aplicação"""
+        backend = app.config.get('LOGIN_ATTEMPTS_BACKEND', 'memory')
+        window_seconds = self.window.total_seconds()
+        
+        if backend == 'sqlite':
+            path = app.config.get('LOGIN_ATTEMPTS_SQLITE_PATH') or os.path.join(
+                tempfile.gettempdir(), 'taskmanager_login_attempts.db'
+            )
+            self.store = SQLiteLoginAttemptStore(
+                path,
+                max_attempts=self.max_attempts,
+                window_seconds=window_seconds
+            )
+        elif backend == 'memory':
+            self.store = InMemoryLoginAttemptStore(
+                max_attempts=self.max_attempts,
+                window_seconds=window_seconds,
+                max_entries=app.config.get('LOGIN_ATTEMPTS_MAX_ENTRIES', 10000)
+            )
+        else:
+            raise ValueError(f"Backend de tentativas de login inválido: {backend}")
     
     def is_blocked(self, username: str) -> bool:
-        if username in self._blocked:
-            if datetime.now(timezone.utc) < self._blocked[username]:
+        blocked_until = self.store.get_blocked_until(username)
+        if blocked_until is not None:
+            if time.time() < blocked_until:
                 return True
             else:
-                del self._blocked[username]
-                if username in self._attempts:
-                    del self._attempts[username]
+                self.store.clear(username)
         return False
     
     def record_failed_attempt(self, username: str) -> None:
-        now = datetime.now(timezone.utc)
-        
-        if username not in self._attempts:
-            self._attempts[username] = []
-        
-        self._attempts[username] = [
-            attempt for attempt in self._attempts[username]
-            if now - attempt < timedelta(minutes=15)
-        ]
-        
-        self._attempts[username].append(now)
+        now = time.time()
+        failures = self.store.add_failure(username, now)
         
-        if len(self._attempts[username]) >= 5:
-            self._blocked[username] = now + timedelta(minutes=15)
+        if failures >= self.max_attempts:
+            self.store.set_blocked(username, now + self.block_duration.total_seconds())
     
     def record_successful_login(self, username: str) -> None:
-        if username in self._attempts:
-            del self._attempts[username]
-        if username in self._blocked:
-            del self._blocked[username]
+        self.store.clear(username)
     
     def get_remaining_attempts(self, username: str) -> int:
-        if username not in self._attempts:
-            return 5
-        
-        now = datetime.now(timezone.utc)
-        recent_attempts = [
-            attempt for attempt in self._attempts[username]
-            if now - attempt < timedelta(minutes=15)
-        ]
-        
-        return max(0, 5 - len(recent_attempts))
+        failures = self.store.count_failures(username, time.time())
+        return max(0, self.max_attempts - failures)
     
     def get_block_time_remaining(self, username: str) -> int:
-        if username in self._blocked:
-            remaining = (self._blocked[username] - datetime.now(timezone.utc)).total_seconds()
+        blocked_until = self.store.get_blocked_until(username)
+        if blocked_until is not None:
+            remaining = blocked_until - time.time()
             return max(0, int(remaining / 60))
         return 0
 
 login_tracker = LoginAttemptTracker()
-
@@ -0,0 +1,149 @@
+"""Métricas da aplicação no formato Prometheus"""
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+from flask import g, request
+
+try:
+    import prometheus_client
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - dependência opcional
+    prometheus_client = None
+
+from app.utils.query_tracker import get_request_queries, register_query_hooks, start_request_tracking
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50, 100)
+QUERY_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+HASH_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0, 10.0)
+
+# Endpoint dos pedidos que não correspondem a nenhuma rota (evita uma série por URL)
+UNMATCHED_ENDPOINT = 'unmatched'
+
+class AppMetrics:
+    """
+    Métricas dos pedidos, da base de dados, do hashing e dos erros
+    
+    As métricas são criadas uma vez por processo no registo global do
+    prometheus_client. Com PROMETHEUS_MULTIPROC_DIR definido (Gunicorn com
+    vários workers) cada worker escreve os valores em ficheiros nesse
+    diretório e /metrics agrega os de todos os workers.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self._metrics: Optional[Dict] = None
+    
+    def init_app(self, app) -> None:
+        """Ativa a recolha de métricas na aplicação (METRICS_ENABLED)"""
+        from app.utils.hashing_executor import hashing_executor
+        
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        if self.enabled and prometheus_client is None:
+            app.logger.warning("prometheus-client não está instalado; métricas desativadas")
+            self.enabled = False
+        if self.enabled and not app.config.get('METRICS_TOKEN') and os.getenv('FLASK_ENV') == 'production':
+            # Em produção o /metrics nunca fica público
+            app.logger.warning("METRICS_TOKEN não definido; métricas desativadas em produção")
+            self.enabled = False
+        if not self.enabled:
+            hashing_executor.observer = None
+            return
+        
+        self._create_metrics()
+        register_query_hooks()
+        hashing_executor.observer = self.observe_password_hash
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+    
+    def _create_metrics(self) -> None:
+        if self._metrics is not None:
+            return
+        self._metrics = {
+            'request_latency': Histogram(
+                'http_request_duration_seconds',
+                'Latência dos pedidos HTTP por endpoint',
+                ['endpoint', 'method', 'status'],
+                buckets=LATENCY_BUCKETS
+            ),
+            'db_queries': Histogram(
+                'db_queries_per_request',
+                'Número de queries SQL por pedido',
+                ['endpoint'],
+                buckets=QUERY_COUNT_BUCKETS
+            ),
+            'db_time': Histogram(
+                'db_query_seconds_per_request',
+                'Tempo total em queries SQL por pedido',
+                ['endpoint'],
+                buckets=QUERY_TIME_BUCKETS
+            ),
+            'hash_time': Histogram(
+                'password_hash_duration_seconds',
+                'Tempo de CPU de cada hash de palavra-passe',
+                buckets=HASH_BUCKETS
+            ),
+            'hash_latency': Histogram(
+                'password_hash_latency_seconds',
+                'Latência de cada hash de palavra-passe, incluindo a espera no executor',
+                buckets=HASH_BUCKETS
+            ),
+            'errors': Counter(
+                'app_errors_total',
+                'Respostas de erro por código de erro',
+                ['error_code', 'status']
+            )
+        }
+    
+    def _before_request(self) -> None:
+        g._metrics_started = time.perf_counter()
+        start_request_tracking()
+    
+    def _after_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is None:
+            return response
+        
+        endpoint = request.endpoint or UNMATCHED_ENDPOINT
+        status = response.status_code
+        metrics = self._metrics
+        metrics['request_latency'].labels(endpoint, request.method, str(status)).observe(
+            time.perf_counter() - started
+        )
+        
+        queries = get_request_queries()
+        if queries is not None:
+            metrics['db_queries'].labels(endpoint).observe(queries.count)
+            metrics['db_time'].labels(endpoint).observe(queries.total_seconds)
+        
+        if status >= 400:
+            error_code = g.pop('_metrics_error_code', None) or f'HTTP_{status}'
+            metrics['errors'].labels(error_code, str(status)).inc()
+        return response
+    
+    def record_error(self, error_code: str) -> None:
+        """Regista o código de erro da resposta atual (contado no fim do pedido)"""
+        if self.enabled:
+            g._metrics_error_code = error_code
+    
+    def observe_password_hash(self, hash_seconds: float, latency_seconds: float) -> None:
+        self._metrics['hash_time'].observe(hash_seconds)
+        self._metrics['hash_latency'].observe(latency_seconds)
+    
+    def render(self) -> Tuple[bytes, str]:
+        """
+        Exposição das métricas no formato de texto do Prometheus
+        
+        Returns:
+            tuple: (corpo, content type)
+        """
+        if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = prometheus_client.REGISTRY
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+metrics = AppMetrics()
@@ -0,0 +1,36 @@
+"""Aplicação das migrações da base de dados (Alembic)"""
+import os
+
+from alembic import command
+from alembic.config import Config as AlembicConfig
+from sqlalchemy import inspect
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'alembic.ini')
+
+# Revisão correspondente ao esquema criado por db.create_all() antes das migrações
+LEGACY_REVISION = '0001'
+
+def run_migrations(engine) -> bool:
+    """
+    Aplica as migrações pendentes
+    
+    Bases de dados criadas com db.create_all() (sem tabela alembic_version)
+    são marcadas com a revisão inicial; as migrações seguintes só criam os
+    objetos em falta.
+    
+    Returns:
+        bool: True se o esquema existente foi marcado com a revisão inicial
+    """
+    alembic_config = AlembicConfig(ALEMBIC_INI)
+    alembic_config.attributes['configure_logger'] = False
+    stamped = False
+    
+    with engine.begin() as connection:
+        alembic_config.attributes['connection'] = connection
+        inspector = inspect(connection)
+        if inspector.has_table('users') and not inspector.has_table('alembic_version'):
+            command.stamp(alembic_config, LEGACY_REVISION)
+            stamped = True
+        command.upgrade(alembic_config, 'head')
+    
+    return stamped
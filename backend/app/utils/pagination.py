@@ -0,0 +1,70 @@
+"""Utilitários de paginação por cursor (keyset)"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List
+
+from app.exceptions.custom_exceptions import ValidationException
+
+def encode_cursor(values: List[Any]) -> str:
+    """
+    Codifica os valores da chave de ordenação num cursor opaco
+    
+    Args:
+        values: Valores da última linha devolvida (ex.: [created_at, id])
+    
+    Returns:
+        str: Cursor em base64 url-safe, sem padding
+    """
+    serializable = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    raw = json.dumps(serializable, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Descodifica um cursor gerado por encode_cursor
+    
+    Args:
+        cursor: Cursor opaco recebido do cliente
+        size: Número de valores esperados no cursor
+    
+    Returns:
+        list: Valores da chave de ordenação
+    
+    Raises:
+        ValidationException: Se o cursor for inválido
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationException(
+            message="Cursor de paginação inválido",
+            details={"cursor": cursor}
+        )
+    
+    if not isinstance(values, list) or len(values) != size:
+        raise ValidationException(
+            message="Cursor de paginação inválido",
+            details={"cursor": cursor}
+        )
+    
+    return values
+
+def parse_cursor_datetime(value: Any, cursor: str) -> datetime:
+    """
+    Converte um valor ISO 8601 de um cursor para datetime
+    
+    Raises:
+        ValidationException: Se o valor não for uma data válida
+    """
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValidationException(
+            message="Cursor de paginação inválido",
+            details={"cursor": cursor}
+        )
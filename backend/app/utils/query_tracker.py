@@ -0,0 +1,82 @@
+"""Contagem e tempo das queries SQL executadas em cada pedido"""
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from flask import has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Guardado no environ do pedido: o g é partilhado pelos pedidos feitos dentro
+# de um mesmo contexto da aplicação (ex.: testes com o contexto já ativo)
+_STATS_KEY = 'taskmanager.query_stats'
+_STARTED_KEY = '_query_started'
+
+class QueryStats:
+    """Queries executadas durante um pedido"""
+    
+    __slots__ = ('count', 'total_seconds', 'statements')
+    
+    def __init__(self, track_statements: bool = False):
+        self.count = 0
+        self.total_seconds = 0.0
+        self.statements: Optional[Counter] = Counter() if track_statements else None
+    
+    def record(self, statement: str, parameters, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        if self.statements is not None:
+            self.statements[statement] += 1
+    
+    def duplicates(self, min_count: int = 2) -> Dict[str, int]:
+        """Queries executadas pelo menos min_count vezes (só com track_statements)"""
+        if not self.statements:
+            return {}
+        return {statement: n for statement, n in self.statements.most_common() if n >= min_count}
+
+def start_request_tracking(statements: bool = False) -> QueryStats:
+    """
+    Começa a contar as queries do pedido atual (idempotente)
+    
+    Args:
+        statements: Guardar também quantas vezes cada query foi executada
+    """
+    stats = request.environ.get(_STATS_KEY)
+    if stats is None:
+        stats = QueryStats(track_statements=statements)
+        request.environ[_STATS_KEY] = stats
+    elif statements and stats.statements is None:
+        stats.statements = Counter()
+    return stats
+
+def get_request_queries() -> Optional[QueryStats]:
+    """Queries do pedido atual, ou None fora de um pedido ou sem contagem ativa"""
+    if not has_request_context():
+        return None
+    return request.environ.get(_STATS_KEY)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if get_request_queries() is not None:
+        conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED_KEY)
+    if started:
+        elapsed = time.perf_counter() - started.pop()
+        stats = get_request_queries()
+        if stats is not None:
+            stats.record(statement, parameters, elapsed)
+
+def _discard_on_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_STARTED_KEY):
+        connection.info[_STARTED_KEY].pop()
+
+def register_query_hooks() -> None:
+    """Mede todas as queries executadas pelos engines durante os pedidos"""
+    if event.contains(Engine, 'before_cursor_execute', _before_cursor_execute):
+        return
+    
+    event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(Engine, 'handle_error', _discard_on_error)
@@ -1,14 +1,142 @@
+import math
+import statistics
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
 from passlib.context import CryptContext
+from passlib.registry import get_crypt_handler
+from app.utils.hashing_executor import hashing_executor
+
+DEFAULT_SCHEMES = ('bcrypt',)
+DEFAULT_BCRYPT_ROUNDS = 12
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+
+@lru_cache(maxsize=8)
+def build_context(schemes: Tuple[str, ...], bcrypt_rounds: int) -> CryptContext:
+    """
+    Cria o CryptContext da política de hashing
+    
+    O primeiro esquema é usado nos novos hashes; os restantes ficam
+    obsoletos e são migrados no próximo login (verify_and_update). Hashes
+    bcrypt com custo inferior são migrados; com custo superior são mantidos,
+    para que workers com políticas diferentes não os alternem entre si.
+    """
+    return CryptContext(
+        schemes=list(schemes),
+        deprecated="auto",
+        bcrypt__default_rounds=bcrypt_rounds,
+        bcrypt__min_rounds=bcrypt_rounds
+    )
+
+# Política atual (esquemas, rounds bcrypt); enviada a cada operação para que os
+# processos do executor usem a mesma configuração que o worker
+_policy: Tuple[Tuple[str, ...], int] = (DEFAULT_SCHEMES, DEFAULT_BCRYPT_ROUNDS)
+
+pwd_context = build_context(*_policy)
+
+def get_hash_policy() -> Tuple[Tuple[str, ...], int]:
+    return _policy
+
+def set_hash_policy(schemes: Tuple[str, ...], bcrypt_rounds: int) -> None:
+    """
+    Define a política de hashing
+    
+    Raises:
+        RuntimeError: Se algum esquema não tiver backend instalado
+    """
+    global _policy, pwd_context
+    
+    for scheme in schemes:
+        if not get_crypt_handler(scheme).has_backend():
+            raise RuntimeError(f"Esquema de hashing sem backend instalado: {scheme}")
+    
+    _policy = (tuple(schemes), bcrypt_rounds)
+    pwd_context = build_context(*_policy)
 
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__rounds=12
-)
+# Resultados da calibração neste processo, por latência alvo
+_calibrated_rounds: Dict[float, int] = {}
+
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = MIN_BCRYPT_ROUNDS,
+    max_rounds: int = MAX_BCRYPT_ROUNDS,
+    samples: int = 3
+) -> int:
+    """
+    Escolhe o custo bcrypt cujo tempo de hash mais se aproxima do alvo
+    
+    Mede o custo mínimo neste host e extrapola (cada round duplica o custo),
+    escolhendo o maior número de rounds que não ultrapassa o alvo.
+    
+    Args:
+        target_ms: Latência alvo de um hash em milissegundos
+        min_rounds: Custo mínimo aceitável
+        max_rounds: Custo máximo aceitável
+        samples: Número de medições (usa-se a mediana)
+    
+    Returns:
+        int: Número de rounds bcrypt
+    """
+    context = build_context(('bcrypt',), min_rounds)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.hash('calibration-password')
+        timings.append((time.perf_counter() - started) * 1000)
+    
+    base_ms = statistics.median(timings)
+    if base_ms <= 0 or target_ms <= base_ms:
+        return min_rounds
+    
+    rounds = min_rounds + int(math.floor(math.log2(target_ms / base_ms)))
+    return max(min_rounds, min(max_rounds, rounds))
+
+def configure_password_hashing(app) -> None:
+    """
+    Aplica a política de hashing da configuração, calibrando o custo se pedido
+    
+    A calibração é feita uma vez por processo (com preload, no master do
+    Gunicorn) e nunca desce abaixo de PASSWORD_HASH_BCRYPT_ROUNDS.
+    """
+    schemes = tuple(
+        scheme.strip()
+        for scheme in app.config.get('PASSWORD_HASH_SCHEMES', 'bcrypt').split(',')
+        if scheme.strip()
+    ) or DEFAULT_SCHEMES
+    rounds = app.config.get('PASSWORD_HASH_BCRYPT_ROUNDS', DEFAULT_BCRYPT_ROUNDS)
+    
+    if app.config.get('PASSWORD_HASH_CALIBRATE', False):
+        target_ms = app.config.get('PASSWORD_HASH_TARGET_MS', 250)
+        if target_ms not in _calibrated_rounds:
+            _calibrated_rounds[target_ms] = calibrate_bcrypt_rounds(target_ms)
+            app.logger.info(f"Custo bcrypt calibrado: {_calibrated_rounds[target_ms]} rounds")
+        rounds = max(rounds, _calibrated_rounds[target_ms])
+    
+    set_hash_policy(schemes, rounds)
+
+def _verify(policy, plain_password: str, hashed_password: str) -> bool:
+    return build_context(*policy).verify(plain_password, hashed_password)
+
+def _verify_and_update(policy, plain_password: str, hashed_password: str):
+    return build_context(*policy).verify_and_update(plain_password, hashed_password)
+
+def _hash(policy, password: str) -> str:
+    return build_context(*policy).hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing_executor.submit(_verify, _policy, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verifica a palavra-passe e, se o hash estiver desatualizado face à
+    política atual (esquema ou custo), devolve também um novo hash
+    
+    Returns:
+        tuple: (válida, novo hash ou None)
+    """
+    return hashing_executor.submit(_verify_and_update, _policy, plain_password, hashed_password)
 
+def get_password_hash(password: str) -> str:
+    return hashing_executor.submit(_hash, _policy, password)
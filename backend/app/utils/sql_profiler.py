@@ -0,0 +1,97 @@
+"""Perfil das queries SQL de cada pedido: Server-Timing, queries repetidas (N+1) e orçamentos"""
+import time
+from typing import List, Optional
+
+from flask import current_app, g, request
+
+from app.utils.query_tracker import QueryStats, get_request_queries, register_query_hooks, start_request_tracking
+
+# Caracteres de uma query mostrados nos avisos e nas falhas de orçamento
+STATEMENT_PREVIEW_LENGTH = 120
+
+def _preview(statement: str) -> str:
+    statement = ' '.join(statement.split())
+    if len(statement) > STATEMENT_PREVIEW_LENGTH:
+        return statement[:STATEMENT_PREVIEW_LENGTH] + '...'
+    return statement
+
+def format_server_timing(stats: QueryStats, total_seconds: float) -> str:
+    """
+    Valor do header Server-Timing de um pedido
+    
+    Exemplo: db;dur=1.52;desc="4 queries", app;dur=8.03
+    """
+    return (
+        f'db;dur={stats.total_seconds * 1000:.2f};desc="{stats.count} queries", '
+        f'app;dur={total_seconds * 1000:.2f}'
+    )
+
+def check_query_budget(stats: QueryStats, max_queries: Optional[int] = None,
+                       max_repeats: Optional[int] = None) -> List[str]:
+    """
+    Compara as queries de um pedido com um orçamento
+    
+    Args:
+        stats: Queries do pedido (com track_statements para max_repeats)
+        max_queries: Número máximo de queries
+        max_repeats: Número máximo de execuções da mesma query
+    
+    Returns:
+        list: Descrição de cada limite ultrapassado (vazia se cumprir)
+    """
+    problems = []
+    if max_queries is not None and stats.count > max_queries:
+        problems.append(f"{stats.count} queries (máximo {max_queries})")
+    if max_repeats is not None:
+        for statement, n in stats.duplicates(max_repeats + 1).items():
+            problems.append(f"{n}x {_preview(statement)} (máximo {max_repeats})")
+    return problems
+
+class SQLProfiler:
+    """
+    Perfil opcional (SQL_PROFILING) das queries de cada pedido
+    
+    Acrescenta às respostas o header Server-Timing com o número de queries,
+    o tempo passado na base de dados e o tempo total do pedido, e regista um
+    aviso quando a mesma query é executada SQL_PROFILING_DUPLICATE_THRESHOLD
+    vezes ou mais no mesmo pedido (padrão típico de N+1). Guarda o texto de
+    cada query, por isso fica desativado por omissão em produção.
+    """
+    
+    def __init__(self):
+        self.enabled = False
+        self.duplicate_threshold = 3
+    
+    def init_app(self, app) -> None:
+        """Ativa o perfil das queries na aplicação (SQL_PROFILING)"""
+        self.enabled = app.config.get('SQL_PROFILING', False)
+        self.duplicate_threshold = app.config.get('SQL_PROFILING_DUPLICATE_THRESHOLD', 3)
+        if not self.enabled:
+            return
+        
+        register_query_hooks()
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+    
+    def _before_request(self) -> None:
+        g._profiler_started = time.perf_counter()
+        start_request_tracking(statements=True)
+    
+    def _after_request(self, response):
+        started = g.pop('_profiler_started', None)
+        stats = get_request_queries()
+        if started is None or stats is None:
+            return response
+        
+        response.headers.add('Server-Timing', format_server_timing(stats, time.perf_counter() - started))
+        
+        duplicates = stats.duplicates(self.duplicate_threshold)
+        if duplicates:
+            current_app.logger.warning(
+                "Queries repetidas em %s %s (%s): %s",
+                request.method, request.path, request.endpoint,
+                '; '.join(f"{n}x {_preview(statement)}" for statement, n in duplicates.items())
+            )
+        return response
+
+sql_profiler = SQLProfiler()
@@ -0,0 +1,237 @@
+"""Publicação de eventos das tarefas para os streams SSE"""
+import json
+import logging
+import os
+import queue
+import select
+import threading
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func, select as sql_select
+from sqlalchemy.orm import Session
+
+from app.exceptions.custom_exceptions import ServiceUnavailableException
+
+logger = logging.getLogger(__name__)
+
+_PENDING_KEY = 'task_events'
+
+# Limite do payload do NOTIFY do PostgreSQL (8000 bytes), com margem
+MAX_NOTIFY_PAYLOAD = 7500
+
+# Segundos indicados em Retry-After quando o limite de streams é atingido
+STREAM_RETRY_AFTER = 30
+
+class Subscription:
+    """
+    Subscrição de um stream aos eventos de um utilizador
+    
+    Os eventos ficam numa fila limitada. Se o cliente não os consumir a
+    tempo, os novos eventos são descartados e a subscrição fica marcada
+    como overflowed: o stream deve pedir ao cliente uma ressincronização.
+    """
+    
+    def __init__(self, user_id: int, max_queue: int = 100):
+        self.user_id = user_id
+        self.overflowed = False
+        self._queue: 'queue.Queue[Dict]' = queue.Queue(maxsize=max_queue)
+    
+    def put(self, task_event: Dict) -> None:
+        try:
+            self._queue.put_nowait(task_event)
+        except queue.Full:
+            self.overflowed = True
+    
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Aguarda o próximo evento (None se expirar o tempo)"""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class TaskEventBroker:
+    """
+    Pub/sub em memória dos eventos das tarefas, por utilizador
+    
+    Os eventos são registados na sessão durante a escrita e só são
+    publicados quando a transação é confirmada. Com o backend 'local' são
+    entregues aos streams deste processo; com 'postgres' são enviados por
+    NOTIFY dentro da própria transação e cada worker recebe-os (incluindo
+    os seus) através de uma thread em LISTEN, o que faz chegar os eventos
+    aos streams de todos os workers.
+    
+    Cada stream ocupa uma thread do worker (exceto com gevent), pelo que o
+    número de subscrições por processo é limitado a max_streams (None = sem
+    limite); acima disso subscribe rejeita o pedido com 503.
+    """
+    
+    def __init__(self, backend: str = 'local', channel: str = 'task_events', max_queue: int = 100,
+                 max_streams: Optional[int] = None):
+        self._lock = threading.Lock()
+        self._subscriptions: Dict[int, set] = {}
+        self._listener: Optional[threading.Thread] = None
+        self._listener_pid: Optional[int] = None
+        self.configure(backend, channel, max_queue, max_streams)
+    
+    def configure(self, backend: str = 'local', channel: str = 'task_events', max_queue: int = 100,
+                  max_streams: Optional[int] = None) -> None:
+        if backend not in ('local', 'postgres'):
+            raise ValueError(f"Backend de eventos inválido: {backend}")
+        self.backend = backend
+        self.channel = channel
+        self.max_queue = max_queue
+        self.max_streams = max_streams
+    
+    def init_app(self, app) -> None:
+        """Configura o broker a partir da configuração da aplicação"""
+        self.configure(
+            backend=app.config.get('TASK_EVENTS_BACKEND', 'local'),
+            channel=app.config.get('TASK_EVENTS_CHANNEL', 'task_events'),
+            max_queue=app.config.get('TASK_EVENTS_QUEUE_SIZE', 100),
+            max_streams=app.config.get('TASK_EVENTS_MAX_STREAMS')
+        )
+        register_session_hooks()
+    
+    def subscribe(self, user_id: int, engine=None) -> Subscription:
+        """
+        Cria uma subscrição aos eventos do utilizador
+        
+        Args:
+            user_id: ID do utilizador
+            engine: Engine da base de dados (necessário com o backend 'postgres')
+        
+        Raises:
+            ServiceUnavailableException: Se o processo já tiver max_streams streams abertos
+        """
+        subscription = Subscription(user_id, self.max_queue)
+        with self._lock:
+            open_streams = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+            if self.max_streams is not None and open_streams >= self.max_streams:
+                raise ServiceUnavailableException(
+                    message="Demasiados streams abertos. Tente novamente mais tarde",
+                    details={"max_streams": self.max_streams},
+                    retry_after=STREAM_RETRY_AFTER
+                )
+            self._subscriptions.setdefault(user_id, set()).add(subscription)
+        
+        if self.backend == 'postgres' and engine is not None:
+            self._ensure_listener(engine)
+        return subscription
+    
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+    
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+    
+    def deliver(self, task_event: Dict) -> None:
+        """Entrega um evento aos streams deste processo"""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(task_event['user_id'], ()))
+        for subscription in subscriptions:
+            subscription.put(task_event)
+    
+    def _notify(self, session: Session, events: List[Dict]) -> None:
+        for task_event in events:
+            payload = json.dumps(task_event, separators=(',', ':'), default=str)
+            if len(payload.encode('utf-8')) > MAX_NOTIFY_PAYLOAD:
+                # Sem os dados da tarefa; o cliente obtém-na por /changes
+                payload = json.dumps(
+                    {key: value for key, value in task_event.items() if key != 'task'},
+                    separators=(',', ':'),
+                    default=str
+                )
+            session.execute(sql_select(func.pg_notify(self.channel, payload)))
+    
+    def _ensure_listener(self, engine) -> None:
+        with self._lock:
+            # Após o fork a thread do processo pai não existe no worker
+            if self._listener is not None and self._listener_pid == os.getpid():
+                return
+            self._listener = threading.Thread(
+                target=self._listen,
+                args=(engine,),
+                name='task-events-listener',
+                daemon=True
+            )
+            self._listener_pid = os.getpid()
+            self._listener.start()
+    
+    def _listen(self, engine) -> None:
+        """Recebe os NOTIFY do canal e entrega-os aos streams locais"""
+        while True:
+            connection = None
+            try:
+                raw = engine.raw_connection()
+                raw.detach()
+                connection = raw.dbapi_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                
+                while True:
+                    if select.select([connection], [], [], 30) == ([], [], []):
+                        continue
+                    connection.poll()
+                    while connection.notifies:
+                        notification = connection.notifies.pop(0)
+                        try:
+                            self.deliver(json.loads(notification.payload))
+                        except (ValueError, KeyError):
+                            logger.warning("Evento de tarefa inválido: %s", notification.payload)
+            except Exception as e:
+                logger.warning("Ligação LISTEN de eventos perdida: %s", e)
+                if connection is not None:
+                    try:
+                        connection.close()
+                    except Exception:
+                        pass
+                threading.Event().wait(5)
+
+def record_task_event(session: Session, event_type: str, user_id: int,
+                      task_id: Optional[int], task: Optional[Dict] = None) -> None:
+    """
+    Regista um evento de tarefa, publicado apenas se a transação for confirmada
+    
+    Args:
+        session: Sessão da escrita
+        event_type: 'created', 'updated', 'deleted' ou 'imported' (lote de
+            tarefas importadas, sem task_id: o cliente sincroniza por /changes)
+        user_id: Dono da tarefa
+        task_id: ID da tarefa (None em 'imported')
+        task: Tarefa serializada (exceto em eliminações)
+    """
+    task_event = {'type': event_type, 'user_id': user_id, 'task_id': task_id}
+    if task is not None:
+        task_event['task'] = task
+    session.info.setdefault(_PENDING_KEY, []).append(task_event)
+
+def _notify_before_commit(session):
+    if task_events.backend == 'postgres' and session.info.get(_PENDING_KEY):
+        task_events._notify(session, session.info[_PENDING_KEY])
+
+def _publish_after_commit(session):
+    events = session.info.pop(_PENDING_KEY, None)
+    if events and task_events.backend == 'local':
+        for task_event in events:
+            task_events.deliver(task_event)
+
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def register_session_hooks() -> None:
+    """Publica os eventos registados quando as transações são confirmadas"""
+    if event.contains(Session, 'after_commit', _publish_after_commit):
+        return
+    
+    event.listen(Session, 'before_commit', _notify_before_commit)
+    event.listen(Session, 'after_commit', _publish_after_commit)
+    event.listen(Session, 'after_rollback', _discard_after_rollback)
+
+task_events = TaskEventBroker()
@@ -0,0 +1,39 @@
+"""Formatação da exportação de tarefas (GET /api/tasks/export) em NDJSON ou CSV"""
+import csv
+import io
+from typing import Callable, Iterable, Iterator, List
+
+from app.models.task import Task, TASK_COLUMNS
+
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'tasks.ndjson'),
+    'csv': ('text/csv; charset=utf-8', 'tasks.csv')
+}
+
+def ndjson_chunks(batches: Iterable[List], dumps: Callable[[dict], str]) -> Iterator[str]:
+    """Uma tarefa JSON por linha; cada lote de linhas é emitido num só bloco"""
+    for batch in batches:
+        yield ''.join(f"{dumps(Task.serialize(row))}\n" for row in batch)
+
+def csv_chunks(batches: Iterable[List]) -> Iterator[str]:
+    """
+    Cabeçalho com TASK_COLUMNS seguido das tarefas, um bloco por lote
+    
+    completed é escrito como true/false e os valores nulos como campo vazio.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+    
+    writer.writerow(TASK_COLUMNS)
+    for batch in batches:
+        for row in batch:
+            task = Task.serialize(row)
+            task['completed'] = 'true' if task['completed'] else 'false'
+            writer.writerow([task[column] for column in TASK_COLUMNS])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Sem tarefas: apenas o cabeçalho
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -0,0 +1,121 @@
+"""Leitura incremental dos ficheiros de importação de tarefas (POST /api/tasks/import)"""
+import csv
+import json
+from typing import IO, Dict, Iterator, Optional, Tuple
+
+from app.exceptions.custom_exceptions import ValidationException
+
+IMPORT_MIMETYPES = {
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'text/csv': 'csv'
+}
+IMPORT_EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv'}
+
+# Colunas usadas na criação; as restantes (ex.: id e datas de uma exportação) são ignoradas
+IMPORT_FIELDS = ('title', 'description', 'completed')
+
+# (linha, registo, erro): registo None se a linha não puder ser lida
+ImportRecord = Tuple[int, Optional[Dict], Optional[str]]
+
+def resolve_import_format(requested: Optional[str], mimetype: str, filename: Optional[str] = None) -> str:
+    """
+    Formato do ficheiro: parâmetro format, Content-Type ou extensão do ficheiro
+    
+    Raises:
+        ValidationException: Se o formato não for reconhecido
+    """
+    if requested:
+        import_format = requested.lower()
+    else:
+        import_format = IMPORT_MIMETYPES.get(mimetype)
+        if import_format is None and filename:
+            extension = filename[filename.rfind('.'):].lower() if '.' in filename else ''
+            import_format = IMPORT_EXTENSIONS.get(extension)
+    
+    if import_format not in ('ndjson', 'csv'):
+        raise ValidationException(
+            message="Formato de importação inválido",
+            details={"format": import_format or mimetype, "allowed": ['csv', 'ndjson']}
+        )
+    return import_format
+
+def _decode_error(line_number: int) -> ValidationException:
+    return ValidationException(
+        message="O ficheiro deve estar codificado em UTF-8",
+        details={"line": line_number}
+    )
+
+def _skip_rest_of_line(stream: IO[str], chunk_size: int) -> None:
+    """Descarta o resto da linha atual, em blocos de chunk_size caracteres"""
+    chunk = stream.readline(chunk_size)
+    while chunk and not chunk.endswith('\n'):
+        chunk = stream.readline(chunk_size)
+
+def iter_ndjson_records(stream: IO[str], max_line_length: Optional[int] = None) -> Iterator[ImportRecord]:
+    """
+    Um objeto JSON por linha; as linhas vazias são ignoradas
+    
+    Com max_line_length, cada linha é lida no máximo até esse número de
+    caracteres: uma linha maior é registada como erro dessa linha e o resto
+    é descartado sem ser carregado em memória.
+    """
+    # Mais dois caracteres para o fim de linha (\r\n)
+    limit = max_line_length + 2 if max_line_length else -1
+    line_number = 0
+    try:
+        while True:
+            line = stream.readline(limit)
+            if not line:
+                break
+            line_number += 1
+            if max_line_length and len(line.rstrip('\r\n')) > max_line_length:
+                if not line.endswith('\n'):
+                    _skip_rest_of_line(stream, limit)
+                yield line_number, None, f'Linha demasiado longa (máximo {max_line_length} caracteres)'
+                continue
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                yield line_number, None, 'JSON inválido'
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, 'Cada linha deve conter um objeto JSON'
+                continue
+            yield line_number, record, None
+    except UnicodeDecodeError:
+        raise _decode_error(line_number + 1)
+
+def iter_csv_records(stream: IO[str]) -> Iterator[ImportRecord]:
+    """
+    Linhas de um CSV com cabeçalho, que tem de incluir a coluna title
+    
+    Os campos vazios são omitidos (valores por omissão de TaskCreate). O
+    número de linha é o da primeira linha física do registo.
+    
+    Raises:
+        ValidationException: Sem coluna title ou com CSV mal formado
+    """
+    reader = csv.DictReader(stream)
+    try:
+        if 'title' not in (reader.fieldnames or []):
+            raise ValidationException(
+                message="O CSV deve ter um cabeçalho com a coluna title",
+                details={"columns": reader.fieldnames or []}
+            )
+        
+        last_line = reader.line_num
+        for row in reader:
+            line_number, last_line = last_line + 1, reader.line_num
+            yield line_number, {
+                field: row[field] for field in IMPORT_FIELDS if row.get(field) not in (None, '')
+            }, None
+    except UnicodeDecodeError:
+        raise _decode_error(reader.line_num + 1)
+    except csv.Error as e:
+        raise ValidationException(
+            message="CSV mal formado",
+            details={"line": reader.line_num, "error": str(e)}
+        )
@@ -0,0 +1,143 @@
+"""Cache em memória dos utilizadores autenticados"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+class CachedUser:
+    """Representação leve do utilizador autenticado, sem ligação à sessão"""
+    __slots__ = ('id', 'username', 'email', 'created_at')
+    
+    def __init__(self, id: int, username: str, email: str, created_at: Optional[str] = None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.created_at = created_at
+    
+    @classmethod
+    def from_user(cls, user) -> 'CachedUser':
+        """Cria a representação a partir de um modelo User"""
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            created_at=user.created_at.isoformat() if user.created_at else None
+        )
+    
+    @classmethod
+    def from_jwt_claims(cls, user_id: int, claims: dict) -> Optional['CachedUser']:
+        """Cria a representação a partir das claims do token (None se faltarem)"""
+        if not claims.get('username') or not claims.get('email'):
+            return None
+        return cls(
+            id=user_id,
+            username=claims['username'],
+            email=claims['email'],
+            created_at=claims.get('created_at')
+        )
+    
+    def __repr__(self):
+        return f'<CachedUser {self.username}>'
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'created_at': self.created_at
+        }
+
+class UserCache:
+    """Cache LRU limitada, com expiração por TTL, de utilizadores autenticados"""
+    
+    def __init__(self, max_size: int = 1024, ttl: float = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[int, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, user_id: int) -> Optional[CachedUser]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+            
+            user, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return user
+    
+    def set(self, user: CachedUser) -> None:
+        with self._lock:
+            self._entries[user.id] = (user, time.monotonic() + self.ttl)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self):
+        return len(self._entries)
+
+def init_user_cache(app) -> Optional[UserCache]:
+    """Cria a cache de utilizadores da aplicação (se ativa)"""
+    if not app.config.get('USER_CACHE_ENABLED', True):
+        return None
+    
+    cache = UserCache(
+        max_size=app.config.get('USER_CACHE_MAX_SIZE', 1024),
+        ttl=app.config.get('USER_CACHE_TTL', 60)
+    )
+    app.extensions['user_cache'] = cache
+    return cache
+
+def get_user_cache() -> Optional[UserCache]:
+    """Obtém a cache de utilizadores da aplicação atual"""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('user_cache')
+
+_PENDING_KEY = 'user_cache_invalidations'
+
+def _mark_for_invalidation(mapper, connection, target):
+    session = Session.object_session(target)
+    if session is not None:
+        session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+def _invalidate_after_commit(session):
+    user_ids = session.info.pop(_PENDING_KEY, None)
+    cache = get_user_cache()
+    if user_ids and cache is not None:
+        for user_id in user_ids:
+            cache.invalidate(user_id)
+
+def _discard_after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+
+def register_invalidation_hooks(user_model) -> None:
+    """Invalida a cache quando um utilizador é alterado ou eliminado"""
+    if event.contains(user_model, 'after_update', _mark_for_invalidation):
+        return
+    
+    event.listen(user_model, 'after_update', _mark_for_invalidation)
+    event.listen(user_model, 'after_delete', _mark_for_invalidation)
+    event.listen(Session, 'after_commit', _invalidate_after_commit)
+    event.listen(Session, 'after_rollback', _discard_after_rollback)
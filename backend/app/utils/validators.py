@@ -1,6 +1,7 @@
 """Utilitários de validação e sanitização"""
 import re
-from typing import Optional
+from typing import List, Optional
+from pydantic import ValidationError
 
 class InputValidator:
     """Classe para validação e sanitização de inputs"""
@@ -82,3 +83,21 @@ class InputValidator:
         sanitized = re.sub(r'<[^>]+>', '', sanitized)
         return sanitized.strip()
 
+def format_validation_errors(error: ValidationError) -> List[dict]:
+    """
+    Converte os erros de validação do Pydantic num formato serializável
+    
+    Args:
+        error: Exceção de validação do Pydantic
+    
+    Returns:
+        list: Erros com localização, mensagem e tipo
+    """
+    return [
+        {
+            'loc': list(item.get('loc', [])),
+            'msg': str(item.get('msg', '')),
+            'type': str(item.get('type', ''))
+        }
+        for item in error.errors()
+    ]
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+"""
+Benchmark do custo de serialização de uma página de tarefas
+Compara instâncias ORM + to_dict + json da biblioteca padrão com linhas
+projetadas + Task.serialize + orjson, para páginas de 100 tarefas
+
+Uso:
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --per-page 100 --repeat 200
+"""
+import os
+import statistics
+import sys
+import time
+
+# Adicionar diretório pai ao path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from app import create_app, db
+from app.models.user import User
+from app.models.task import Task
+from app.services.task_service import TaskService
+from app.utils.json_provider import JSON_PROVIDERS
+from app.utils.user_cache import CachedUser
+from config import Config
+import argparse
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_EXECUTOR = 'inline'
+    RATELIMIT_ENABLED = False
+
+
+def measure(fn, repeat):
+    """Executa fn repeat vezes e devolve a mediana em milissegundos"""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run(per_page=100, repeat=200):
+    """Mede o custo por página dos dois caminhos de listagem"""
+    app = create_app(BenchmarkConfig)
+    
+    with app.app_context():
+        db.create_all()
+        user = User(username='bench', email='bench@example.com', hashed_password='x')
+        db.session.add(user)
+        db.session.commit()
+        db.session.add_all([
+            Task(
+                title=f'Tarefa {i}',
+                description='Descrição da tarefa de benchmark ' * 4,
+                completed=i % 3 == 0,
+                user_id=user.id
+            )
+            for i in range(per_page)
+        ])
+        db.session.commit()
+        
+        # Representação usada pelas rotas autenticadas (sem ligação à sessão)
+        current_user = CachedUser.from_user(user)
+        default_json = JSON_PROVIDERS['default'](app)
+        fast_json = JSON_PROVIDERS['orjson'](app)
+        
+        def orm_rows():
+            db.session.expunge_all()
+            return Task.query.filter_by(user_id=current_user.id).order_by(
+                Task.created_at.desc()
+            ).limit(per_page).all()
+        
+        def projected_rows():
+            return TaskService.get_user_tasks(current_user, 1, per_page)['tasks']
+        
+        # A primeira listagem inicializa os contadores (commit)
+        projected_page = projected_rows()
+        orm_page = orm_rows()
+        
+        results = [
+            ('ORM + to_dict + json', lambda: default_json.response(
+                {'tasks': [task.to_dict() for task in orm_rows()]}
+            )),
+            ('Colunas + serialize + orjson', lambda: fast_json.response(
+                {'tasks': [Task.serialize(task) for task in projected_rows()]}
+            )),
+            ('Só serialização: to_dict + json', lambda: default_json.response(
+                {'tasks': [task.to_dict() for task in orm_page]}
+            )),
+            ('Só serialização: serialize + orjson', lambda: fast_json.response(
+                {'tasks': [Task.serialize(task) for task in projected_page]}
+            ))
+        ]
+        
+        print(f"📊 Custo por página de {per_page} tarefas (mediana de {repeat} execuções)")
+        for name, fn in results:
+            print(f"   - {name}: {measure(fn, repeat):.3f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Benchmark de serialização das listagens de tarefas'
+    )
+    parser.add_argument('--per-page', type=int, default=100, help='Tarefas por página')
+    parser.add_argument('--repeat', type=int, default=200, help='Número de execuções')
+    
+    args = parser.parse_args()
+    run(per_page=args.per_page, repeat=args.repeat)
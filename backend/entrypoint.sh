@@ -3,9 +3,9 @@
 
 set -e
 
-echo "🔧 Verificando/Inicializando banco de dados..."
+echo "🔧 A aplicar migrações da base de dados..."
 
-# Executar inicialização do banco de dados
+# Aplicar migrações (uma vez por deploy; os workers não tocam no esquema)
 python scripts/init_db.py
 
 echo "✅ Banco de dados pronto!"
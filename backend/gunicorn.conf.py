@@ -3,7 +3,9 @@ Configuração do Gunicorn para produção
 Otimizado para o plano gratuito do Render (512MB RAM)
 """
 import os
-import multiprocessing
+import shutil
+import sys
+import tempfile
 
 # Endereço de binding
 bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
@@ -13,12 +15,30 @@ bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
 # Para Render free tier (CPU compartilhada), usar 2 workers
 workers = int(os.getenv('GUNICORN_WORKERS', '2'))
 
-# Tipo de worker (sync para Flask simples)
-worker_class = 'sync'
+# Tipo de worker
+# gevent (omissão): cada ligação é uma greenlet, pelo que um worker mantém
+# milhares de streams SSE (/api/tasks/stream) inativos
+# sync/gthread: uma thread por pedido; cada stream ocupa uma thread durante
+# toda a ligação
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gevent')
 
-# Número de threads por worker
+# Número de threads por worker (sync/gthread)
 threads = int(os.getenv('GUNICORN_THREADS', '2'))
 
+# Ligações simultâneas por worker (gevent)
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# Streams SSE abertos por worker (TASK_EVENTS_MAX_STREAMS); acima disso
+# /api/tasks/stream responde 503. Com threads, cada stream ocupa uma thread
+# durante toda a ligação: fica sempre pelo menos uma livre para a API (com
+# uma só thread os streams ficam desativados). Com gevent cada stream é uma
+# greenlet e o limite é metade das ligações do worker.
+if worker_class == 'gevent':
+    max_streams = worker_connections // 2
+else:
+    max_streams = threads - 1
+os.environ.setdefault('TASK_EVENTS_MAX_STREAMS', str(max(max_streams, 0)))
+
 # Timeout para requests (em segundos)
 timeout = 120
 
@@ -38,15 +58,41 @@ errorlog = '-'   # STDERR
 loglevel = os.getenv('LOG_LEVEL', 'info')
 
 # Formato de log
-access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+# Sem a query string (%(r)s/%(q)s): o stream SSE recebe o token em ?jwt=
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s" %(D)s'
+
+# Métricas Prometheus (/metrics) agregadas por todos os workers
+# Cada worker escreve as métricas em ficheiros neste diretório; tem de ser
+# definido antes de a aplicação ser carregada. Só é limpo no arranque do
+# master (on_starting): este ficheiro é relido em cada HUP, com os workers
+# ainda a escrever
+prometheus_multiproc_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR') or os.path.join(
+    tempfile.gettempdir(), 'taskmanager_prometheus'
+)
+os.makedirs(prometheus_multiproc_dir, exist_ok=True)
+os.environ['PROMETHEUS_MULTIPROC_DIR'] = prometheus_multiproc_dir
 
 # Pre-load da aplicação (otimização de memória)
-preload_app = True
+# Com gevent a aplicação é carregada em cada worker, depois do monkey patching.
+# Sem preload cada worker cria a sua aplicação: o rate limiting shm:// deixa
+# de ser partilhado entre workers (use redis://) e PASSWORD_HASH_CALIBRATE
+# calibraria o custo do bcrypt em cada worker (fixe PASSWORD_HASH_BCRYPT_ROUNDS)
+preload_app = worker_class != 'gevent'
+
+# A memória partilhada do rate limiting (shm://) só é herdada pelos workers
+# com preload; sem ele cada worker teria os seus contadores e o limite
+# efetivo seria multiplicado pelo número de workers
+if not preload_app and os.getenv('RATELIMIT_STORAGE_URI', '').startswith('shm://'):
+    print("⚠️ RATELIMIT_STORAGE_URI=shm:// requer preload_app: a usar memory:// (contadores por worker); use redis:// para limites partilhados")
+    os.environ['RATELIMIT_STORAGE_URI'] = 'memory://'
 
 # Callbacks para gestão de workers
 def on_starting(server):
     """Executado quando o Gunicorn inicia"""
     print("🚀 Gunicorn a iniciar...")
+    # Métricas de uma execução anterior (PIDs que já não existem)
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir, exist_ok=True)
 
 def on_reload(server):
     """Executado quando a aplicação recarrega"""
@@ -54,7 +100,32 @@ def on_reload(server):
 
 def when_ready(server):
     """Executado quando o Gunicorn está pronto"""
-    print(f"✅ Gunicorn pronto! Workers: {workers}, Threads: {threads}")
+    print(f"✅ Gunicorn pronto! Workers: {workers}, Worker class: {worker_class}, Threads: {threads}")
+
+def post_fork(server, worker):
+    """Executado em cada worker após o fork"""
+    # Com preload_app a aplicação foi criada no master: as ligações abertas
+    # lá não podem ser partilhadas entre workers
+    main = sys.modules.get('main')
+    if main is not None:
+        from app.utils.db_pool import dispose_engines
+        dispose_engines(main.app)
+    
+    if worker_class == 'gevent':
+        # Torna o psycopg2 cooperativo com as greenlets do gevent
+        try:
+            from psycogreen.gevent import patch_psycopg
+            patch_psycopg()
+        except ImportError:
+            print("⚠️ psycogreen não instalado: as queries bloqueiam o worker gevent")
+
+def child_exit(server, worker):
+    """Executado no master quando um worker termina"""
+    try:
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
+    except ImportError:
+        pass
 
 def worker_int(worker):
     """Executado quando um worker recebe SIGINT"""
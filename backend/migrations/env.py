@@ -0,0 +1,66 @@
+"""
+Ambiente das migrações Alembic
+
+Usa o engine e os metadados da aplicação. Quem chama pode fornecer uma
+ligação já aberta em config.attributes['connection'] (testes, init_db).
+"""
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+
+# Adicionar diretório do backend ao path (alembic executado pela linha de comandos)
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from app import create_app, db
+import app.models  # noqa: F401 - regista todos os modelos nos metadados
+
+config = context.config
+
+if config.config_file_name is not None and config.attributes.get('configure_logger', True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = db.metadata
+
+def run_migrations_offline() -> None:
+    """Gera o SQL das migrações sem ligação à base de dados (alembic upgrade --sql)"""
+    flask_app = create_app()
+    context.configure(
+        url=flask_app.config['SQLALCHEMY_DATABASE_URI'],
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={'paramstyle': 'named'}
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_with(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == 'sqlite'
+    )
+    
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Aplica as migrações numa ligação à base de dados"""
+    connection = config.attributes.get('connection')
+    if connection is not None:
+        run_migrations_with(connection)
+        return
+    
+    flask_app = create_app()
+    with flask_app.app_context():
+        with db.engine.connect() as connection:
+            run_migrations_with(connection)
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,91 @@
+"""Contadores de tarefas, registo de eliminações e sequência de alterações
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17 10:05:00
+
+O cursor de /api/tasks/changes é a versão dos contadores do utilizador,
+gravada em change_seq nas tarefas e nos registos de eliminação. As tarefas
+existentes recebem o seu id como sequência e a versão dos contadores nunca
+fica abaixo da maior sequência.
+
+As bases de dados criadas com db.create_all() em versões anteriores podem
+já ter parte destes objetos, pelo que só são criados os que faltam.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+def _column_names(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+def _index_names(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    
+    if 'change_seq' not in _column_names(inspector, 'tasks'):
+        with op.batch_alter_table('tasks') as batch_op:
+            batch_op.add_column(sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+        op.execute("UPDATE tasks SET change_seq = id")
+    if 'idx_user_change_seq' not in _index_names(inspector, 'tasks'):
+        op.create_index('idx_user_change_seq', 'tasks', ['user_id', 'change_seq'])
+    
+    if not inspector.has_table('task_counters'):
+        op.create_table(
+            'task_counters',
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('total', sa.Integer(), nullable=False),
+            sa.Column('completed', sa.Integer(), nullable=False),
+            sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+            sa.Column('purged_seq', sa.Integer(), server_default='0', nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('user_id')
+        )
+    else:
+        missing = [
+            name for name in ('version', 'purged_seq')
+            if name not in _column_names(inspector, 'task_counters')
+        ]
+        if missing:
+            with op.batch_alter_table('task_counters') as batch_op:
+                for name in missing:
+                    batch_op.add_column(sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+        op.execute(
+            "UPDATE task_counters SET version = ("
+            "SELECT MAX(change_seq) FROM tasks WHERE tasks.user_id = task_counters.user_id"
+            ") WHERE version < ("
+            "SELECT COALESCE(MAX(change_seq), 0) FROM tasks WHERE tasks.user_id = task_counters.user_id"
+            ")"
+        )
+    
+    if not inspector.has_table('task_tombstones'):
+        op.create_table(
+            'task_tombstones',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('task_id', sa.Integer(), nullable=False),
+            sa.Column('user_id', sa.Integer(), nullable=False),
+            sa.Column('deleted_at', sa.DateTime(), nullable=False),
+            sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False),
+            sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.create_index('idx_tombstone_user_seq', 'task_tombstones', ['user_id', 'change_seq'])
+    else:
+        if 'change_seq' not in _column_names(inspector, 'task_tombstones'):
+            with op.batch_alter_table('task_tombstones') as batch_op:
+                batch_op.add_column(sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+        if 'idx_tombstone_user_seq' not in _index_names(inspector, 'task_tombstones'):
+            op.create_index('idx_tombstone_user_seq', 'task_tombstones', ['user_id', 'change_seq'])
+
+def downgrade() -> None:
+    op.drop_table('task_tombstones')
+    op.drop_table('task_counters')
+    op.drop_index('idx_user_change_seq', table_name='tasks')
+    with op.batch_alter_table('tasks') as batch_op:
+        batch_op.drop_column('change_seq')
@@ -1,11 +1,15 @@
 #!/usr/bin/env python
 """
 Script de inicialização da base de dados
-Cria tabelas e opcionalmente adiciona dados de teste
+Aplica as migrações (Alembic) e opcionalmente adiciona dados de teste
+
+Executado uma vez por deploy (entrypoint.sh / buildCommand do Render); a
+aplicação não cria nem inspeciona o esquema no arranque.
 
 Uso:
     python scripts/init_db.py
     python scripts/init_db.py --seed  # Com dados de exemplo
+    python scripts/init_db.py --scale users=10k,tasks_per_user=200  # Dados em massa
 """
 import os
 import sys
@@ -14,14 +18,17 @@ import sys
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, parent_dir)
 
+from sqlalchemy import text
 from app import create_app, db
 from app.models.user import User
 from app.models.task import Task
-from app.enums.task_status import TaskStatus
+from app.utils.data_generator import DEFAULT_PASSWORD, generate_dataset, parse_scale
+from app.utils.migrations import LEGACY_REVISION, run_migrations
+from app.utils.security import get_password_hash
 import argparse
 
 
-def init_database(seed_data=False):
+def init_database(seed_data=False, scale=None, batch_size=10000):
     """Inicializa a base de dados"""
     app = create_app()
     
@@ -29,9 +36,9 @@ def init_database(seed_data=False):
         print("🔧 A inicializar base de dados...")
         
         try:
-            # Criar todas as tabelas
-            db.create_all()
-            print("✅ Tabelas criadas com sucesso!")
+            if run_migrations(db.engine):
+                print(f"ℹ️  Esquema sem histórico de migrações: marcado com a revisão {LEGACY_REVISION}")
+            print("✅ Migrações aplicadas com sucesso!")
             
             # Verificar se já existem dados
             user_count = User.query.count()
@@ -47,6 +54,18 @@ def init_database(seed_data=False):
                 seed_database()
                 print("✅ Dados de exemplo adicionados!")
             
+            if scale:
+                print(f"\n🏭 A gerar {scale['users']} utilizadores com {scale['tasks_per_user']} tarefas cada...")
+                result = generate_dataset(
+                    scale['users'],
+                    scale['tasks_per_user'],
+                    batch_size=batch_size,
+                    progress=report_progress
+                )
+                print(f"✅ {result['users']} utilizadores e {result['tasks']} tarefas em {result['seconds']:.1f} s "
+                      f"({result['tasks'] / max(result['seconds'], 0.001):.0f} tarefas/s)")
+                print(f"   Login: {result['first_username']}, ... / {DEFAULT_PASSWORD}")
+            
             print("\n✨ Base de dados pronta para uso!")
             
         except Exception as e:
@@ -54,14 +73,19 @@ def init_database(seed_data=False):
             sys.exit(1)
 
 
+def report_progress(users, tasks):
+    """Mostra o progresso da geração de dados em massa"""
+    print(f"   ... {users} utilizadores, {tasks} tarefas", flush=True)
+
+
 def seed_database():
     """Adiciona dados de exemplo à base de dados"""
     # Criar utilizador de teste
     test_user = User(
         username="demo",
-        email="demo@taskmanager.com"
+        email="demo@taskmanager.com",
+        hashed_password=get_password_hash("Demo123!")
     )
-    test_user.set_password("Demo123!")
     db.session.add(test_user)
     db.session.commit()
     
@@ -70,38 +94,36 @@ def seed_database():
         Task(
             title="Configurar ambiente de desenvolvimento",
             description="Instalar Docker e configurar docker-compose",
-            status=TaskStatus.COMPLETED,
+            completed=True,
             user_id=test_user.id
         ),
         Task(
             title="Implementar autenticação JWT",
             description="Criar endpoints de login e registo com tokens JWT",
-            status=TaskStatus.COMPLETED,
+            completed=True,
             user_id=test_user.id
         ),
         Task(
             title="Fazer deploy no Render",
             description="Configurar deploy automático do backend",
-            status=TaskStatus.IN_PROGRESS,
+            completed=False,
             user_id=test_user.id
         ),
         Task(
             title="Fazer deploy no Vercel",
             description="Configurar deploy automático do frontend",
-            status=TaskStatus.PENDING,
+            completed=False,
             user_id=test_user.id
         ),
         Task(
             title="Documentar API",
             description="Criar documentação completa dos endpoints",
-            status=TaskStatus.PENDING,
+            completed=False,
             user_id=test_user.id
         )
     ]
     
-    for task in tasks:
-        db.session.add(task)
-    
+    db.session.add_all(tasks)
     db.session.commit()
     
     print(f"   ✅ Criado utilizador: {test_user.username}")
@@ -118,6 +140,9 @@ def drop_all_tables():
         
         if response.lower() == 'sim':
             db.drop_all()
+            # Histórico das migrações, para que o próximo init_db recrie o esquema
+            db.session.execute(text('DROP TABLE IF EXISTS alembic_version'))
+            db.session.commit()
             print("✅ Todas as tabelas removidas!")
         else:
             print("❌ Operação cancelada")
@@ -132,6 +157,19 @@ if __name__ == '__main__':
         action='store_true',
         help='Adicionar dados de exemplo'
     )
+    parser.add_argument(
+        '--scale',
+        type=parse_scale,
+        default=None,
+        metavar='users=N,tasks_per_user=M',
+        help='Gerar dados em massa (ex.: users=10k,tasks_per_user=200)'
+    )
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=10000,
+        help='Linhas por lote na geração em massa'
+    )
     parser.add_argument(
         '--drop',
         action='store_true',
@@ -143,5 +181,5 @@ if __name__ == '__main__':
     if args.drop:
         drop_all_tables()
     else:
-        init_database(seed_data=args.seed)
+        init_database(seed_data=args.seed, scale=args.scale, batch_size=args.batch_size)
 
@@ -33,7 +33,8 @@ def ping_service(url, timeout=30):
     Returns:
         bool: True se sucesso, False caso contrário
     """
-    health_url = f"{url.rstrip('/')}/health"
+    # /livez: um serviço ocupado (pool saturado) continua vivo e acordado
+    health_url = f"{url.rstrip('/')}/livez"
     
     try:
         print(f"🔄 A verificar serviço em: {health_url}")
@@ -43,11 +44,9 @@ def ping_service(url, timeout=30):
         if response.status_code == 200:
             data = response.json()
             status = data.get('status', 'unknown')
-            database = data.get('database', 'unknown')
             
             print(f"✅ Serviço operacional!")
             print(f"   - Status: {status}")
-            print(f"   - Base de dados: {database}")
             print(f"   - Tempo de resposta: {response.elapsed.total_seconds():.2f}s")
             
             return True
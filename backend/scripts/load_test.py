@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+"""
+Teste de carga HTTP com uma mistura realista de pedidos
+Arranca o Gunicorn com o gunicorn.conf.py (ou usa um servidor já em
+execução com --url), regista utilizadores sintéticos, cria as suas tarefas e
+gera carga com uma mistura configurável de login, listagens (com e sem
+filtros), criação, atualização e eliminação de tarefas. A concorrência sobe
+por etapas e, para cada etapa, são mostrados o débito e as latências
+p50/p95/p99 por endpoint. Serve para validar workers/threads antes de os
+alterar em produção.
+
+Uso:
+    python scripts/load_test.py
+    python scripts/load_test.py --workers 4 --threads 4 --ramp 8,16,32,64 --stage-duration 20
+    python scripts/load_test.py --mix login=2,list=50,list_filtered=20,create=12,update=12,delete=4
+    python scripts/load_test.py --url http://localhost:5000 --users 50
+"""
+import http.client
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+# Adicionar diretório pai ao path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+import argparse
+
+
+DEFAULT_MIX = 'login=2,list=45,list_filtered=20,create=13,update=15,delete=5'
+PASSWORD = 'LoadTest123!'
+SEED_BATCH = 100
+
+
+def request(connection, method, path, body=None, token=None):
+    """Faz um pedido HTTP e devolve (status, corpo em JSON ou None)"""
+    headers = {'Content-Type': 'application/json'}
+    if token:
+        headers['Authorization'] = f'Bearer {token}'
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    data = response.read()
+    try:
+        return response.status, json.loads(data) if data else None
+    except ValueError:
+        return response.status, None
+
+
+def wait_until_ready(port, timeout=60):
+    """Aguarda que /health responda"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            status, _ = request(connection, 'GET', '/health')
+            connection.close()
+            if status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.5)
+    return False
+
+
+def process_tree_rss_mb(pid):
+    """Memória residente (MB) do processo e de todos os descendentes (Linux)"""
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f'/proc/{current}/status') as status:
+                for line in status:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+            with open(f'/proc/{current}/task/{current}/children') as children:
+                pending.extend(int(child) for child in children.read().split())
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class VirtualUser:
+    """Utilizador sintético: credenciais, token e IDs das suas tarefas"""
+    
+    def __init__(self, username, token, task_ids):
+        self.username = username
+        self.token = token
+        self.task_ids = task_ids
+        self.lock = threading.Lock()
+    
+    def pick_task(self, remove=False):
+        with self.lock:
+            if not self.task_ids:
+                return None
+            index = random.randrange(len(self.task_ids))
+            if remove:
+                return self.task_ids.pop(index)
+            return self.task_ids[index]
+    
+    def add_task(self, task_id):
+        with self.lock:
+            self.task_ids.append(task_id)
+
+
+def parse_mix(value):
+    """Converte 'login=2,list=50,...' em [(operação, peso)]"""
+    mix = []
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"Operação desconhecida: {name} (válidas: {', '.join(OPERATIONS)})"
+            )
+        mix.append((name, float(weight or 1)))
+    return mix
+
+
+def create_users(host, port, count, tasks_per_user):
+    """Regista os utilizadores sintéticos e cria as suas tarefas (em lotes)"""
+    connection = http.client.HTTPConnection(host, port, timeout=60)
+    prefix = f'load{int(time.time())}'
+    users = []
+    for i in range(count):
+        username = f'{prefix}u{i}'
+        request(connection, 'POST', '/api/auth/register', {
+            'username': username,
+            'email': f'{username}@example.com',
+            'password': PASSWORD
+        })
+        status, data = request(connection, 'POST', '/api/auth/login', {'username': username, 'password': PASSWORD})
+        if status != 200:
+            raise RuntimeError(f"Login do utilizador {username} falhou ({status})")
+        token = data['access_token']
+        
+        task_ids = []
+        for start in range(0, tasks_per_user, SEED_BATCH):
+            operations = [
+                {'op': 'create', 'data': {'title': f'Tarefa {n}', 'completed': n % 3 == 0}}
+                for n in range(start, min(start + SEED_BATCH, tasks_per_user))
+            ]
+            _, data = request(connection, 'POST', '/api/tasks/bulk', {'operations': operations}, token=token)
+            task_ids.extend(result['task']['id'] for result in data['results'] if 'task' in result)
+        users.append(VirtualUser(username, token, task_ids))
+    connection.close()
+    return users
+
+
+# Cada operação devolve (endpoint, status esperado, status obtido)
+def op_login(connection, user):
+    status, data = request(connection, 'POST', '/api/auth/login', {'username': user.username, 'password': PASSWORD})
+    if status == 200:
+        user.token = data['access_token']
+    return 'POST /api/auth/login', 200, status
+
+
+def op_list(connection, user):
+    page = random.randint(1, 3)
+    status, _ = request(connection, 'GET', f'/api/tasks?page={page}&per_page=20', token=user.token)
+    return 'GET /api/tasks', 200, status
+
+
+def op_list_filtered(connection, user):
+    status_filter = random.choice(['completed', 'pending'])
+    status, _ = request(connection, 'GET', f'/api/tasks?status={status_filter}&per_page=20', token=user.token)
+    return 'GET /api/tasks?status', 200, status
+
+
+def op_create(connection, user):
+    status, data = request(connection, 'POST', '/api/tasks', {
+        'title': f'Tarefa de carga {random.randint(0, 10 ** 6)}',
+        'description': 'Criada pelo teste de carga'
+    }, token=user.token)
+    if status == 201:
+        user.add_task(data['task']['id'])
+    return 'POST /api/tasks', 201, status
+
+
+def op_update(connection, user):
+    task_id = user.pick_task()
+    if task_id is None:
+        return op_create(connection, user)
+    status, _ = request(connection, 'PUT', f'/api/tasks/{task_id}', {'completed': random.random() < 0.5}, token=user.token)
+    return 'PUT /api/tasks/<id>', 200, status
+
+
+def op_delete(connection, user):
+    task_id = user.pick_task(remove=True)
+    if task_id is None:
+        return op_create(connection, user)
+    status, _ = request(connection, 'DELETE', f'/api/tasks/{task_id}', token=user.token)
+    return 'DELETE /api/tasks/<id>', 200, status
+
+
+OPERATIONS = {
+    'login': op_login,
+    'list': op_list,
+    'list_filtered': op_list_filtered,
+    'create': op_create,
+    'update': op_update,
+    'delete': op_delete
+}
+
+
+def run_stage(host, port, users, mix, concurrency, duration):
+    """
+    Gera carga com concurrency clientes durante duration segundos
+    
+    Cada cliente usa uma ligação persistente e um utilizador próprio
+    (partilhado quando há menos utilizadores do que clientes).
+    
+    Returns:
+        dict: Latências (ms) e erros por endpoint
+    """
+    deadline = time.monotonic() + duration
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    latencies = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    
+    def client(index):
+        user = users[index % len(users)]
+        connection = http.client.HTTPConnection(host, port, timeout=60)
+        local_latencies = defaultdict(list)
+        local_errors = defaultdict(int)
+        while time.monotonic() < deadline:
+            operation = OPERATIONS[random.choices(names, weights)[0]]
+            started = time.perf_counter()
+            try:
+                endpoint, expected, status = operation(connection, user)
+            except (OSError, http.client.HTTPException):
+                local_errors['ligação'] += 1
+                connection.close()
+                connection = http.client.HTTPConnection(host, port, timeout=60)
+                continue
+            local_latencies[endpoint].append((time.perf_counter() - started) * 1000)
+            if status != expected:
+                local_errors[endpoint] += 1
+        connection.close()
+        with lock:
+            for endpoint, values in local_latencies.items():
+                latencies[endpoint].extend(values)
+            for endpoint, count in local_errors.items():
+                errors[endpoint] += count
+    
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(client, range(concurrency)))
+    
+    return {'latencies': dict(latencies), 'errors': dict(errors)}
+
+
+def summarize(values, duration):
+    """Pedidos, débito e percentis de uma lista de latências (ms)"""
+    if len(values) >= 2:
+        percentiles = statistics.quantiles(values, n=100)
+        p50, p95, p99 = percentiles[49], percentiles[94], percentiles[98]
+    else:
+        p50 = p95 = p99 = values[0] if values else 0.0
+    return {
+        'requests': len(values),
+        'rps': len(values) / duration,
+        'p50': p50,
+        'p95': p95,
+        'p99': p99
+    }
+
+
+def print_stage(concurrency, stage, duration, rss_mb=None):
+    """Mostra os resultados de uma etapa por endpoint"""
+    all_latencies = [value for values in stage['latencies'].values() for value in values]
+    total = summarize(all_latencies, duration)
+    errors = sum(stage['errors'].values())
+    memory = f", RSS {rss_mb:.0f} MB" if rss_mb is not None else ''
+    print()
+    print(f"👥 {concurrency} clientes: {total['requests']} pedidos, {total['rps']:.1f} req/s, "
+          f"p95 {total['p95']:.1f} ms, {errors} erros{memory}")
+    print(f"   {'Endpoint':<24} {'Pedidos':>8} {'Req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'Erros':>6}")
+    endpoints = sorted(set(stage['latencies']) | set(stage['errors']))
+    for endpoint in endpoints:
+        result = summarize(stage['latencies'].get(endpoint, []), duration)
+        print(
+            f"   {endpoint:<24} {result['requests']:>8} {result['rps']:>8.1f} "
+            f"{result['p50']:>8.2f} {result['p95']:>8.2f} {result['p99']:>8.2f} "
+            f"{stage['errors'].get(endpoint, 0):>6}"
+        )
+    return dict(total, concurrency=concurrency, errors=errors, rss_mb=rss_mb, endpoints={
+        endpoint: dict(summarize(stage['latencies'].get(endpoint, []), duration),
+                       errors=stage['errors'].get(endpoint, 0))
+        for endpoint in endpoints
+    })
+
+
+def start_server(args):
+    """Arranca o Gunicorn com o gunicorn.conf.py e uma base de dados preparada"""
+    database_url = args.database_url or f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'load_test.db')}"
+    env = dict(
+        os.environ,
+        PORT=str(args.port),
+        DATABASE_URL=database_url,
+        GUNICORN_WORKERS=str(args.workers),
+        GUNICORN_THREADS=str(args.threads),
+        RATELIMIT_ENABLED='false',
+        LOG_LEVEL='warning',
+        FLASK_ENV='production'
+    )
+    if args.worker_class:
+        env['GUNICORN_WORKER_CLASS'] = args.worker_class
+    
+    # Esquema criado uma vez, como num deploy
+    subprocess.run(
+        [sys.executable, os.path.join('scripts', 'init_db.py')],
+        cwd=parent_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        check=True
+    )
+    
+    print(f"🚀 Gunicorn: {args.workers} worker(s), {args.threads} thread(s), base de dados {database_url.split('@')[-1]}")
+    return subprocess.Popen(
+        ['gunicorn', '--config', 'gunicorn.conf.py', '--access-logfile', '/dev/null', 'main:app'],
+        cwd=parent_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+
+def main(args):
+    server = None
+    if args.url:
+        target = urlsplit(args.url)
+        host, port = target.hostname, target.port or 80
+    else:
+        host, port = '127.0.0.1', args.port
+        server = start_server(args)
+    
+    try:
+        if server and not wait_until_ready(port):
+            print("❌ O servidor não arrancou")
+            return 1
+        
+        stages = [int(value) for value in args.ramp.split(',') if value]
+        users_count = args.users or max(stages)
+        if users_count < max(stages):
+            print(f"⚠️ {users_count} utilizadores para {max(stages)} clientes: alguns clientes partilham utilizadores")
+        
+        print(f"🌱 A criar {users_count} utilizadores com {args.tasks_per_user} tarefas cada...")
+        users = create_users(host, port, users_count, args.tasks_per_user)
+        print(f"   Mistura: {', '.join(f'{name}={weight:g}' for name, weight in args.mix)}")
+        
+        results = []
+        for concurrency in stages:
+            stage = run_stage(host, port, users, args.mix, concurrency, args.stage_duration)
+            rss_mb = process_tree_rss_mb(server.pid) if server else None
+            results.append(print_stage(concurrency, stage, args.stage_duration, rss_mb))
+        
+        if args.json:
+            with open(args.json, 'w', encoding='utf-8') as f:
+                json.dump({'mix': dict(args.mix), 'stages': results}, f, indent=2, ensure_ascii=False)
+            print(f"\n💾 Resultados gravados em {args.json}")
+        return 0
+    finally:
+        if server:
+            server.send_signal(signal.SIGTERM)
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Teste de carga do Task Manager com uma mistura realista de pedidos'
+    )
+    parser.add_argument('--url', default=None, help='Servidor já em execução (por omissão arranca o Gunicorn)')
+    parser.add_argument('--workers', type=int, default=2, help='Workers do Gunicorn')
+    parser.add_argument('--threads', type=int, default=2, help='Threads por worker')
+    parser.add_argument('--worker-class', default=None, help='GUNICORN_WORKER_CLASS (sync, gthread, gevent)')
+    parser.add_argument('--users', type=int, default=None, help='Utilizadores sintéticos (por omissão, um por cliente)')
+    parser.add_argument('--tasks-per-user', type=int, default=50, help='Tarefas criadas por utilizador')
+    parser.add_argument('--mix', type=parse_mix, default=parse_mix(DEFAULT_MIX),
+                        help=f'Pesos das operações (por omissão {DEFAULT_MIX})')
+    parser.add_argument('--ramp', default='4,8,16', help='Clientes simultâneos em cada etapa')
+    parser.add_argument('--stage-duration', type=int, default=10, help='Duração de cada etapa (segundos)')
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--database-url', default=None, help='Por omissão, SQLite temporário')
+    parser.add_argument('--json', default=None, help='Grava os resultados neste ficheiro')
+    
+    args = parser.parse_args()
+    sys.exit(main(args))
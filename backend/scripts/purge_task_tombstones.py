@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+"""
+Script de limpeza dos registos de tarefas eliminadas (tombstones)
+Remove os registos mais antigos que a retenção da sincronização incremental
+
+Uso:
+    python scripts/purge_task_tombstones.py
+    python scripts/purge_task_tombstones.py --days 60
+"""
+import os
+import sys
+
+# Adicionar diretório pai ao path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from app import create_app
+from app.services.task_service import TaskService
+import argparse
+
+
+def purge(days=None):
+    """Elimina os registos mais antigos que o número de dias indicado"""
+    app = create_app()
+    
+    with app.app_context():
+        if days is None:
+            days = app.config.get('TASK_TOMBSTONE_RETENTION_DAYS', 30)
+        
+        print(f"🧹 A eliminar registos de tarefas eliminadas com mais de {days} dia(s)...")
+        
+        try:
+            removed = TaskService.purge_tombstones(days)
+        except Exception as e:
+            print(f"❌ Erro ao eliminar registos: {e}")
+            sys.exit(1)
+        
+        print(f"✅ {removed} registo(s) eliminado(s)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Limpar registos de tarefas eliminadas do Task Manager'
+    )
+    parser.add_argument(
+        '--days',
+        type=int,
+        default=None,
+        help='Idade mínima dos registos a eliminar (por omissão, TASK_TOMBSTONE_RETENTION_DAYS)'
+    )
+    
+    args = parser.parse_args()
+    purge(days=args.days)
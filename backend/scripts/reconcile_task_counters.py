@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+Script de reconciliação dos contadores de tarefas por utilizador
+Recalcula total/concluídas a partir da tabela de tarefas e corrige desvios
+
+Uso:
+    python scripts/reconcile_task_counters.py
+    python scripts/reconcile_task_counters.py --user-id 42
+"""
+import os
+import sys
+
+# Adicionar diretório pai ao path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, parent_dir)
+
+from app import create_app
+from app.services.task_counter_service import TaskCounterService
+import argparse
+
+
+def reconcile(user_id=None):
+    """Reconcilia os contadores e mostra os desvios corrigidos"""
+    app = create_app()
+    
+    with app.app_context():
+        print("🔧 A reconciliar contadores de tarefas...")
+        
+        try:
+            fixed = TaskCounterService.reconcile(user_id)
+        except Exception as e:
+            print(f"❌ Erro ao reconciliar contadores: {e}")
+            sys.exit(1)
+        
+        for entry in fixed:
+            old = entry['old']
+            before = f"{old['total']}/{old['completed']}" if old else "sem contadores"
+            print(
+                f"   - Utilizador {entry['user_id']}: {before} -> "
+                f"{entry['new']['total']}/{entry['new']['completed']}"
+            )
+        
+        if fixed:
+            print(f"✅ {len(fixed)} contador(es) corrigido(s)")
+        else:
+            print("✅ Sem desvios")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description='Reconciliar contadores de tarefas do Task Manager'
+    )
+    parser.add_argument(
+        '--user-id',
+        type=int,
+        default=None,
+        help='Reconciliar apenas este utilizador'
+    )
+    
+    args = parser.parse_args()
+    reconcile(user_id=args.user_id)
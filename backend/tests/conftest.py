@@ -1,9 +1,13 @@
 """Configuração e fixtures para testes"""
 import pytest
+from flask import request, request_finished, request_started
 from app import create_app, db
 from app.models.user import User
 from app.models.task import Task
+from app.utils.migrations import run_migrations
+from app.utils.query_tracker import get_request_queries, register_query_hooks, start_request_tracking
 from app.utils.security import get_password_hash
+from app.utils.sql_profiler import check_query_budget
 from config import Config
 
 class TestConfig(Config):
@@ -13,6 +17,43 @@ class TestConfig(Config):
     JWT_SECRET_KEY = 'test-jwt-secret-key'
     SECRET_KEY = 'test-secret-key'
     WTF_CSRF_ENABLED = False
+    PASSWORD_HASH_EXECUTOR = 'inline'
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    Aplica o marker query_budget aos pedidos feitos no corpo do teste
+    
+    Os pedidos feitos pelas fixtures (ex.: registo e login do auth_headers)
+    não contam para o orçamento.
+    """
+    marker = item.get_closest_marker('query_budget')
+    if marker is None:
+        yield
+        return
+    
+    budget = dict(zip(('max_queries', 'max_repeats'), marker.args), **marker.kwargs)
+    violations = []
+    
+    def track(sender, **extra):
+        start_request_tracking(statements=True)
+    
+    def check(sender, response, **extra):
+        problems = check_query_budget(get_request_queries(), **budget)
+        if problems:
+            violations.append(f"{request.method} {request.path}: " + ', '.join(problems))
+    
+    register_query_hooks()
+    request_started.connect(track, weak=False)
+    request_finished.connect(check, weak=False)
+    try:
+        outcome = yield
+    finally:
+        request_started.disconnect(track)
+        request_finished.disconnect(check)
+    
+    if outcome.excinfo is None and violations:
+        pytest.fail("Orçamento de queries ultrapassado:\n" + '\n'.join(violations), pytrace=False)
 
 @pytest.fixture
 def app():
@@ -20,7 +61,8 @@ def app():
     app = create_app(TestConfig)
     
     with app.app_context():
-        db.create_all()
+        # Esquema das migrações, incluindo a pesquisa de texto (FTS5)
+        run_migrations(db.engine)
         yield app
         db.drop_all()
 
@@ -89,3 +89,75 @@ class TestAppInit:
             elif was_in_path and parent_dir not in sys.path:
                 sys.path.insert(0, parent_dir)
 
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestGunicornConfig:
+    """Testes para o gunicorn.conf.py"""
+    
+    @staticmethod
+    def _load_config(**env):
+        """Carrega o gunicorn.conf.py num processo separado (altera os.environ)"""
+        import json
+        import subprocess
+        
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        clean_env = {
+            key: value for key, value in os.environ.items()
+            if not key.startswith('GUNICORN_') and key != 'TASK_EVENTS_MAX_STREAMS'
+        }
+        clean_env.update(env)
+        script = (
+            "import json, os, runpy\n"
+            "conf = runpy.run_path('gunicorn.conf.py')\n"
+            "print(json.dumps({\n"
+            "    'worker_class': conf['worker_class'],\n"
+            "    'preload_app': conf['preload_app'],\n"
+            "    'access_log_format': conf['access_log_format'],\n"
+            "    'max_streams': os.environ['TASK_EVENTS_MAX_STREAMS'],\n"
+            "}))\n"
+        )
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=backend_dir, env=clean_env,
+            capture_output=True, text=True, check=True
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+    
+    def test_default_worker_class_holds_many_streams(self):
+        """Testa que por omissão os workers gevent aceitam muitos streams SSE"""
+        conf = self._load_config()
+        
+        assert conf['worker_class'] == 'gevent'
+        assert conf['preload_app'] is False
+        assert conf['max_streams'] == '500'
+    
+    def test_thread_workers_keep_one_thread_for_api(self):
+        """Testa o limite de streams com workers sync"""
+        conf = self._load_config(GUNICORN_WORKER_CLASS='sync', GUNICORN_THREADS='4')
+        
+        assert conf['preload_app'] is True
+        assert conf['max_streams'] == '3'
+    
+    def test_access_log_omits_query_string(self):
+        """Testa que o token em ?jwt= não chega ao access log"""
+        from datetime import timedelta
+        from types import SimpleNamespace
+        from gunicorn.config import Config as GunicornConfig
+        from gunicorn.glogging import Logger
+        
+        conf = self._load_config()
+        logger = Logger(GunicornConfig())
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'RAW_URI': '/api/tasks/stream?jwt=segredo',
+            'PATH_INFO': '/api/tasks/stream',
+            'QUERY_STRING': 'jwt=segredo',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'REMOTE_ADDR': '127.0.0.1',
+        }
+        resp = SimpleNamespace(status='200 OK', sent=0, headers=[])
+        atoms = logger.atoms(resp, SimpleNamespace(headers=[]), environ, timedelta(seconds=1))
+        line = conf['access_log_format'] % atoms
+        
+        assert '"GET /api/tasks/stream HTTP/1.1"' in line
+        assert 'segredo' not in line
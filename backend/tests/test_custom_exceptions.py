@@ -3,7 +3,8 @@ import pytest
 from app.exceptions.custom_exceptions import (
     ValidationException,
     DatabaseException,
-    AppException
+    AppException,
+    ServiceUnavailableException
 )
 from app.enums.error_codes import ErrorCode
 from app.enums.http_status import HTTPStatus
@@ -53,4 +54,11 @@ class TestCustomExceptions:
         assert result['error_code'] == ErrorCode.VALIDATION_ERROR.value
         assert result['status_code'] == HTTPStatus.BAD_REQUEST.value
         assert result['details'] == {"key": "value"}
-
+    
+    def test_service_unavailable_exception(self):
+        """Testa exceção 503 com Retry-After"""
+        exc = ServiceUnavailableException(retry_after=30)
+        
+        assert exc.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert exc.error_code == ErrorCode.SERVICE_UNAVAILABLE
+        assert exc.retry_after == 30
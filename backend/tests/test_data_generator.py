@@ -0,0 +1,115 @@
+"""Testes para a geração de dados (init_db.py --seed e --scale)"""
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from sqlalchemy import func, select
+from app import db
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.user import User
+from app.utils.data_generator import DEFAULT_PASSWORD, generate_dataset, parse_scale
+from app.utils.security import verify_password
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.mark.unit
+class TestParseScale:
+    """Testes para o formato de --scale"""
+    
+    def test_parse_scale(self):
+        """Testa a leitura dos valores, com e sem sufixos"""
+        assert parse_scale('users=10,tasks_per_user=5') == {'users': 10, 'tasks_per_user': 5}
+        assert parse_scale('users=2k,tasks_per_user=1_000') == {'users': 2000, 'tasks_per_user': 1000}
+        assert parse_scale('users=1m') == {'users': 1000000, 'tasks_per_user': 0}
+    
+    @pytest.mark.parametrize('value', ['tasks_per_user=5', 'users=abc', 'users=5,rows=3'])
+    def test_invalid_scale(self, value):
+        """Testa que formatos inválidos são rejeitados"""
+        with pytest.raises(ValueError):
+            parse_scale(value)
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestGenerateDataset:
+    """Testes para a geração em massa"""
+    
+    def test_generates_users_tasks_and_counters(self, app):
+        """Testa os totais gerados em vários lotes e os contadores"""
+        result = generate_dataset(users=3, tasks_per_user=7, batch_size=5, seed=1)
+        
+        assert result['users'] == 3
+        assert result['tasks'] == 21
+        assert db.session.scalar(select(func.count()).select_from(Task)) == 21
+        for counter in db.session.scalars(select(TaskCounter)):
+            completed = db.session.scalar(
+                select(func.count()).select_from(Task)
+                .where(Task.user_id == counter.user_id, Task.completed.is_(True))
+            )
+            assert counter.total == 7
+            assert counter.completed == completed
+    
+    def test_shared_password_hash(self, app):
+        """Testa que os utilizadores gerados entram com a palavra-passe comum"""
+        generate_dataset(users=2, tasks_per_user=0)
+        
+        hashes = db.session.scalars(select(User.hashed_password)).all()
+        assert len(set(hashes)) == 1
+        assert verify_password(DEFAULT_PASSWORD, hashes[0])
+    
+    def test_continues_numbering(self, app):
+        """Testa que gerações seguidas não repetem nomes de utilizador"""
+        first = generate_dataset(users=2, tasks_per_user=1)
+        second = generate_dataset(users=2, tasks_per_user=1)
+        
+        assert first['first_username'] != second['first_username']
+        assert db.session.scalar(select(func.count()).select_from(User)) == 4
+
+    def test_numbering_after_deleted_users(self, app):
+        """Testa que a numeração parte do maior sufixo e não da contagem de utilizadores"""
+        generate_dataset(users=3, tasks_per_user=0)
+        db.session.delete(db.session.scalar(select(User).where(User.username == 'scaleuser0')))
+        db.session.commit()
+        
+        result = generate_dataset(users=1, tasks_per_user=0)
+        
+        assert result['first_username'] == 'scaleuser3'
+    
+    def test_large_user_split_into_batches(self, app, monkeypatch):
+        """Testa que as tarefas de um só utilizador respeitam batch_size"""
+        from app.utils import data_generator
+        sizes = []
+        insert_tasks = data_generator._insert_tasks
+        monkeypatch.setattr(data_generator, '_insert_tasks', lambda rows: (sizes.append(len(rows)), insert_tasks(rows)))
+        
+        generate_dataset(users=1, tasks_per_user=12, batch_size=5, seed=1)
+        
+        assert sizes == [5, 5, 2]
+        counter = db.session.scalar(select(TaskCounter))
+        assert counter.total == 12
+        assert db.session.scalar(select(func.count()).select_from(Task)) == 12
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestInitDbScript:
+    """Testes para scripts/init_db.py"""
+    
+    def test_seed_and_scale(self, tmp_path):
+        """Testa --seed (utilizador demo) e --scale na mesma execução"""
+        database = tmp_path / 'seed.db'
+        env = dict(os.environ, DATABASE_URL=f'sqlite:///{database}', PASSWORD_HASH_EXECUTOR='inline')
+        
+        subprocess.run(
+            [sys.executable, os.path.join('scripts', 'init_db.py'), '--seed', '--scale', 'users=3,tasks_per_user=4'],
+            cwd=BACKEND_DIR, env=env, check=True, capture_output=True
+        )
+        
+        connection = sqlite3.connect(database)
+        try:
+            assert connection.execute("SELECT count(*) FROM users WHERE username = 'demo'").fetchone()[0] == 1
+            assert connection.execute('SELECT count(*) FROM users').fetchone()[0] == 4
+            assert connection.execute('SELECT count(*) FROM tasks').fetchone()[0] == 5 + 12
+            assert connection.execute('SELECT count(*) FROM tasks WHERE completed = 1 AND user_id = 1').fetchone()[0] == 2
+        finally:
+            connection.close()
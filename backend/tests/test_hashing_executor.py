@@ -0,0 +1,104 @@
+"""Testes para o executor de hashing de palavras-passe"""
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from app.utils.hashing_executor import PasswordHashingExecutor
+from app.utils.security import _hash, _verify, get_hash_policy
+from app.exceptions.custom_exceptions import RateLimitExceededException, ServiceUnavailableException
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestPasswordHashingExecutor:
+    """Testes para PasswordHashingExecutor"""
+    
+    def test_inline_mode(self):
+        """Testa execução na thread atual"""
+        executor = PasswordHashingExecutor(mode='inline')
+        
+        hashed = executor.submit(_hash, get_hash_policy(), 'Password123!')
+        
+        assert executor.submit(_verify, get_hash_policy(), 'Password123!', hashed) is True
+        stats = executor.get_stats()
+        assert stats['completed'] == 2
+        assert stats['hash_seconds_total'] > 0
+    
+    def test_invalid_mode(self):
+        """Testa modo inválido"""
+        with pytest.raises(ValueError):
+            PasswordHashingExecutor(mode='threads')
+    
+    def test_process_mode(self):
+        """Testa execução num pool de processos"""
+        executor = PasswordHashingExecutor(mode='process', max_workers=1, max_queue=1)
+        try:
+            hashed = executor.submit(_hash, get_hash_policy(), 'Password123!')
+            
+            assert executor.submit(_verify, get_hash_policy(), 'Password123!', hashed) is True
+            assert executor.submit(_verify, get_hash_policy(), 'Errada123!', hashed) is False
+            stats = executor.get_stats()
+            assert stats['completed'] == 3
+            assert stats['in_flight'] == 0
+            assert stats['latency_seconds_max'] >= stats['hash_seconds_max']
+        finally:
+            executor.configure(mode='inline')
+    
+    def test_saturated_executor_rejects(self):
+        """Testa rejeição (429) quando a fila está cheia"""
+        executor = PasswordHashingExecutor(mode='process', max_workers=1, max_queue=0)
+        try:
+            executor.submit(time.sleep, 0)
+            worker = threading.Thread(target=executor.submit, args=(time.sleep, 1))
+            worker.start()
+            
+            deadline = time.monotonic() + 5
+            while executor.get_stats()['in_flight'] == 0 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            
+            with pytest.raises(RateLimitExceededException) as exc_info:
+                executor.submit(time.sleep, 0)
+            
+            worker.join()
+            assert exc_info.value.status_code.value == 429
+            assert executor.get_stats()['rejected'] == 1
+        finally:
+            executor.configure(mode='inline')
+    
+    def test_timeout_raises_service_unavailable(self):
+        """Testa resposta 503 com Retry-After quando o hash excede o timeout"""
+        executor = PasswordHashingExecutor(mode='process', max_workers=1, max_queue=0)
+        try:
+            # Arranque do pool fora do timeout reduzido
+            executor.submit(time.sleep, 0)
+            executor.timeout = 0.2
+            
+            with pytest.raises(ServiceUnavailableException) as exc_info:
+                executor.submit(time.sleep, 2)
+            
+            assert exc_info.value.status_code.value == 503
+            assert exc_info.value.retry_after > 0
+            assert executor.get_stats()['in_flight'] == 0
+        finally:
+            executor.configure(mode='inline')
+    
+    def test_default_pool_size(self):
+        """Testa que o pool tem um tamanho fixo por omissão"""
+        executor = PasswordHashingExecutor(mode='process')
+        try:
+            assert executor.max_workers == 1
+        finally:
+            executor.configure(mode='inline')
+    
+    def test_login_returns_429_when_saturated(self, client, auth_headers):
+        """Testa resposta 429 no login quando o executor está saturado"""
+        with patch(
+            'app.services.auth_service.verify_and_update_password',
+            side_effect=RateLimitExceededException()
+        ):
+            response = client.post('/api/auth/login', json={
+                'username': 'testuser',
+                'password': 'TestPass123!'
+            })
+        
+        assert response.status_code == 429
+        assert response.get_json()['error_code'] == 'RATE_LIMIT_EXCEEDED'
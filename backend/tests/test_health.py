@@ -0,0 +1,135 @@
+"""Testes para os endpoints de saúde (/livez, /readyz, /health)"""
+import time
+import pytest
+from sqlalchemy import create_engine
+from app import db
+from app.utils import health
+from app.utils.health import DatabaseProbe, db_probe, pool_saturation
+
+@pytest.fixture
+def probe_counter(monkeypatch):
+    """Conta as verificações à base de dados feitas pelo db_probe"""
+    calls = []
+    original = DatabaseProbe.probe
+    
+    def counting_probe(self, engine):
+        calls.append(engine)
+        return original(self, engine)
+    
+    monkeypatch.setattr(DatabaseProbe, 'probe', counting_probe)
+    return calls
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestLiveness:
+    """Testes para /livez"""
+    
+    def test_livez_does_not_touch_database(self, client, probe_counter):
+        """Testa que /livez responde sem verificar a base de dados"""
+        response = client.get('/livez')
+        
+        assert response.status_code == 200
+        assert response.get_json() == {'status': 'alive'}
+        assert probe_counter == []
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestReadiness:
+    """Testes para /readyz e /health"""
+    
+    def test_readyz_ready(self, client):
+        """Testa que /readyz indica pronto com a base de dados acessível"""
+        response = client.get('/readyz')
+        data = response.get_json()
+        
+        assert response.status_code == 200
+        assert data['status'] == 'ready'
+        assert data['database']['connected'] is True
+        assert data['database']['stale'] is False
+        assert 'saturation' in data['pool']
+    
+    def test_database_status_is_cached(self, client, probe_counter):
+        """Testa que pedidos seguidos reutilizam o estado em cache"""
+        for _ in range(5):
+            assert client.get('/readyz').status_code == 200
+        assert client.get('/health').status_code == 200
+        
+        assert len(probe_counter) == 1
+    
+    def test_stale_status_is_refreshed(self, app, client, probe_counter):
+        """Testa que o estado é verificado de novo após HEALTH_DB_STALENESS"""
+        db_probe.configure(staleness=0.01)
+        
+        client.get('/readyz')
+        time.sleep(0.02)
+        client.get('/readyz')
+        
+        assert len(probe_counter) == 2
+    
+    def test_database_unavailable(self, app, client, tmp_path):
+        """Testa que /readyz e /health devolvem 503 sem base de dados"""
+        broken = create_engine(f"sqlite:///{tmp_path / 'missing' / 'db.sqlite'}")
+        db_probe.probe(broken)
+        
+        response = client.get('/readyz')
+        assert response.status_code == 503
+        assert response.get_json()['reasons'] == ['database_unavailable']
+        
+        response = client.get('/health')
+        assert response.status_code == 503
+        assert response.get_json()['status'] == 'unhealthy'
+        broken.dispose()
+    
+    def test_stale_status_is_not_ready(self, app, client):
+        """Testa que um estado desatualizado (verificação bloqueada) não está pronto"""
+        db_probe.probe(db.engine)
+        db_probe.configure(staleness=0)
+        db_probe._probing.acquire()
+        try:
+            response = client.get('/readyz')
+        finally:
+            db_probe._probing.release()
+        
+        assert response.status_code == 503
+        assert response.get_json()['reasons'] == ['database_status_stale']
+    
+    def test_pool_saturated(self, client, monkeypatch):
+        """Testa que /readyz devolve 503 com o pool perto da saturação"""
+        monkeypatch.setattr(health, 'get_pool_stats', lambda engine: {
+            'class': 'QueuePool', 'size': 5, 'checked_out': 14, 'checked_in': 0,
+            'overflow': 9, 'max_overflow': 10
+        })
+        
+        response = client.get('/readyz')
+        data = response.get_json()
+        
+        assert response.status_code == 503
+        assert data['reasons'] == ['pool_saturated']
+        assert data['pool']['saturation'] == pytest.approx(14 / 15, abs=0.001)
+    
+    def test_background_refresh(self, app):
+        """Testa que com HEALTH_DB_REFRESH_INTERVAL o estado é atualizado em segundo plano"""
+        probe = DatabaseProbe(staleness=1, refresh_interval=0.01)
+        try:
+            first = probe.get_status(db.engine)
+            time.sleep(0.05)
+            second = probe.get_status(db.engine)
+        finally:
+            probe.stop()
+        
+        assert first['connected'] is True
+        assert second['age_seconds'] < 0.05
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestPoolSaturation:
+    """Testes para o cálculo da saturação do pool"""
+    
+    def test_saturation(self):
+        """Testa a fração das ligações em uso"""
+        assert pool_saturation({'size': 5, 'max_overflow': 5, 'checked_out': 5}) == 0.5
+    
+    def test_unbounded_or_unknown_pool(self):
+        """Testa que pools sem limite conhecido não têm saturação"""
+        assert pool_saturation({'class': 'StaticPool'}) is None
+        assert pool_saturation({'size': 5, 'max_overflow': -1, 'checked_out': 5}) is None
@@ -0,0 +1,53 @@
+"""Testes para os fornecedores de JSON"""
+import json
+import pytest
+from datetime import datetime
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.utils.json_provider import OrjsonProvider, configure_json_provider
+
+def make_app(provider):
+    app = Flask(__name__)
+    app.config['JSON_PROVIDER'] = provider
+    configure_json_provider(app)
+    return app
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestJsonProvider:
+    """Testes para o registo e comportamento dos fornecedores de JSON"""
+    
+    def test_default_provider(self):
+        """Testa que o fornecedor por omissão se mantém"""
+        app = make_app('default')
+        assert type(app.json) is DefaultJSONProvider
+    
+    def test_orjson_provider(self):
+        """Testa registo do fornecedor orjson"""
+        pytest.importorskip('orjson')
+        app = make_app('orjson')
+        assert isinstance(app.json, OrjsonProvider)
+    
+    def test_invalid_provider(self):
+        """Testa fornecedor inválido"""
+        with pytest.raises(ValueError):
+            make_app('ujson')
+    
+    def test_orjson_response_matches_default(self):
+        """Testa que as respostas são equivalentes às do fornecedor por omissão"""
+        pytest.importorskip('orjson')
+        payload = {
+            'tasks': [{'id': 1, 'title': 'Tarefa ç', 'created_at': datetime(2024, 1, 2, 3, 4, 5, 6)}],
+            'total': 1
+        }
+        
+        default_app = make_app('default')
+        orjson_app = make_app('orjson')
+        with default_app.app_context():
+            expected = json.loads(default_app.json.response(payload).get_data())
+        with orjson_app.app_context():
+            response = orjson_app.json.response(payload)
+        
+        assert response.mimetype == 'application/json'
+        assert json.loads(response.get_data()) == expected
+        assert orjson_app.json.loads(orjson_app.json.dumps(payload))['total'] == 1
@@ -0,0 +1,158 @@
+"""Testes para o controlo de tentativas de login"""
+import pytest
+from unittest.mock import patch
+from app.utils.login_attempts import (
+    LoginAttemptStore,
+    LoginAttemptTracker,
+    InMemoryLoginAttemptStore,
+    SQLiteLoginAttemptStore
+)
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def tracker(request, tmp_path):
+    """Tracker com cada um dos backends de armazenamento"""
+    if request.param == 'memory':
+        store = InMemoryLoginAttemptStore()
+    else:
+        store = SQLiteLoginAttemptStore(str(tmp_path / 'attempts.db'))
+    return LoginAttemptTracker(store=store)
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestLoginAttemptTracker:
+    """Testes para LoginAttemptTracker"""
+    
+    def test_remaining_attempts(self, tracker):
+        """Testa contagem de tentativas restantes"""
+        assert tracker.get_remaining_attempts('user') == 5
+        
+        tracker.record_failed_attempt('user')
+        tracker.record_failed_attempt('user')
+        
+        assert tracker.get_remaining_attempts('user') == 3
+        assert tracker.is_blocked('user') is False
+    
+    def test_block_after_max_attempts(self, tracker):
+        """Testa bloqueio após 5 falhas"""
+        for _ in range(5):
+            tracker.record_failed_attempt('user')
+        
+        assert tracker.is_blocked('user') is True
+        assert tracker.get_remaining_attempts('user') == 0
+        assert tracker.get_block_time_remaining('user') in (14, 15)
+    
+    def test_block_expires(self, tracker):
+        """Testa fim do bloqueio"""
+        with patch('app.utils.login_attempts.time.time', return_value=1000.0):
+            for _ in range(5):
+                tracker.record_failed_attempt('user')
+            assert tracker.is_blocked('user') is True
+        
+        with patch('app.utils.login_attempts.time.time', return_value=1000.0 + 901):
+            assert tracker.is_blocked('user') is False
+            assert tracker.get_remaining_attempts('user') == 5
+    
+    def test_old_failures_leave_window(self, tracker):
+        """Testa que falhas fora da janela não contam"""
+        with patch('app.utils.login_attempts.time.time', return_value=1000.0):
+            for _ in range(4):
+                tracker.record_failed_attempt('user')
+        
+        with patch('app.utils.login_attempts.time.time', return_value=1000.0 + 900):
+            tracker.record_failed_attempt('user')
+            assert tracker.is_blocked('user') is False
+            assert tracker.get_remaining_attempts('user') == 4
+    
+    def test_successful_login_resets(self, tracker):
+        """Testa reposição após login bem-sucedido"""
+        for _ in range(3):
+            tracker.record_failed_attempt('user')
+        
+        tracker.record_successful_login('user')
+        
+        assert tracker.get_remaining_attempts('user') == 5
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestLoginAttemptStores:
+    """Testes específicos dos backends"""
+    
+    def test_memory_store_is_bounded(self):
+        """Testa remoção LRU acima do limite de entradas"""
+        store = InMemoryLoginAttemptStore(max_entries=3)
+        for i in range(10):
+            store.add_failure(f'user{i}', 1000.0)
+        
+        assert len(store) == 3
+        assert store.count_failures('user9', 1000.0) == 1
+        assert store.count_failures('user0', 1000.0) == 0
+    
+    def test_memory_store_keeps_active_blocks(self):
+        """Testa que falhas com muitos nomes não removem um bloqueio ativo"""
+        store = InMemoryLoginAttemptStore(max_entries=3)
+        store.set_blocked('victim', 10 ** 12)
+        for i in range(10):
+            store.add_failure(f'user{i}', 1000.0)
+            store.set_blocked(f'user{i}', 1.0)
+        
+        assert store.get_blocked_until('victim') == 10 ** 12
+        assert store.get_blocked_until('user0') is None
+    
+    def test_store_interface_is_abstract(self):
+        """Testa que a interface não pode ser instanciada"""
+        with pytest.raises(TypeError):
+            LoginAttemptStore()
+    
+    def test_memory_store_ring_buffer(self):
+        """Testa que cada chave guarda no máximo max_attempts falhas"""
+        store = InMemoryLoginAttemptStore(max_attempts=5)
+        for i in range(50):
+            store.add_failure('user', 1000.0 + i)
+        
+        assert store.count_failures('user', 1100.0) == 5
+    
+    def test_memory_store_sweep(self):
+        """Testa remoção de entradas expiradas"""
+        store = InMemoryLoginAttemptStore(window_seconds=900)
+        store.add_failure('old', 1000.0)
+        store.add_failure('recent', 1500.0)
+        store.set_blocked('blocked', 5000.0)
+        
+        assert store.sweep(2000.0) == 1
+        assert len(store) == 2
+    
+    def test_sqlite_store_shared_between_instances(self, tmp_path):
+        """Testa que duas instâncias (workers) partilham os contadores"""
+        path = str(tmp_path / 'attempts.db')
+        worker_a = LoginAttemptTracker(store=SQLiteLoginAttemptStore(path))
+        worker_b = LoginAttemptTracker(store=SQLiteLoginAttemptStore(path))
+        
+        for _ in range(3):
+            worker_a.record_failed_attempt('user')
+        for _ in range(2):
+            worker_b.record_failed_attempt('user')
+        
+        assert worker_a.is_blocked('user') is True
+        assert worker_b.is_blocked('user') is True
+    
+    def test_sqlite_store_sweep(self, tmp_path):
+        """Testa remoção de entradas expiradas no SQLite"""
+        store = SQLiteLoginAttemptStore(str(tmp_path / 'attempts.db'))
+        store.add_failure('old', 1000.0)
+        store.add_failure('recent', 1500.0)
+        
+        assert store.sweep(2000.0) == 1
+        assert store.count_failures('recent', 2000.0) == 1
+    
+    def test_init_app_selects_backend(self, app, tmp_path):
+        """Testa seleção do backend pela configuração"""
+        tracker = LoginAttemptTracker()
+        app.config['LOGIN_ATTEMPTS_BACKEND'] = 'sqlite'
+        app.config['LOGIN_ATTEMPTS_SQLITE_PATH'] = str(tmp_path / 'attempts.db')
+        
+        tracker.init_app(app)
+        assert isinstance(tracker.store, SQLiteLoginAttemptStore)
+        
+        app.config['LOGIN_ATTEMPTS_BACKEND'] = 'redis'
+        with pytest.raises(ValueError):
+            tracker.init_app(app)
@@ -0,0 +1,207 @@
+"""Testes para as métricas Prometheus e a contagem de queries por pedido"""
+import os
+import subprocess
+import sys
+import pytest
+from flask import Flask
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from config import Config
+from app import create_app, db
+from app.utils.metrics import metrics
+from app.utils.query_tracker import get_request_queries, register_query_hooks, start_request_tracking
+
+def sample(name, **labels):
+    """Valor atual de uma métrica no registo global (0 se ainda não existir)"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestMetricsEndpoint:
+    """Testes para /metrics e as métricas dos pedidos"""
+    
+    def test_request_latency_per_endpoint(self, client, auth_headers):
+        """Testa o histograma de latência por endpoint"""
+        before = sample('http_request_duration_seconds_count',
+                        endpoint='tasks.list_tasks', method='GET', status='200')
+        
+        client.get('/api/tasks', headers=auth_headers)
+        
+        after = sample('http_request_duration_seconds_count',
+                       endpoint='tasks.list_tasks', method='GET', status='200')
+        assert after == before + 1
+    
+    def test_db_queries_per_request(self, client, auth_headers):
+        """Testa a contagem e o tempo das queries por pedido"""
+        count_before = sample('db_queries_per_request_count', endpoint='tasks.create_task')
+        sum_before = sample('db_queries_per_request_sum', endpoint='tasks.create_task')
+        
+        client.post('/api/tasks', json={'title': 'Tarefa'}, headers=auth_headers)
+        
+        assert sample('db_queries_per_request_count', endpoint='tasks.create_task') == count_before + 1
+        assert sample('db_queries_per_request_sum', endpoint='tasks.create_task') > sum_before
+        assert sample('db_query_seconds_per_request_sum', endpoint='tasks.create_task') > 0
+    
+    def test_errors_by_error_code(self, client, auth_headers):
+        """Testa a contagem de erros pelo ErrorCode da resposta"""
+        before = sample('app_errors_total', error_code='RESOURCE_NOT_FOUND', status='404')
+        
+        response = client.get('/api/tasks/99999', headers=auth_headers)
+        
+        assert response.status_code == 404
+        assert sample('app_errors_total', error_code='RESOURCE_NOT_FOUND', status='404') == before + 1
+    
+    def test_errors_without_error_code(self, client):
+        """Testa que erros sem ErrorCode são contados pelo status HTTP"""
+        before = sample('app_errors_total', error_code='HTTP_401', status='401')
+        
+        client.get('/api/tasks')
+        
+        assert sample('app_errors_total', error_code='HTTP_401', status='401') == before + 1
+    
+    def test_password_hash_time(self, client):
+        """Testa que o tempo de hash das palavras-passe é registado"""
+        before = sample('password_hash_duration_seconds_count')
+        
+        client.post('/api/auth/register', json={
+            'username': 'metricsuser',
+            'email': 'metrics@example.com',
+            'password': 'TestPass123!'
+        })
+        
+        assert sample('password_hash_duration_seconds_count') == before + 1
+    
+    def test_unmatched_routes_share_one_series(self, client):
+        """Testa que rotas inexistentes não criam uma série por URL"""
+        before = sample('http_request_duration_seconds_count',
+                        endpoint='unmatched', method='GET', status='404')
+        
+        client.get('/nao-existe-1')
+        client.get('/nao-existe-2')
+        
+        assert sample('http_request_duration_seconds_count',
+                      endpoint='unmatched', method='GET', status='404') == before + 2
+    
+    def test_metrics_exposition(self, client):
+        """Testa o formato de texto do /metrics"""
+        client.get('/livez')
+        
+        response = client.get('/metrics')
+        
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain')
+        assert b'http_request_duration_seconds_bucket{endpoint="health.livez"' in response.data
+    
+    def test_metrics_token(self, app, client):
+        """Testa que METRICS_TOKEN protege o /metrics"""
+        app.config['METRICS_TOKEN'] = 'segredo'
+        
+        assert client.get('/metrics').status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer outro'}).status_code == 401
+        assert client.get('/metrics', headers={'Authorization': 'Bearer segredo'}).status_code == 200
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestQueryTracker:
+    """Testes para a contagem de queries por pedido"""
+    
+    def test_counts_only_tracked_requests(self, app):
+        """Testa que só são contadas as queries de pedidos com contagem ativa"""
+        register_query_hooks()
+        
+        with app.test_request_context('/'):
+            db.session.execute(text('SELECT 1'))
+            assert get_request_queries() is None
+        
+        with app.test_request_context('/'):
+            stats = start_request_tracking()
+            db.session.execute(text('SELECT 1'))
+            db.session.execute(text('SELECT 2'))
+            assert stats.count == 2
+            assert stats.total_seconds > 0
+    
+    def test_failed_query_does_not_leak_timer(self, app):
+        """Testa que uma query com erro não deixa tempos pendentes na ligação"""
+        register_query_hooks()
+        
+        with app.test_request_context('/'):
+            start_request_tracking()
+            with pytest.raises(Exception):
+                db.session.execute(text('SELECT * FROM tabela_inexistente'))
+            db.session.rollback()
+            connection = db.session.connection()
+            assert not connection.info.get('_query_started')
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestMultiprocessMetrics:
+    """Testes para a agregação das métricas entre processos (workers)"""
+    
+    def test_metrics_aggregated_across_processes(self, tmp_path):
+        """Testa que /metrics soma os pedidos feitos em processos diferentes"""
+        backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        env = dict(
+            os.environ,
+            PROMETHEUS_MULTIPROC_DIR=str(tmp_path),
+            DATABASE_URL='sqlite:///:memory:',
+            PASSWORD_HASH_EXECUTOR='inline'
+        )
+        worker_code = (
+            "from app import create_app\n"
+            "client = create_app().test_client()\n"
+            "for _ in range(3):\n"
+            "    client.get('/livez')\n"
+        )
+        scrape_code = (
+            "from app import create_app\n"
+            "import sys\n"
+            "sys.stdout.write(create_app().test_client().get('/metrics').get_data(as_text=True))\n"
+        )
+        
+        for _ in range(2):
+            subprocess.run([sys.executable, '-c', worker_code], cwd=backend_dir, env=env, check=True)
+        output = subprocess.run(
+            [sys.executable, '-c', scrape_code], cwd=backend_dir, env=env,
+            check=True, capture_output=True, text=True
+        ).stdout
+        
+        assert 'http_request_duration_seconds_count{endpoint="health.livez",method="GET",status="200"} 6.0' in output
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestMetricsDisabled:
+    """Testes para METRICS_ENABLED=False e para produção sem METRICS_TOKEN"""
+    
+    def test_metrics_require_token_in_production(self, monkeypatch):
+        """Testa que em produção o /metrics não é exposto sem token"""
+        class ProductionConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            PASSWORD_HASH_EXECUTOR = 'inline'
+            METRICS_ENABLED = True
+            METRICS_TOKEN = None
+        
+        monkeypatch.setenv('FLASK_ENV', 'production')
+        try:
+            app = create_app(ProductionConfig)
+            assert app.test_client().get('/metrics').status_code == 404
+            
+            ProductionConfig.METRICS_TOKEN = 'segredo'
+            app = create_app(ProductionConfig)
+            assert app.test_client().get('/metrics').status_code == 401
+        finally:
+            metrics.init_app(Flask(__name__))
+    
+    def test_metrics_disabled(self):
+        """Testa que com as métricas desativadas /metrics não existe"""
+        class NoMetricsConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+            PASSWORD_HASH_EXECUTOR = 'inline'
+            METRICS_ENABLED = False
+        
+        app = create_app(NoMetricsConfig)
+        try:
+            assert app.test_client().get('/metrics').status_code == 404
+        finally:
+            metrics.init_app(Flask(__name__))
@@ -0,0 +1,124 @@
+"""Testes para as migrações da base de dados e o arranque sem I/O"""
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+from app import create_app, db
+from app.utils.migrations import run_migrations
+from config import Config
+
+# Objetos da pesquisa de texto (SQLite), criados fora dos modelos
+FTS_TABLES = ('tasks_fts', 'tasks_fts_data', 'tasks_fts_idx', 'tasks_fts_docsize', 'tasks_fts_config')
+
+def schema_differences(engine):
+    """Diferenças entre o esquema da base de dados e os modelos"""
+    with engine.connect() as connection:
+        differences = compare_metadata(MigrationContext.configure(connection), db.metadata)
+    return [
+        difference for difference in differences
+        if not (difference[0] == 'remove_table' and difference[1].name in FTS_TABLES)
+    ]
+
+@pytest.fixture
+def engine(tmp_path):
+    """Engine de uma base de dados SQLite vazia"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'migrations.db'}")
+    yield engine
+    engine.dispose()
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestCreateAppNoDatabaseIO:
+    """Testes para o arranque da aplicação"""
+    
+    def test_create_app_does_not_touch_database(self, tmp_path):
+        """Testa que create_app não abre ligações à base de dados"""
+        database = tmp_path / 'untouched.db'
+        
+        class UntouchedConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{database}"
+            PASSWORD_HASH_EXECUTOR = 'inline'
+        
+        app = create_app(UntouchedConfig)
+        
+        assert app is not None
+        assert not database.exists()
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestMigrations:
+    """Testes para as migrações Alembic"""
+    
+    def test_upgrade_matches_models(self, app, engine):
+        """Testa que as migrações produzem o esquema dos modelos"""
+        run_migrations(engine)
+        
+        assert schema_differences(engine) == []
+        with engine.connect() as connection:
+            version = connection.execute(text('SELECT version_num FROM alembic_version')).scalar()
+        assert version == '0003'
+    
+    def test_upgrade_creates_search_index(self, app, engine):
+        """Testa que a pesquisa de texto fica ativa após as migrações"""
+        run_migrations(engine)
+        
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO users (id, username, email, hashed_password) "
+                "VALUES (1, 'search', 'search@example.com', 'x')"
+            ))
+            connection.execute(text(
+                "INSERT INTO tasks (title, description, completed, user_id) "
+                "VALUES ('Relatório trimestral', NULL, 0, 1)"
+            ))
+            matches = connection.execute(text(
+                "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'relatorio'"
+            )).all()
+        
+        assert len(matches) == 1
+    
+    def test_upgrade_is_idempotent(self, app, engine):
+        """Testa que executar as migrações novamente não altera nada"""
+        run_migrations(engine)
+        run_migrations(engine)
+        
+        assert schema_differences(engine) == []
+    
+    def test_legacy_create_all_schema_is_adopted(self, app, engine):
+        """Testa que um esquema criado por db.create_all() é marcado e atualizado"""
+        db.metadata.create_all(engine)
+        
+        run_migrations(engine)
+        
+        inspector = inspect(engine)
+        assert inspector.has_table('alembic_version')
+        assert schema_differences(engine) == []
+    
+    def test_legacy_baseline_schema_is_upgraded(self, app, engine):
+        """Testa que um esquema da versão inicial recebe as tabelas novas"""
+        db.metadata.create_all(engine, tables=[
+            db.metadata.tables['users'],
+            db.metadata.tables['tasks']
+        ])
+        with engine.begin() as connection:
+            connection.execute(text('DROP INDEX idx_user_change_seq'))
+            connection.execute(text('ALTER TABLE tasks DROP COLUMN change_seq'))
+            connection.execute(text(
+                "INSERT INTO users (id, username, email, hashed_password) "
+                "VALUES (1, 'legacy', 'legacy@example.com', 'x')"
+            ))
+            connection.execute(text("INSERT INTO tasks (id, title, completed, user_id) VALUES (7, 'Antiga', 0, 1)"))
+        
+        run_migrations(engine)
+        
+        inspector = inspect(engine)
+        assert inspector.has_table('task_counters')
+        assert inspector.has_table('task_tombstones')
+        indexes = {index['name'] for index in inspector.get_indexes('tasks')}
+        assert 'idx_user_change_seq' in indexes
+        assert 'idx_user_updated' not in indexes
+        assert schema_differences(engine) == []
+        with engine.connect() as connection:
+            # Tarefas existentes recebem uma sequência (o id) para a primeira sincronização
+            assert connection.execute(text('SELECT change_seq FROM tasks')).scalar() == 7
@@ -1,7 +1,20 @@
 """Testes para rate limiter"""
+import os
+import socketserver
+import threading
 import pytest
-from app.middleware.rate_limiter import setup_rate_limiter, rate_limit
+from app.middleware.rate_limiter import (
+    setup_rate_limiter,
+    rate_limit,
+    rate_limit_exempt,
+    parse_limits,
+    create_storage,
+    RateLimitStorage,
+    RedisProtocolError,
+    SharedMemoryRateLimitStorage
+)
 from flask import Flask
+from app.exceptions import RateLimitExceededException
 
 @pytest.mark.unit
 @pytest.mark.middleware
@@ -54,3 +67,271 @@ class TestRateLimiter:
             assert response.status_code == 200
             assert response.get_json() is not None
 
+
+class FakeRedisHandler(socketserver.StreamRequestHandler):
+    """Servidor mínimo compatível com o protocolo Redis, para testes"""
+    
+    def read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        count = int(line[1:-2])
+        args = []
+        for _ in range(count):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2].decode())
+        return args
+    
+    def encode(self, value):
+        if isinstance(value, Exception):
+            return f'-ERR {value}\r\n'.encode()
+        if value is None:
+            return b'$-1\r\n'
+        if isinstance(value, int):
+            return f':{value}\r\n'.encode()
+        if isinstance(value, list):
+            return f'*{len(value)}\r\n'.encode() + b''.join(self.encode(v) for v in value)
+        if value in ('OK', 'QUEUED'):
+            return f'+{value}\r\n'.encode()
+        return f'${len(value)}\r\n{value}\r\n'.encode()
+    
+    def run(self, args):
+        data = self.server.data
+        name = args[0].upper()
+        if name in ('INCR', 'DECR'):
+            value = int(data.get(args[1], 0)) + (1 if name == 'INCR' else -1)
+            data[args[1]] = str(value)
+            return value
+        if name == 'GET':
+            return data.get(args[1])
+        if name == 'PEXPIRE':
+            return 1 if args[1] in data else 0
+        if name == 'FLUSHDB':
+            data.clear()
+        if name == 'AUTH' and args[1] != self.server.password:
+            return Exception('invalid password')
+        return 'OK'
+    
+    def handle(self):
+        queued = None
+        while True:
+            args = self.read_command()
+            if args is None:
+                return
+            name = args[0].upper()
+            self.server.commands.append(name)
+            if name == 'MULTI':
+                queued = []
+                reply = 'OK'
+            elif name == 'EXEC':
+                reply = [self.run(command) for command in queued]
+                queued = None
+            elif queued is not None:
+                queued.append(args)
+                reply = 'QUEUED'
+            else:
+                reply = self.run(args)
+            self.wfile.write(self.encode(reply))
+
+@pytest.fixture
+def fake_redis():
+    """Servidor Redis local de substituição"""
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FakeRedisHandler)
+    server.daemon_threads = True
+    server.data = {}
+    server.commands = []
+    server.password = None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.unit
+@pytest.mark.middleware
+class TestRateLimitStorages:
+    """Testes para os armazenamentos do rate limiter"""
+    
+    @pytest.mark.parametrize('uri', ['memory://', 'shm://?slots=64'])
+    def test_local_storages(self, uri):
+        """Testa incremento, leitura da janela anterior e decremento"""
+        storage = create_storage(uri)
+        
+        assert storage.incr_and_get('a:2', 'a:1', 60) == (1, 0)
+        assert storage.incr_and_get('a:2', 'a:1', 60) == (2, 0)
+        assert storage.incr_and_get('a:3', 'a:2', 60) == (1, 2)
+        
+        storage.decr('a:3')
+        assert storage.incr_and_get('a:3', 'a:2', 60) == (1, 2)
+        
+        storage.reset()
+        assert storage.incr_and_get('a:2', 'a:1', 60) == (1, 0)
+    
+    def test_shared_memory_storage_across_fork(self):
+        """Testa que um processo filho partilha os contadores"""
+        storage = SharedMemoryRateLimitStorage(slots=64)
+        storage.incr_and_get('k', 'p', 60)
+        
+        pid = os.fork()
+        if pid == 0:
+            storage.incr_and_get('k', 'p', 60)
+            os._exit(0)
+        os.waitpid(pid, 0)
+        
+        assert storage.incr_and_get('k', 'p', 60) == (3, 0)
+    
+    def test_shared_memory_storage_evicts_when_full(self):
+        """Testa reutilização de slots quando a tabela está cheia"""
+        storage = SharedMemoryRateLimitStorage(slots=4)
+        for i in range(20):
+            assert storage.incr_and_get(f'key{i}', 'p', 60 + i)[0] == 1
+    
+    def test_redis_storage(self, fake_redis):
+        """Testa o armazenamento Redis contra um servidor local"""
+        host, port = fake_redis.server_address
+        storage = create_storage(f'redis://{host}:{port}/0')
+        
+        assert storage.incr_and_get('a:2', 'a:1', 60) == (1, 0)
+        assert storage.incr_and_get('a:3', 'a:2', 60) == (1, 1)
+        storage.decr('a:3')
+        
+        assert fake_redis.data['a:3'] == '0'
+        assert fake_redis.commands[:5] == ['MULTI', 'INCR', 'PEXPIRE', 'GET', 'EXEC']
+    
+    def test_redis_failed_auth_not_cached(self, fake_redis):
+        """Testa que uma ligação cujo AUTH falhou não é reutilizada"""
+        host, port = fake_redis.server_address
+        fake_redis.password = 'secret'
+        storage = create_storage(f'redis://:wrong@{host}:{port}/0')
+        
+        with pytest.raises(RedisProtocolError):
+            storage.incr_and_get('a:2', 'a:1', 60)
+        assert getattr(storage._local, 'conn', None) is None
+        
+        # Nova tentativa repete o handshake em vez de usar a ligação falhada
+        with pytest.raises(RedisProtocolError):
+            storage.incr_and_get('a:2', 'a:1', 60)
+        assert fake_redis.commands == ['AUTH', 'AUTH']
+        assert 'a:2' not in fake_redis.data
+        
+        storage.password = 'secret'
+        assert storage.incr_and_get('a:2', 'a:1', 60) == (1, 0)
+    
+    def test_storage_interface_is_abstract(self):
+        """Testa que a interface de armazenamento não pode ser instanciada"""
+        with pytest.raises(TypeError):
+            RateLimitStorage()
+    
+    def test_invalid_storage_uri(self):
+        """Testa URI de armazenamento inválido"""
+        with pytest.raises(ValueError):
+            create_storage('memcached://localhost')
+
+@pytest.mark.unit
+@pytest.mark.middleware
+class TestRateLimiterEnforcement:
+    """Testes da aplicação dos limites"""
+    
+    def test_parse_limits(self):
+        """Testa conversão de strings de limites"""
+        assert parse_limits('100 per hour') == [(100, 3600, '100 per hour')]
+        assert parse_limits('10/minute;5 per 10 seconds') == [
+            (10, 60, '10/minute'),
+            (5, 10, '5 per 10 seconds')
+        ]
+        with pytest.raises(ValueError):
+            parse_limits('muitos por hora')
+    
+    def test_default_limit_from_config(self, app):
+        """Testa que RATELIMIT_DEFAULT é aplicado e os headers preenchidos"""
+        app.config['RATELIMIT_DEFAULT'] = '2 per minute'
+        setup_rate_limiter(app)
+        
+        @app.route('/test-default-limit')
+        def test_route():
+            return {'message': 'test'}
+        
+        with app.test_client() as client:
+            first = client.get('/test-default-limit')
+            assert first.headers['X-RateLimit-Limit'] == '2'
+            assert first.headers['X-RateLimit-Remaining'] == '1'
+            assert 'X-RateLimit-Reset' in first.headers
+            
+            client.get('/test-default-limit')
+            blocked = client.get('/test-default-limit')
+            assert blocked.status_code == 429
+            assert blocked.get_json()['error_code'] == 'RATE_LIMIT_EXCEEDED'
+            assert blocked.headers['X-RateLimit-Remaining'] == '0'
+            assert 'Retry-After' in blocked.headers
+    
+    def test_per_route_decorator_enforced(self, app):
+        """Testa que o decorator define o limite da rota"""
+        setup_rate_limiter(app)
+        
+        @app.route('/test-route-limit')
+        @rate_limit("1 per minute")
+        def test_route():
+            return {'message': 'test'}
+        
+        with app.test_client() as client:
+            assert client.get('/test-route-limit').status_code == 200
+            assert client.get('/test-route-limit').status_code == 429
+    
+    def test_rejected_request_not_counted_by_other_limits(self, app):
+        """Testa que um pedido rejeitado por um limite não gasta a quota dos restantes"""
+        limiter = setup_rate_limiter(app)
+        limits = parse_limits('5 per minute;1 per minute')
+        
+        with app.test_request_context('/'):
+            limiter.check(limits, 'scope')
+            for _ in range(3):
+                with pytest.raises(RateLimitExceededException):
+                    limiter.check(limits, 'scope')
+            
+            # Só o pedido permitido ficou contado no limite de 5 por minuto
+            allowed, remaining, _ = limiter.hit(f'scope:{limiter._identity()}:5 per minute', 5, 60)
+            assert allowed and remaining >= 3
+    
+    def test_exempt_route(self, app):
+        """Testa rota isenta de rate limiting"""
+        app.config['RATELIMIT_DEFAULT'] = '1 per minute'
+        setup_rate_limiter(app)
+        
+        @app.route('/test-exempt')
+        @rate_limit_exempt
+        def test_route():
+            return {'message': 'test'}
+        
+        with app.test_client() as client:
+            for _ in range(3):
+                response = client.get('/test-exempt')
+                assert response.status_code == 200
+                assert 'X-RateLimit-Limit' not in response.headers
+    
+    def test_storage_failure_fails_open(self, app, fake_redis):
+        """Testa que uma falha do armazenamento não bloqueia pedidos"""
+        host, port = fake_redis.server_address
+        app.config['RATELIMIT_STORAGE_URI'] = f'redis://{host}:{port}/0'
+        limiter = setup_rate_limiter(app)
+        fake_redis.shutdown()
+        fake_redis.server_close()
+        limiter.storage.port = 1
+        
+        @app.route('/test-fail-open')
+        def test_route():
+            return {'message': 'test'}
+        
+        with app.test_client() as client:
+            assert client.get('/test-fail-open').status_code == 200
+    
+    def test_login_route_limit(self, app, client):
+        """Testa o limite específico da rota de login"""
+        setup_rate_limiter(app)
+        
+        statuses = [
+            client.post('/api/auth/login', json={'username': 'x', 'password': 'y'}).status_code
+            for _ in range(11)
+        ]
+        
+        assert statuses[-1] == 429
+        assert 429 not in statuses[:10]
@@ -0,0 +1,104 @@
+"""Testes para a política de hashing de palavras-passe"""
+import pytest
+from unittest.mock import patch
+from app import db
+from app.models.user import User
+from app.services.auth_service import AuthService
+from app.schemas.user import UserLogin
+from app.utils.security import (
+    calibrate_bcrypt_rounds,
+    get_hash_policy,
+    set_hash_policy,
+    get_password_hash,
+    verify_and_update_password
+)
+
+@pytest.fixture
+def restore_policy():
+    """Repõe a política de hashing após o teste"""
+    policy = get_hash_policy()
+    yield
+    set_hash_policy(*policy)
+
+@pytest.mark.unit
+@pytest.mark.auth
+class TestPasswordHashPolicy:
+    """Testes para calibração e migração de hashes"""
+    
+    def test_calibrate_extrapolates_rounds(self):
+        """Testa escolha do custo a partir da medição do custo mínimo"""
+        with patch('app.utils.security.statistics.median', return_value=50.0):
+            assert calibrate_bcrypt_rounds(target_ms=250, min_rounds=10, max_rounds=16) == 12
+            assert calibrate_bcrypt_rounds(target_ms=40, min_rounds=10, max_rounds=16) == 10
+            assert calibrate_bcrypt_rounds(target_ms=100000, min_rounds=10, max_rounds=16) == 16
+    
+    def test_calibrate_on_host(self):
+        """Testa calibração real dentro dos limites"""
+        rounds = calibrate_bcrypt_rounds(target_ms=50, min_rounds=4, max_rounds=8, samples=1)
+        assert 4 <= rounds <= 8
+    
+    def test_verify_and_update_flags_cost_change(self, restore_policy):
+        """Testa deteção de hash com custo diferente da política"""
+        set_hash_policy(('bcrypt',), 4)
+        hashed = get_password_hash('Password123!')
+        
+        assert verify_and_update_password('Password123!', hashed) == (True, None)
+        
+        set_hash_policy(('bcrypt',), 5)
+        valid, new_hash = verify_and_update_password('Password123!', hashed)
+        assert valid is True
+        assert new_hash.startswith('$2b$05$')
+    
+    def test_unavailable_scheme_rejected(self, restore_policy):
+        """Testa esquema sem backend instalado"""
+        with patch('app.utils.security.get_crypt_handler') as mock_handler:
+            mock_handler.return_value.has_backend.return_value = False
+            with pytest.raises(RuntimeError):
+                set_hash_policy(('argon2', 'bcrypt'), 12)
+    
+    def test_higher_cost_hash_not_downgraded(self, restore_policy):
+        """Testa que um hash com custo acima da política não é migrado"""
+        set_hash_policy(('bcrypt',), 5)
+        hashed = get_password_hash('Password123!')
+        
+        set_hash_policy(('bcrypt',), 4)
+        assert verify_and_update_password('Password123!', hashed) == (True, None)
+    
+    def test_login_rehashes_outdated_hash(self, app, test_user, restore_policy):
+        """Testa migração transparente do hash no login"""
+        with app.app_context():
+            set_hash_policy(('bcrypt',), 4)
+            user = db.session.get(User, test_user.id)
+            user.hashed_password = get_password_hash('TestPass123!')
+            db.session.commit()
+            
+            set_hash_policy(('bcrypt',), 5)
+            result = AuthService.authenticate_user(UserLogin(username='testuser', password='TestPass123!'))
+            
+            assert result['user']['username'] == 'testuser'
+            db.session.expire_all()
+            user = db.session.get(User, test_user.id)
+            assert user.hashed_password.startswith('$2b$05$')
+            
+            AuthService.authenticate_user(UserLogin(username='testuser', password='TestPass123!'))
+    
+    def test_configure_from_app_config(self, app, restore_policy):
+        """Testa aplicação da configuração com calibração"""
+        from app.utils.security import configure_password_hashing
+        app.config['PASSWORD_HASH_CALIBRATE'] = True
+        
+        app.config['PASSWORD_HASH_BCRYPT_ROUNDS'] = 10
+        
+        with patch.dict('app.utils.security._calibrated_rounds', clear=True), \
+                patch('app.utils.security.calibrate_bcrypt_rounds', return_value=11) as calibrate:
+            configure_password_hashing(app)
+            assert get_hash_policy() == (('bcrypt',), 11)
+            
+            # Uma só calibração por processo, mesmo com várias aplicações
+            configure_password_hashing(app)
+            assert calibrate.call_count == 1
+            
+            # A calibração nunca desce abaixo do custo configurado
+            app.config['PASSWORD_HASH_BCRYPT_ROUNDS'] = 12
+            configure_password_hashing(app)
+            assert get_hash_policy() == (('bcrypt',), 12)
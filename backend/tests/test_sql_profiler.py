@@ -0,0 +1,153 @@
+"""Testes para o perfil das queries SQL por pedido e os orçamentos de queries"""
+import logging
+import pytest
+from sqlalchemy import select, text
+from app import create_app, db
+from app.models.task import Task
+from app.utils.query_tracker import QueryStats
+from app.utils.sql_profiler import check_query_budget, format_server_timing
+from config import Config
+
+class ProfilingConfig(Config):
+    """Configuração de testes com o perfil das queries ativo"""
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    PASSWORD_HASH_EXECUTOR = 'inline'
+    SQL_PROFILING = True
+    SQL_PROFILING_DUPLICATE_THRESHOLD = 3
+
+@pytest.fixture
+def profiled_app():
+    """Aplicação com SQL_PROFILING ativo e uma rota com queries repetidas"""
+    app = create_app(ProfilingConfig)
+    
+    @app.route('/_repeated_queries')
+    def repeated_queries():
+        for _ in range(3):
+            db.session.execute(text('SELECT 1'))
+        return {'ok': True}
+    
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+@pytest.fixture
+def warm_tasks(client, auth_headers):
+    """Cria tarefas e inicializa os contadores do utilizador"""
+    for i in range(3):
+        client.post('/api/tasks', json={'title': f'Tarefa {i}'}, headers=auth_headers)
+    client.get('/api/tasks', headers=auth_headers)
+    return auth_headers
+
+@pytest.mark.unit
+@pytest.mark.app
+class TestQueryStats:
+    """Testes para a contagem das queries repetidas"""
+    
+    def test_duplicates(self):
+        """Testa a deteção de queries executadas várias vezes"""
+        stats = QueryStats(track_statements=True)
+        for statement in ('SELECT a', 'SELECT b', 'SELECT a', 'SELECT a'):
+            stats.record(statement, None, 0.001)
+        
+        assert stats.count == 4
+        assert stats.duplicates() == {'SELECT a': 3}
+        assert stats.duplicates(4) == {}
+    
+    def test_duplicates_without_statements(self):
+        """Testa que sem track_statements só o número de queries é guardado"""
+        stats = QueryStats()
+        stats.record('SELECT a', None, 0.001)
+        stats.record('SELECT a', None, 0.001)
+        
+        assert stats.count == 2
+        assert stats.duplicates() == {}
+    
+    def test_check_query_budget(self):
+        """Testa a comparação com o orçamento de queries"""
+        stats = QueryStats(track_statements=True)
+        for _ in range(3):
+            stats.record('SELECT * FROM tasks WHERE id = ?', None, 0.001)
+        
+        assert check_query_budget(stats, max_queries=3, max_repeats=3) == []
+        assert check_query_budget(stats, max_queries=2) == ['3 queries (máximo 2)']
+        assert check_query_budget(stats, max_repeats=1) == ['3x SELECT * FROM tasks WHERE id = ? (máximo 1)']
+    
+    def test_format_server_timing(self):
+        """Testa o valor do header Server-Timing"""
+        stats = QueryStats()
+        stats.record('SELECT 1', None, 0.0015)
+        
+        assert format_server_timing(stats, 0.01) == 'db;dur=1.50;desc="1 queries", app;dur=10.00'
+
+@pytest.mark.integration
+@pytest.mark.app
+class TestSQLProfiler:
+    """Testes para o perfil das queries nos pedidos (SQL_PROFILING)"""
+    
+    def test_disabled_by_default(self, client):
+        """Testa que sem SQL_PROFILING não há header Server-Timing"""
+        response = client.get('/readyz')
+        
+        assert 'Server-Timing' not in response.headers
+    
+    def test_server_timing_header(self, profiled_app):
+        """Testa o header Server-Timing com as queries do pedido"""
+        response = profiled_app.test_client().get('/_repeated_queries')
+        timing = response.headers['Server-Timing']
+        
+        assert timing.startswith('db;dur=')
+        assert 'desc="3 queries"' in timing
+        assert ', app;dur=' in timing
+    
+    def test_repeated_queries_warning(self, profiled_app, caplog):
+        """Testa o aviso quando a mesma query se repete no pedido (N+1)"""
+        with caplog.at_level(logging.WARNING):
+            profiled_app.test_client().get('/_repeated_queries')
+        
+        assert 'Queries repetidas em GET /_repeated_queries' in caplog.text
+        assert '3x SELECT 1' in caplog.text
+    
+    def test_no_warning_below_threshold(self, profiled_app, caplog):
+        """Testa que não há aviso abaixo de SQL_PROFILING_DUPLICATE_THRESHOLD"""
+        with caplog.at_level(logging.WARNING):
+            profiled_app.test_client().get('/readyz')
+        
+        assert 'Queries repetidas' not in caplog.text
+
+@pytest.mark.integration
+@pytest.mark.tasks
+class TestQueryBudgets:
+    """Orçamentos de queries dos endpoints de tarefas (marker query_budget)"""
+    
+    @pytest.mark.query_budget(3, max_repeats=1)
+    def test_create_task(self, client, warm_tasks):
+        """Testa as queries da criação de uma tarefa"""
+        response = client.post('/api/tasks', json={'title': 'Nova'}, headers=warm_tasks)
+        
+        assert response.status_code == 201
+    
+    @pytest.mark.query_budget(2, max_repeats=1)
+    def test_list_tasks(self, client, warm_tasks):
+        """Testa as queries da listagem (contadores, lidos uma vez para o ETag e o total, e página)"""
+        response = client.get('/api/tasks', headers=warm_tasks)
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.query_budget(1)
+    def test_get_task(self, client, warm_tasks):
+        """Testa que obter uma tarefa executa uma única query"""
+        task_id = db.session.execute(select(Task.id)).scalars().first()
+        
+        response = client.get(f'/api/tasks/{task_id}', headers=warm_tasks)
+        
+        assert response.status_code == 200
+    
+    @pytest.mark.query_budget(4, max_repeats=1)
+    def test_update_and_delete_task(self, client, warm_tasks):
+        """Testa as queries da atualização e da eliminação de uma tarefa"""
+        task_id = client.post('/api/tasks', json={'title': 'Nova'}, headers=warm_tasks).get_json()['task']['id']
+        
+        assert client.put(f'/api/tasks/{task_id}', json={'completed': True}, headers=warm_tasks).status_code == 200
+        assert client.delete(f'/api/tasks/{task_id}', headers=warm_tasks).status_code == 200
@@ -0,0 +1,164 @@
+"""Testes para TaskCounterService"""
+import pytest
+from unittest.mock import patch
+from app.services.task_service import TaskService
+from app.services.task_counter_service import TaskCounterService
+from app.schemas.task import TaskCreate, TaskUpdate
+from app import create_app, db
+from app.models.task import Task
+from app.models.task_counter import TaskCounter
+from app.models.user import User
+from app.utils.migrations import run_migrations
+from config import Config
+
+@pytest.mark.unit
+@pytest.mark.tasks
+class TestTaskCounterService:
+    """Testes para os contadores de tarefas"""
+    
+    def test_get_counts_initializes_from_tasks(self, app, test_user):
+        """Testa inicialização dos contadores a partir das tarefas existentes"""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='Feita', completed=True, user_id=test_user.id),
+                Task(title='Pendente', user_id=test_user.id)
+            ])
+            db.session.commit()
+            
+            counts = TaskCounterService.get_counts(test_user.id)
+            
+            assert counts == {'total': 2, 'completed': 1, 'pending': 1}
+            assert db.session.get(TaskCounter, test_user.id) is not None
+    
+    def test_initialization_does_not_commit_caller_session(self, app, test_user):
+        """Testa que a inicialização dos contadores não faz commit da sessão do chamador"""
+        with app.app_context():
+            with patch.object(db.session, 'commit') as commit, \
+                    patch.object(db.session, 'rollback') as rollback:
+                counts = TaskCounterService.get_counts(test_user.id)
+            
+            commit.assert_not_called()
+            rollback.assert_not_called()
+            assert counts == {'total': 0, 'completed': 0, 'pending': 0}
+            
+            # Persistidos na ligação própria: sobrevivem ao rollback da sessão
+            db.session.rollback()
+            assert db.session.get(TaskCounter, test_user.id) is not None
+    
+    def test_counts_follow_service_writes(self, app, test_user):
+        """Testa que create/update/delete mantêm os contadores"""
+        with app.app_context():
+            assert TaskCounterService.get_counts(test_user.id)['total'] == 0
+            
+            task = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            TaskService.create_task(TaskCreate(title='Feita', completed=True), test_user)
+            assert TaskCounterService.get_counts(test_user.id) == {
+                'total': 2, 'completed': 1, 'pending': 1
+            }
+            
+            TaskService.update_task(task.id, TaskUpdate(completed=True), test_user)
+            assert TaskCounterService.get_counts(test_user.id)['completed'] == 2
+            
+            TaskService.update_task(task.id, TaskUpdate(completed=True), test_user)
+            assert TaskCounterService.get_counts(test_user.id)['completed'] == 2
+            
+            TaskService.delete_task(task.id, test_user)
+            assert TaskCounterService.get_counts(test_user.id) == {
+                'total': 1, 'completed': 1, 'pending': 0
+            }
+    
+    def test_get_user_tasks_uses_counters(self, app, test_user):
+        """Testa que a listagem usa os contadores para o total"""
+        with app.app_context():
+            for i in range(3):
+                TaskService.create_task(TaskCreate(title=f'Tarefa {i}', completed=i == 0), test_user)
+            
+            result = TaskService.get_user_tasks(test_user, per_page=2)
+            assert result['total'] == 3
+            assert result['pages'] == 2
+            assert result['has_next'] is True
+            
+            result = TaskService.get_user_tasks(test_user, status_filter='pending')
+            assert result['total'] == 2
+            assert len(result['tasks']) == 2
+    
+    def test_reconcile_fixes_drift(self, app, test_user):
+        """Testa correção de desvios nos contadores"""
+        with app.app_context():
+            TaskCounterService.get_counts(test_user.id)
+            TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            db.session.add(Task(title='Fora do serviço', completed=True, user_id=test_user.id))
+            db.session.commit()
+            
+            fixed = TaskCounterService.reconcile()
+            
+            assert len(fixed) == 1
+            assert fixed[0]['new'] == {'total': 2, 'completed': 1}
+            assert TaskCounterService.get_counts(test_user.id)['total'] == 2
+            assert TaskCounterService.reconcile(test_user.id) == []
+    
+    def test_reconcile_creates_missing_counters(self, app, test_user):
+        """Testa criação de contadores em falta na reconciliação"""
+        with app.app_context():
+            db.session.add(Task(title='Tarefa', user_id=test_user.id))
+            db.session.commit()
+            
+            fixed = TaskCounterService.reconcile()
+            
+            assert fixed == [{
+                'user_id': test_user.id,
+                'old': None,
+                'new': {'total': 1, 'completed': 0}
+            }]
+            assert db.session.get(TaskCounter, test_user.id).total == 1
+    
+    def test_version_changes_on_every_write(self, app, test_user):
+        """Testa que a versão muda em todas as escritas do TaskService"""
+        with app.app_context():
+            versions = [TaskCounterService.get_version(test_user.id)]
+            
+            task = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            versions.append(TaskCounterService.get_version(test_user.id))
+            
+            TaskService.update_task(task.id, TaskUpdate(title='Renomeada'), test_user)
+            versions.append(TaskCounterService.get_version(test_user.id))
+            
+            TaskService.update_task(task.id, TaskUpdate(completed=True), test_user)
+            versions.append(TaskCounterService.get_version(test_user.id))
+            
+            TaskService.delete_task(task.id, test_user)
+            versions.append(TaskCounterService.get_version(test_user.id))
+            
+            assert versions == sorted(set(versions))
+            assert len(versions) == 5
+    
+    def test_first_write_on_file_database(self, tmp_path):
+        """Testa a primeira escrita de um utilizador sem contadores numa base de dados SQLite em ficheiro"""
+        class FileConfig(Config):
+            TESTING = True
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'counters.db'}"
+            # Um lock em espera falha em 1 s em vez do busy timeout por omissão
+            SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 1}}
+            PASSWORD_HASH_EXECUTOR = 'inline'
+        
+        file_app = create_app(FileConfig)
+        with file_app.app_context():
+            run_migrations(db.engine)
+            user = User(username='ficheiro', email='ficheiro@example.com', hashed_password='x')
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+            
+            task_id = TaskService.create_task(TaskCreate(title='Primeira', completed=True), user).id
+            
+            db.session.remove()
+            counter = db.session.get(TaskCounter, user_id)
+            assert (counter.total, counter.completed) == (1, 1)
+            assert db.session.get(Task, task_id).change_seq == counter.version
+            
+            # Leitura: inicializa numa ligação própria
+            reader = User(username='leitor', email='leitor@example.com', hashed_password='x')
+            db.session.add(reader)
+            db.session.commit()
+            assert TaskCounterService.get_counts(reader.id)['total'] == 0
+            db.engine.dispose()
@@ -0,0 +1,144 @@
+"""Testes para os eventos das tarefas (SSE)"""
+import pytest
+from app import db
+from app.exceptions.custom_exceptions import ServiceUnavailableException
+from app.schemas.task import TaskCreate, TaskUpdate
+from app.services.task_service import TaskService
+from app.utils.task_events import TaskEventBroker, task_events
+
+@pytest.fixture
+def subscription(app, test_user):
+    """Subscrição aos eventos do utilizador de teste"""
+    subscription = task_events.subscribe(test_user.id)
+    yield subscription
+    task_events.unsubscribe(subscription)
+
+@pytest.mark.unit
+@pytest.mark.tasks
+class TestTaskEventBroker:
+    """Testes para o broker de eventos"""
+    
+    def test_deliver_only_to_user(self):
+        """Testa que os eventos só chegam às subscrições do utilizador"""
+        broker = TaskEventBroker()
+        mine = broker.subscribe(1)
+        other = broker.subscribe(2)
+        
+        broker.deliver({'type': 'created', 'user_id': 1, 'task_id': 10})
+        
+        assert mine.get(timeout=0.1)['task_id'] == 10
+        assert other.get(timeout=0.01) is None
+    
+    def test_unsubscribe(self):
+        """Testa remoção da subscrição"""
+        broker = TaskEventBroker()
+        subscription = broker.subscribe(1)
+        assert broker.subscriber_count() == 1
+        
+        broker.unsubscribe(subscription)
+        
+        assert broker.subscriber_count() == 0
+    
+    def test_overflow(self):
+        """Testa marcação de overflow quando a fila enche"""
+        broker = TaskEventBroker(max_queue=1)
+        subscription = broker.subscribe(1)
+        
+        broker.deliver({'type': 'created', 'user_id': 1, 'task_id': 1})
+        broker.deliver({'type': 'created', 'user_id': 1, 'task_id': 2})
+        
+        assert subscription.overflowed is True
+    
+    def test_max_streams(self):
+        """Testa que acima do limite de streams a subscrição é rejeitada com 503"""
+        broker = TaskEventBroker(max_streams=1)
+        subscription = broker.subscribe(1)
+        
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            broker.subscribe(2)
+        assert exc_info.value.retry_after > 0
+        
+        broker.unsubscribe(subscription)
+        broker.unsubscribe(broker.subscribe(2))
+    
+    def test_invalid_backend(self):
+        """Testa backend inválido"""
+        with pytest.raises(ValueError):
+            TaskEventBroker(backend='kafka')
+    
+    def test_events_published_after_commit(self, app, test_user, subscription):
+        """Testa que as escritas do TaskService publicam eventos após o commit"""
+        with app.app_context():
+            task = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            TaskService.update_task(task.id, TaskUpdate(completed=True), test_user)
+            TaskService.delete_task(task.id, test_user)
+        
+        events = [subscription.get(timeout=0.1) for _ in range(3)]
+        assert [event['type'] for event in events] == ['created', 'updated', 'deleted']
+        assert events[1]['task']['completed'] is True
+        assert events[2]['task_id'] == task.id
+    
+    def test_events_discarded_on_rollback(self, app, test_user, subscription):
+        """Testa que eventos de transações anuladas não são publicados"""
+        from app.utils.task_events import record_task_event
+        
+        with app.app_context():
+            db.session.execute(db.text('SELECT 1'))
+            record_task_event(db.session, 'created', test_user.id, 1, {'id': 1})
+            db.session.rollback()
+            db.session.commit()
+        
+        assert subscription.get(timeout=0.01) is None
+
+@pytest.mark.integration
+@pytest.mark.tasks
+class TestTaskStreamRoute:
+    """Testes para a rota de stream SSE"""
+    
+    def test_stream_receives_events(self, app, client, auth_headers):
+        """Testa que o stream entrega os eventos das escritas"""
+        app.config['TASK_EVENTS_MAX_STREAM_SECONDS'] = 1
+        app.config['TASK_EVENTS_HEARTBEAT'] = 0.2
+        
+        response = client.get('/api/tasks/stream', headers=auth_headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        
+        client.post('/api/tasks', json={'title': 'Em tempo real'}, headers=auth_headers)
+        
+        body = b''.join(response.response).decode()
+        assert body.startswith('retry: ')
+        assert 'event: task.created' in body
+        assert 'Em tempo real' in body
+        assert task_events.subscriber_count() == 0
+    
+    def test_stream_token_in_query_string(self, app, client, auth_headers):
+        """Testa autenticação do stream pelo parâmetro jwt"""
+        app.config['TASK_EVENTS_MAX_STREAM_SECONDS'] = 0
+        token = auth_headers['Authorization'].split()[1]
+        
+        response = client.get(f'/api/tasks/stream?jwt={token}')
+        
+        assert response.status_code == 200
+        response.close()
+    
+    def test_stream_rejected_above_limit(self, client, auth_headers):
+        """Testa 503 com Retry-After quando o worker já tem o máximo de streams"""
+        max_streams = task_events.max_streams
+        task_events.max_streams = 0
+        try:
+            response = client.get('/api/tasks/stream', headers=auth_headers)
+        finally:
+            task_events.max_streams = max_streams
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '30'
+        assert response.get_json()['error_code'] == 'SERVICE_UNAVAILABLE'
+    
+    def test_query_string_token_not_accepted_elsewhere(self, client, auth_headers):
+        """Testa que o token no URL só é aceite no stream"""
+        token = auth_headers['Authorization'].split()[1]
+        
+        response = client.get(f'/api/tasks?jwt={token}')
+        
+        assert response.status_code == 401
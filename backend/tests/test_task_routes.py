@@ -1,4 +1,6 @@
 """Testes para rotas de tarefas"""
+import csv
+import io
 import pytest
 import json
 from unittest.mock import patch
@@ -36,6 +38,37 @@ class TestTaskRoutes:
         assert json_data['pagination']['total'] == 0
         assert len(json_data['tasks']) == 0
     
+    def test_list_tasks_cursor_mode(self, client, auth_headers):
+        """Testa listagem em modo cursor"""
+        for i in range(3):
+            client.post('/api/tasks', json={'title': f'Tarefa {i}'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks?cursor=&per_page=2', headers=auth_headers)
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert len(json_data['tasks']) == 2
+        assert json_data['pagination']['has_next'] is True
+        assert 'total' not in json_data['pagination']
+        
+        next_cursor = json_data['pagination']['next_cursor']
+        response = client.get(
+            f'/api/tasks?cursor={next_cursor}&per_page=2&include_total=true',
+            headers=auth_headers
+        )
+        
+        json_data = response.get_json()
+        assert len(json_data['tasks']) == 1
+        assert json_data['pagination']['has_next'] is False
+        assert json_data['pagination']['next_cursor'] is None
+        assert json_data['pagination']['total'] == 3
+    
+    def test_list_tasks_invalid_cursor(self, client, auth_headers):
+        """Testa listagem com cursor inválido"""
+        response = client.get('/api/tasks?cursor=%%%', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
     def test_list_tasks_unauthorized(self, client):
         """Testa listagem sem autenticação"""
         response = client.get('/api/tasks')
@@ -260,4 +293,256 @@ class TestTaskRoutes:
                 update_data = {'title': 'Atualizada'}
                 response = client.put(f'/api/tasks/{task_id}', json=update_data, headers=auth_headers)
                 assert response.status_code in [500, 400]
-
+    
+    def test_bulk_operations(self, client, auth_headers):
+        """Testa o endpoint de operações em lote"""
+        response = client.post('/api/tasks', json={'title': 'Existente'}, headers=auth_headers)
+        task_id = response.get_json()['task']['id']
+        
+        response = client.post('/api/tasks/bulk', json={
+            'operations': [
+                {'op': 'create', 'data': {'title': 'Em lote'}},
+                {'op': 'update', 'id': task_id, 'data': {'completed': True}},
+                {'op': 'update', 'id': 99999, 'data': {'completed': True}}
+            ]
+        }, headers=auth_headers)
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['summary'] == {'total': 3, 'succeeded': 2, 'failed': 1}
+        assert [result['status'] for result in json_data['results']] == [201, 200, 404]
+        
+        response = client.get('/api/tasks', headers=auth_headers)
+        assert response.get_json()['pagination']['total'] == 2
+    
+    def test_bulk_operations_invalid_request(self, client, auth_headers):
+        """Testa pedido em lote mal formado"""
+        response = client.post('/api/tasks/bulk', json={'operations': []}, headers=auth_headers)
+        assert response.status_code == 400
+        
+        response = client.post('/api/tasks/bulk', json={
+            'operations': [{'op': 'archive', 'id': 1}]
+        }, headers=auth_headers)
+        assert response.status_code == 400
+    
+    def test_list_tasks_etag(self, client, auth_headers):
+        """Testa 304 na listagem enquanto as tarefas não mudam"""
+        client.post('/api/tasks', json={'title': 'Tarefa 1'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks', headers=auth_headers)
+        etag = response.headers['ETag']
+        assert etag.startswith('W/')
+        assert 'Authorization' in response.headers['Vary']
+        
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.headers['ETag'] == etag
+        assert response.get_data() == b''
+        
+        response = client.get('/api/tasks?page=2', headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        
+        client.post('/api/tasks', json={'title': 'Tarefa 2'}, headers=auth_headers)
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    def test_list_tasks_etag_changes_on_update(self, client, auth_headers):
+        """Testa que a alteração de uma tarefa invalida o ETag da listagem"""
+        response = client.post('/api/tasks', json={'title': 'Tarefa 1'}, headers=auth_headers)
+        task_id = response.get_json()['task']['id']
+        etag = client.get('/api/tasks', headers=auth_headers).headers['ETag']
+        
+        client.put(f'/api/tasks/{task_id}', json={'title': 'Renomeada'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks', headers={**auth_headers, 'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.get_json()['tasks'][0]['title'] == 'Renomeada'
+    
+    def test_get_task_etag(self, client, auth_headers):
+        """Testa 304 ao obter uma tarefa inalterada"""
+        response = client.post('/api/tasks', json={'title': 'Tarefa 1'}, headers=auth_headers)
+        task_id = response.get_json()['task']['id']
+        
+        etag = client.get(f'/api/tasks/{task_id}', headers=auth_headers).headers['ETag']
+        response = client.get(
+            f'/api/tasks/{task_id}',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+        assert response.status_code == 304
+        
+        client.put(f'/api/tasks/{task_id}', json={'completed': True}, headers=auth_headers)
+        response = client.get(
+            f'/api/tasks/{task_id}',
+            headers={**auth_headers, 'If-None-Match': etag}
+        )
+        assert response.status_code == 200
+        assert response.get_json()['task']['completed'] is True
+    
+    def test_list_changes(self, client, auth_headers):
+        """Testa o endpoint de sincronização incremental"""
+        response = client.post('/api/tasks', json={'title': 'Tarefa 1'}, headers=auth_headers)
+        task_id = response.get_json()['task']['id']
+        
+        response = client.get('/api/tasks/changes', headers=auth_headers)
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert [task['id'] for task in json_data['tasks']] == [task_id]
+        since = json_data['next_since']
+        
+        client.delete(f'/api/tasks/{task_id}', headers=auth_headers)
+        
+        response = client.get('/api/tasks/changes', query_string={'since': since}, headers=auth_headers)
+        json_data = response.get_json()
+        assert json_data['tasks'] == []
+        assert [entry['id'] for entry in json_data['deleted']] == [task_id]
+        assert json_data['has_more'] is False
+    
+    def test_list_changes_invalid_since(self, client, auth_headers):
+        """Testa parâmetro since inválido"""
+        response = client.get('/api/tasks/changes?since=ontem', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_search_tasks(self, client, auth_headers):
+        """Testa o endpoint de pesquisa"""
+        client.post('/api/tasks', json={'title': 'Preparar apresentação'}, headers=auth_headers)
+        client.post('/api/tasks', json={'title': 'Outra tarefa'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks/search?q=apresenta', headers=auth_headers)
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert [task['title'] for task in json_data['tasks']] == ['Preparar apresentação']
+        assert json_data['pagination']['has_next'] is False
+    
+    def test_search_tasks_missing_query(self, client, auth_headers):
+        """Testa pesquisa sem parâmetro q"""
+        response = client.get('/api/tasks/search', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_export_tasks_ndjson(self, client, auth_headers):
+        """Testa a exportação em NDJSON (uma tarefa por linha)"""
+        for title in ('Tarefa 1', 'Tarefa 2', 'Tarefa 3'):
+            client.post('/api/tasks', json={'title': title}, headers=auth_headers)
+        
+        response = client.get('/api/tasks/export', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert 'tasks.ndjson' in response.headers['Content-Disposition']
+        tasks = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert sorted(task['title'] for task in tasks) == ['Tarefa 1', 'Tarefa 2', 'Tarefa 3']
+    
+    def test_export_tasks_csv(self, client, auth_headers):
+        """Testa a exportação em CSV com filtro de estado"""
+        client.post('/api/tasks', json={'title': 'Feita, com vírgula', 'completed': True}, headers=auth_headers)
+        client.post('/api/tasks', json={'title': 'Pendente'}, headers=auth_headers)
+        
+        response = client.get('/api/tasks/export?format=csv&status=completed', headers=auth_headers)
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/csv'
+        rows = list(csv.DictReader(io.StringIO(response.get_data(as_text=True))))
+        assert len(rows) == 1
+        assert rows[0]['title'] == 'Feita, com vírgula'
+        assert rows[0]['completed'] == 'true'
+        assert rows[0]['description'] == ''
+    
+    def test_export_tasks_empty_csv(self, client, auth_headers):
+        """Testa que a exportação sem tarefas devolve apenas o cabeçalho"""
+        response = client.get('/api/tasks/export?format=csv', headers=auth_headers)
+        
+        assert response.get_data(as_text=True) == 'id,title,description,completed,created_at,updated_at,user_id\n'
+    
+    def test_export_tasks_invalid_format(self, client, auth_headers):
+        """Testa formato de exportação inválido"""
+        response = client.get('/api/tasks/export?format=xml', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_import_tasks_ndjson(self, client, auth_headers):
+        """Testa a importação de NDJSON com erros por linha"""
+        body = '{"title": "Importada 1"}\n\n{"title": ""}\nnão é JSON\n{"title": "Importada 2", "completed": true}\n'
+        
+        response = client.post('/api/tasks/import', data=body, headers=auth_headers, content_type='application/x-ndjson')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['summary'] == {'total': 4, 'imported': 2, 'failed': 2}
+        assert [error['line'] for error in json_data['errors']] == [3, 4]
+        assert json_data['errors_truncated'] is False
+        
+        response = client.get('/api/tasks?status=completed', headers=auth_headers)
+        assert [task['title'] for task in response.get_json()['tasks']] == ['Importada 2']
+    
+    def test_import_tasks_csv_upload(self, client, auth_headers):
+        """Testa a importação de um CSV exportado, enviado como ficheiro"""
+        client.post('/api/tasks', json={'title': 'Com\nduas linhas', 'completed': True}, headers=auth_headers)
+        client.post('/api/tasks', json={'title': 'Pendente', 'description': 'Descrição'}, headers=auth_headers)
+        exported = client.get('/api/tasks/export?format=csv', headers=auth_headers).get_data()
+        
+        response = client.post(
+            '/api/tasks/import',
+            data={'file': (io.BytesIO(exported), 'tasks.csv')},
+            headers=auth_headers,
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['summary'] == {'total': 2, 'imported': 2, 'failed': 0}
+        response = client.get('/api/tasks', headers=auth_headers)
+        assert response.get_json()['pagination']['total'] == 4
+        titles = sorted(task['title'] for task in response.get_json()['tasks'])
+        assert titles == ['Com\nduas linhas', 'Com\nduas linhas', 'Pendente', 'Pendente']
+    
+    def test_import_tasks_line_too_long(self, app, client, auth_headers):
+        """Testa que uma linha NDJSON acima do limite é um erro dessa linha"""
+        app.config['TASK_IMPORT_MAX_LINE_LENGTH'] = 50
+        long_title = 'x' * 200
+        body = f'{{"title": "Antes"}}\n{{"title": "{long_title}"}}\r\n{{"title": "Depois"}}\n'
+        
+        response = client.post('/api/tasks/import', data=body, headers=auth_headers, content_type='application/x-ndjson')
+        
+        assert response.status_code == 200
+        json_data = response.get_json()
+        assert json_data['summary'] == {'total': 3, 'imported': 2, 'failed': 1}
+        assert json_data['errors'][0]['line'] == 2
+        assert 'demasiado longa' in json_data['errors'][0]['error']['message']
+    
+    def test_import_tasks_payload_too_large(self, app, client, auth_headers):
+        """Testa que pedidos acima de MAX_CONTENT_LENGTH recebem 413"""
+        app.config['MAX_CONTENT_LENGTH'] = 1024
+        body = '{"title": "Tarefa"}\n' * 100
+        
+        response = client.post('/api/tasks/import', data=body, headers=auth_headers, content_type='application/x-ndjson')
+        
+        assert response.status_code == 413
+        assert response.get_json()['error_code'] == 'PAYLOAD_TOO_LARGE'
+        response = client.get('/api/tasks', headers=auth_headers)
+        assert response.get_json()['pagination']['total'] == 0
+    
+    def test_import_tasks_csv_without_title_column(self, client, auth_headers):
+        """Testa CSV sem a coluna title"""
+        response = client.post('/api/tasks/import?format=csv', data='name\nx\n', headers=auth_headers)
+        
+        assert response.status_code == 400
+    
+    def test_import_tasks_invalid_format(self, client, auth_headers):
+        """Testa importação com tipo de ficheiro desconhecido"""
+        response = client.post('/api/tasks/import', data='x', headers=auth_headers, content_type='text/plain')
+        
+        assert response.status_code == 400
+    
+    def test_import_tasks_invalid_encoding(self, client, auth_headers):
+        """Testa ficheiro que não está em UTF-8"""
+        response = client.post(
+            '/api/tasks/import',
+            data='{"title": "Ação"}\n'.encode('latin-1'),
+            headers=auth_headers,
+            content_type='application/x-ndjson'
+        )
+        
+        assert response.status_code == 400
+        assert response.get_json()['details']['imported'] == 0
@@ -1,15 +1,37 @@
 """Testes para TaskService"""
 import pytest
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from unittest.mock import patch, MagicMock
+from sqlalchemy.dialects import postgresql
+from sqlalchemy import event, select, update
 from app.services.task_service import TaskService
-from app.schemas.task import TaskCreate, TaskUpdate
+from app.schemas.task import TaskCreate, TaskUpdate, TaskBulkOperation
 from app.exceptions.custom_exceptions import (
     ResourceNotFoundException,
     AuthorizationException,
-    DatabaseException
+    DatabaseException,
+    ValidationException
 )
 from app import db
 from app.models.task import Task
+from app.models.task_tombstone import TaskTombstone
+from app.services.task_counter_service import TaskCounterService
+
+@contextmanager
+def capture_statements():
+    """Regista os statements SQL executados no bloco"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    engine = db.engine
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
 
 @pytest.mark.unit
 @pytest.mark.tasks
@@ -32,6 +54,52 @@ class TestTaskService:
             assert len(result['tasks']) == 2
             assert all(task.user_id == test_user.id for task in result['tasks'])
     
+    def test_get_user_tasks_keyset(self, app, test_user):
+        """Testa paginação por cursor sem saltos nem repetições"""
+        with app.app_context():
+            tasks = [Task(title=f'Tarefa {i}', user_id=test_user.id) for i in range(5)]
+            db.session.add_all(tasks)
+            db.session.commit()
+            
+            first = TaskService.get_user_tasks_keyset(test_user, per_page=2)
+            assert len(first['tasks']) == 2
+            assert first['has_next'] is True
+            assert 'total' not in first
+            
+            seen = [task.id for task in first['tasks']]
+            cursor = first['next_cursor']
+            while cursor:
+                page = TaskService.get_user_tasks_keyset(test_user, cursor=cursor, per_page=2)
+                seen.extend(task.id for task in page['tasks'])
+                cursor = page['next_cursor']
+            
+            assert len(seen) == 5
+            assert len(set(seen)) == 5
+    
+    def test_get_user_tasks_keyset_with_total(self, app, test_user):
+        """Testa paginação por cursor com filtro e total pedido explicitamente"""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='Feita', completed=True, user_id=test_user.id),
+                Task(title='Pendente', completed=False, user_id=test_user.id)
+            ])
+            db.session.commit()
+            
+            result = TaskService.get_user_tasks_keyset(
+                test_user, status_filter='completed', include_total=True
+            )
+            
+            assert result['total'] == 1
+            assert result['has_next'] is False
+            assert result['next_cursor'] is None
+            assert result['tasks'][0].title == 'Feita'
+    
+    def test_get_user_tasks_keyset_invalid_cursor(self, app, test_user):
+        """Testa cursor inválido"""
+        with app.app_context():
+            with pytest.raises(ValidationException):
+                TaskService.get_user_tasks_keyset(test_user, cursor='nao-e-um-cursor')
+    
     def test_get_task_by_id_success(self, app, test_user, test_task):
         """Testa obtenção de tarefa específica"""
         with app.app_context():
@@ -147,6 +215,57 @@ class TestTaskService:
                 
                 assert 'Erro ao criar tarefa' in str(exc_info.value.message)
     
+    def test_update_task_statements(self, app, test_user, test_task):
+        """Testa que a atualização não carrega a tarefa antes nem depois"""
+        with app.app_context():
+            TaskCounterService.get_counts(test_user.id)
+            
+            with capture_statements() as statements:
+                updated_task = TaskService.update_task(
+                    test_task.id, TaskUpdate(title='Título novo'), test_user
+                )
+                result = Task.serialize(updated_task)
+            
+            # Versão dos contadores + UPDATE ... RETURNING da tarefa
+            assert [sql.split()[0] for sql in statements] == ['UPDATE', 'UPDATE']
+            assert 'task_counters' in statements[0]
+            assert 'RETURNING' in statements[1]
+            assert result['title'] == 'Título novo'
+            assert result['description'] == 'Descrição da tarefa de teste'
+    
+    def test_create_task_single_statement(self, app, test_user):
+        """Testa que a criação não faz SELECT após o commit"""
+        with app.app_context():
+            TaskService.create_task(TaskCreate(title='Aquecimento'), test_user)
+            
+            with capture_statements() as statements:
+                new_task = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+                result = Task.serialize(new_task)
+            
+            assert [sql.split()[0] for sql in statements] == ['UPDATE', 'INSERT']
+            assert result['id'] is not None
+            assert result['created_at'] is not None
+    
+    def test_update_task_with_task_in_session(self, app, test_user, test_task):
+        """Testa que a tarefa devolvida não vem desatualizada do identity map"""
+        with app.app_context():
+            loaded = db.session.get(Task, test_task.id)
+            assert loaded.completed is False
+            
+            updated_task = TaskService.update_task(
+                test_task.id, TaskUpdate(title='Dois', completed=True), test_user
+            )
+            
+            assert (updated_task.title, updated_task.completed) == ('Dois', True)
+            assert (loaded.title, loaded.completed) == ('Dois', True)
+            assert loaded in db.session
+    
+    def test_update_task_not_found(self, app, test_user):
+        """Testa atualização de tarefa inexistente"""
+        with app.app_context():
+            with pytest.raises(ResourceNotFoundException):
+                TaskService.update_task(99999, TaskUpdate(title='X'), test_user)
+    
     def test_update_task_description(self, app, test_user, test_task):
         """Testa atualização de descrição da tarefa"""
         with app.app_context():
@@ -175,4 +294,294 @@ class TestTaskService:
                     TaskService.delete_task(test_task.id, test_user)
                 
                 assert 'Erro ao eliminar tarefa' in str(exc_info.value.message)
-
+    
+    def test_bulk_operations_mixed(self, app, test_user, test_task):
+        """Testa lote com criação, atualização e eliminação"""
+        with app.app_context():
+            TaskCounterService.get_counts(test_user.id)
+            to_delete = Task(title='A eliminar', completed=True, user_id=test_user.id)
+            db.session.add(to_delete)
+            db.session.commit()
+            to_delete_id = to_delete.id
+            TaskCounterService.reconcile(test_user.id)
+            
+            results = TaskService.bulk_operations([
+                TaskBulkOperation(op='create', data={'title': 'Nova 1'}),
+                TaskBulkOperation(op='create', data={'title': 'Nova 2', 'completed': True}),
+                TaskBulkOperation(op='update', id=test_task.id, data={'completed': True}),
+                TaskBulkOperation(op='delete', id=to_delete_id)
+            ], test_user)
+            
+            assert [result['status'] for result in results] == [201, 201, 200, 200]
+            assert results[0]['task']['title'] == 'Nova 1'
+            assert results[1]['task']['completed'] is True
+            assert results[2]['task']['completed'] is True
+            assert db.session.get(Task, to_delete_id) is None
+            assert db.session.get(Task, test_task.id).completed is True
+            
+            counts = TaskCounterService.get_counts(test_user.id)
+            assert counts == {'total': 3, 'completed': 2, 'pending': 1}
+    
+    def test_bulk_operations_item_errors(self, app, test_user, another_user):
+        """Testa que operações inválidas não impedem as restantes"""
+        with app.app_context():
+            foreign = Task(title='Tarefa privada', user_id=another_user.id)
+            db.session.add(foreign)
+            db.session.commit()
+            
+            results = TaskService.bulk_operations([
+                TaskBulkOperation(op='create', data={'title': ''}),
+                TaskBulkOperation(op='update', id=foreign.id, data={'title': 'X'}),
+                TaskBulkOperation(op='delete', id=99999),
+                TaskBulkOperation(op='delete'),
+                TaskBulkOperation(op='create', data={'title': 'Válida'})
+            ], test_user)
+            
+            assert [result['status'] for result in results] == [400, 403, 404, 400, 201]
+            assert results[0]['error']['error_code'] == 'VALIDATION_ERROR'
+            assert results[1]['error']['error_code'] == 'UNAUTHORIZED_ACCESS'
+            assert db.session.get(Task, foreign.id).title == 'Tarefa privada'
+    
+    def test_bulk_operations_update_then_delete(self, app, test_user, test_task):
+        """Testa operações repetidas sobre a mesma tarefa"""
+        with app.app_context():
+            with patch('app.services.task_service.record_task_event') as record_event:
+                results = TaskService.bulk_operations([
+                    TaskBulkOperation(op='update', id=test_task.id, data={'title': 'Alterada'}),
+                    TaskBulkOperation(op='delete', id=test_task.id),
+                    TaskBulkOperation(op='delete', id=test_task.id)
+                ], test_user)
+            
+            assert [result['status'] for result in results] == [200, 200, 404]
+            assert results[0]['deleted_by'] == 1
+            assert 'task' not in results[0]
+            assert db.session.get(Task, test_task.id) is None
+            # Só o evento da eliminação: a tarefa atualizada já não existe
+            assert [call.args[1] for call in record_event.call_args_list] == ['deleted']
+    
+    def test_bulk_operations_locks_counters_before_reading(self, app, test_user, test_task):
+        """Testa que os contadores são bloqueados antes de ler as tarefas referenciadas"""
+        with app.app_context():
+            TaskCounterService.get_counts(test_user.id)
+            with capture_statements() as statements:
+                TaskService.bulk_operations(
+                    [TaskBulkOperation(op='update', id=test_task.id, data={'completed': True})],
+                    test_user
+                )
+            
+            assert [statement.split()[0] for statement in statements][:2] == ['UPDATE', 'SELECT']
+            assert 'task_counters' in statements[0]
+            assert TaskCounterService.get_counts(test_user.id)['completed'] == 1
+    
+    def test_bulk_operations_database_exception(self, app, test_user):
+        """Testa DatabaseException ao aplicar o lote"""
+        with app.app_context():
+            with patch('app.db.session.commit', side_effect=Exception("DB Error")):
+                with pytest.raises(DatabaseException):
+                    TaskService.bulk_operations(
+                        [TaskBulkOperation(op='create', data={'title': 'Nova'})],
+                        test_user
+                    )
+    
+    def test_get_changes_since(self, app, test_user, test_task):
+        """Testa alterações e eliminações desde um instante"""
+        with app.app_context():
+            full = TaskService.get_changes(test_user)
+            assert [Task.serialize(task)['id'] for task in full['tasks']] == [test_task.id]
+            assert full['deleted'] == []
+            since = full['next_since']
+            
+            assert TaskService.get_changes(test_user, since=since)['tasks'] == []
+            
+            other = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            TaskService.delete_task(test_task.id, test_user)
+            
+            changes = TaskService.get_changes(test_user, since=since)
+            assert [Task.serialize(task)['id'] for task in changes['tasks']] == [other.id]
+            assert [entry['id'] for entry in changes['deleted']] == [test_task.id]
+            assert changes['has_more'] is False
+            assert changes['next_since'] > since
+    
+    def test_get_changes_pages_keep_same_version_together(self, app, test_user):
+        """Testa que uma página não separa alterações com a mesma versão"""
+        with app.app_context():
+            db.session.add_all([
+                Task(title=f'Tarefa {i}', user_id=test_user.id, change_seq=seq)
+                for i, seq in enumerate([1, 2, 2, 3])
+            ])
+            db.session.commit()
+            
+            first = TaskService.get_changes(test_user, since=0, limit=2)
+            assert [Task.serialize(task)['title'] for task in first['tasks']] == ['Tarefa 0']
+            assert first['has_more'] is True
+            
+            second = TaskService.get_changes(test_user, since=first['next_since'], limit=1)
+            assert [Task.serialize(task)['title'] for task in second['tasks']] == ['Tarefa 1', 'Tarefa 2']
+            
+            third = TaskService.get_changes(test_user, since=second['next_since'], limit=2)
+            assert [Task.serialize(task)['title'] for task in third['tasks']] == ['Tarefa 3']
+            assert third['has_more'] is False
+            assert third['next_since'] == 3
+    
+    def test_writes_stamp_counter_version(self, app, test_user):
+        """Testa que cada escrita grava a versão dos contadores em change_seq"""
+        with app.app_context():
+            task = TaskService.create_task(TaskCreate(title='Nova'), test_user)
+            created_seq = db.session.get(Task, task.id).change_seq
+            assert created_seq == TaskCounterService.get_version(test_user.id)
+            
+            TaskService.update_task(task.id, TaskUpdate(completed=True), test_user)
+            db.session.expire_all()
+            updated_seq = db.session.get(Task, task.id).change_seq
+            assert updated_seq == TaskCounterService.get_version(test_user.id) > created_seq
+            
+            TaskService.delete_task(task.id, test_user)
+            tombstone = db.session.execute(select(TaskTombstone)).scalar_one()
+            assert tombstone.change_seq == TaskCounterService.get_version(test_user.id) > updated_seq
+    
+    def test_get_changes_since_before_purge(self, app, test_user, test_task):
+        """Testa since anterior a eliminações já removidas"""
+        with app.app_context():
+            since = TaskService.get_changes(test_user)['next_since']
+            TaskService.delete_task(test_task.id, test_user)
+            db.session.execute(update(TaskTombstone).values(deleted_at=datetime(2000, 1, 1)))
+            db.session.commit()
+            
+            assert TaskService.purge_tombstones(30) == 1
+            
+            with pytest.raises(ValidationException) as exc_info:
+                TaskService.get_changes(test_user, since=since)
+            assert exc_info.value.details['full_sync_required'] is True
+            
+            full = TaskService.get_changes(test_user)
+            assert full['tasks'] == []
+            assert TaskService.get_changes(test_user, since=full['next_since'])['deleted'] == []
+    
+    def test_iter_user_tasks(self, app, test_user, another_user):
+        """Testa a leitura de todas as tarefas em lotes"""
+        with app.app_context():
+            db.session.add_all(
+                [Task(title=f'Tarefa {i}', user_id=test_user.id, completed=i % 2 == 0) for i in range(5)]
+                + [Task(title='De outro', user_id=another_user.id)]
+            )
+            db.session.commit()
+            
+            batches = list(TaskService.iter_user_tasks(test_user, batch_size=2))
+            assert [len(batch) for batch in batches] == [2, 2, 1]
+            assert {row.title for batch in batches for row in batch} == {f'Tarefa {i}' for i in range(5)}
+            
+            completed = [row for batch in TaskService.iter_user_tasks(test_user, 'completed') for row in batch]
+            assert len(completed) == 3
+    
+    def test_import_tasks(self, app, test_user):
+        """Testa a importação em lotes, com erros por linha e contadores"""
+        with app.app_context():
+            TaskCounterService.get_counts(test_user.id)
+            records = [
+                (1, {'title': 'Tarefa 1', 'completed': True}, None),
+                (2, None, 'JSON inválido'),
+                (3, {'title': ''}, None),
+                (4, {'title': 'Tarefa 2'}, None),
+                (5, {'title': 'Tarefa 3', 'description': 'Descrição'}, None)
+            ]
+            
+            batch_sizes = []
+            insert_batch = TaskService._insert_import_batch
+            
+            def record_batch(rows, user):
+                batch_sizes.append(len(rows))
+                insert_batch(rows, user)
+            
+            with patch.object(TaskService, '_insert_import_batch', side_effect=record_batch):
+                result = TaskService.import_tasks(iter(records), test_user, batch_size=2, max_errors=1)
+            
+            assert batch_sizes == [2, 1]
+            assert (result['total'], result['imported'], result['failed']) == (5, 3, 2)
+            assert [error['line'] for error in result['errors']] == [2]
+            assert result['errors_truncated'] is True
+            assert TaskCounterService.get_counts(test_user.id) == {'total': 3, 'completed': 1, 'pending': 2}
+    
+    def test_import_tasks_read_error_keeps_previous_batches(self, app, test_user):
+        """Testa que um erro de leitura a meio mantém os lotes já importados"""
+        def records():
+            yield 1, {'title': 'Tarefa 1'}, None
+            yield 2, {'title': 'Tarefa 2'}, None
+            raise ValidationException(message="CSV mal formado")
+        
+        with app.app_context():
+            with pytest.raises(ValidationException) as exc_info:
+                TaskService.import_tasks(records(), test_user, batch_size=1)
+            
+            assert exc_info.value.details['imported'] == 2
+            assert Task.query.filter_by(user_id=test_user.id).count() == 2
+    
+    def test_purge_tombstones(self, app, test_user, test_task):
+        """Testa limpeza dos registos de tarefas eliminadas"""
+        with app.app_context():
+            TaskService.delete_task(test_task.id, test_user)
+            
+            assert TaskService.purge_tombstones(1) == 0
+            assert TaskService.purge_tombstones(-1) == 1
+    
+    def test_search_tasks(self, app, test_user, another_user):
+        """Testa pesquisa por prefixo, ordenada por relevância e paginada"""
+        with app.app_context():
+            db.session.add_all([
+                Task(title='Comprar pão', description='na padaria', user_id=test_user.id),
+                Task(title='Reunião', description='comprar café para a reunião', user_id=test_user.id),
+                Task(title='Ler livro', description=None, user_id=test_user.id),
+                Task(title='Comprar bilhetes', user_id=another_user.id)
+            ])
+            db.session.commit()
+            
+            first = TaskService.search_tasks(test_user, 'compr', per_page=1)
+            assert first['has_next'] is True
+            second = TaskService.search_tasks(test_user, 'compr', cursor=first['next_cursor'], per_page=1)
+            assert second['has_next'] is False
+            
+            titles = [task[1] for task in first['tasks'] + second['tasks']]
+            assert titles == ['Comprar pão', 'Reunião']
+            assert [task[1] for task in TaskService.search_tasks(test_user, 'reuniao cafe')['tasks']] == ['Reunião']
+    
+    def test_search_tasks_ties_across_pages(self, app, test_user):
+        """Testa que resultados com a mesma pontuação não se repetem nem se perdem entre páginas"""
+        with app.app_context():
+            db.session.add_all([Task(title='Comprar fruta', user_id=test_user.id) for _ in range(5)])
+            db.session.commit()
+            
+            ids, cursor = [], None
+            while True:
+                page = TaskService.search_tasks(test_user, 'comprar', cursor=cursor, per_page=2)
+                ids.extend(task[0] for task in page['tasks'])
+                cursor = page['next_cursor']
+                if not page['has_next']:
+                    break
+            
+            assert len(ids) == len(set(ids)) == 5
+    
+    def test_search_score_is_double_precision_on_postgresql(self, app, test_user):
+        """Testa que a pontuação do PostgreSQL (real) é convertida para double precision"""
+        with app.app_context():
+            bind = MagicMock()
+            bind.dialect.name = 'postgresql'
+            with patch.object(db.session, 'get_bind', return_value=bind):
+                statement = TaskService._search_statement(test_user, ['comprar'])
+            
+            sql = str(statement.compile(dialect=postgresql.dialect()))
+            assert 'CAST(ts_rank_cd(' in sql
+            assert 'AS DOUBLE PRECISION) AS score' in sql
+    
+    def test_search_tasks_follows_writes(self, app, test_user, test_task):
+        """Testa que o índice acompanha alterações e eliminações"""
+        with app.app_context():
+            TaskService.update_task(test_task.id, TaskUpdate(title='Enviar relatório'), test_user)
+            assert len(TaskService.search_tasks(test_user, 'relatorio')['tasks']) == 1
+            
+            TaskService.delete_task(test_task.id, test_user)
+            assert TaskService.search_tasks(test_user, 'relatorio')['tasks'] == []
+    
+    def test_search_tasks_without_terms(self, app, test_user):
+        """Testa pesquisa sem palavras"""
+        with app.app_context():
+            with pytest.raises(ValidationException):
+                TaskService.search_tasks(test_user, ' !? ')
@@ -0,0 +1,118 @@
+"""Testes para a cache de utilizadores autenticados"""
+import pytest
+from unittest.mock import patch
+from flask_jwt_extended import create_access_token
+from app import db
+from app.models.user import User
+from app.utils.user_cache import UserCache, CachedUser, get_user_cache
+from app.utils.decorators import get_current_user
+
+def make_user(user_id):
+    return CachedUser(id=user_id, username=f'user{user_id}', email=f'user{user_id}@example.com')
+
+@pytest.mark.unit
+@pytest.mark.decorators
+class TestUserCache:
+    """Testes para UserCache"""
+    
+    def test_get_and_set(self):
+        """Testa inserção e leitura"""
+        cache = UserCache(max_size=10, ttl=60)
+        cache.set(make_user(1))
+        
+        assert cache.get(1).username == 'user1'
+        assert cache.get(2) is None
+        assert cache.hits == 1
+        assert cache.misses == 1
+    
+    def test_lru_eviction(self):
+        """Testa remoção da entrada menos usada quando a cache está cheia"""
+        cache = UserCache(max_size=2, ttl=60)
+        cache.set(make_user(1))
+        cache.set(make_user(2))
+        cache.get(1)
+        cache.set(make_user(3))
+        
+        assert len(cache) == 2
+        assert cache.get(2) is None
+        assert cache.get(1) is not None
+        assert cache.get(3) is not None
+    
+    def test_ttl_expiry(self):
+        """Testa expiração das entradas"""
+        cache = UserCache(max_size=10, ttl=30)
+        with patch('app.utils.user_cache.time.monotonic', return_value=100.0):
+            cache.set(make_user(1))
+        with patch('app.utils.user_cache.time.monotonic', return_value=129.0):
+            assert cache.get(1) is not None
+        with patch('app.utils.user_cache.time.monotonic', return_value=130.0):
+            assert cache.get(1) is None
+        assert len(cache) == 0
+    
+    def test_invalidate(self):
+        """Testa invalidação explícita"""
+        cache = UserCache()
+        cache.set(make_user(1))
+        cache.invalidate(1)
+        
+        assert cache.get(1) is None
+    
+    def test_from_jwt_claims_missing(self):
+        """Testa claims incompletas"""
+        assert CachedUser.from_jwt_claims(1, {'sub': 1}) is None
+
+@pytest.mark.unit
+@pytest.mark.decorators
+class TestCurrentUserCache:
+    """Testes da cache no get_current_user"""
+    
+    def test_cache_hit_skips_database(self, app, test_user):
+        """Testa que o segundo pedido não consulta a base de dados"""
+        with app.app_context():
+            with patch('app.utils.decorators.get_jwt_identity', return_value=test_user.id):
+                first = get_current_user()
+                with patch('app.utils.decorators.db.session.get') as mock_get:
+                    second = get_current_user()
+                    mock_get.assert_not_called()
+            
+            assert isinstance(first, CachedUser)
+            assert second is first
+    
+    def test_cache_invalidated_on_user_update(self, app, test_user):
+        """Testa invalidação quando o utilizador é alterado"""
+        with app.app_context():
+            with patch('app.utils.decorators.get_jwt_identity', return_value=test_user.id):
+                get_current_user()
+                
+                user = db.session.get(User, test_user.id)
+                user.email = 'changed@example.com'
+                db.session.commit()
+                
+                assert get_user_cache().get(test_user.id) is None
+                assert get_current_user().email == 'changed@example.com'
+    
+    def test_trust_jwt_claims(self, app, client, test_user):
+        """Testa identidade a partir das claims sem consultar a base de dados"""
+        app.config['AUTH_TRUST_JWT_CLAIMS'] = True
+        with app.app_context():
+            token = create_access_token(
+                identity=test_user.id,
+                additional_claims={'username': 'testuser', 'email': 'test@example.com'}
+            )
+        
+        with patch('app.utils.decorators.db.session.get', wraps=db.session.get) as mock_get:
+            response = client.get('/api/tasks?cursor=', headers={'Authorization': f'Bearer {token}'})
+            assert all(call.args[0] is not User for call in mock_get.call_args_list)
+        
+        assert response.status_code == 200
+    
+    def test_login_token_contains_identity_claims(self, client, auth_headers, app):
+        """Testa que o token de login inclui as claims de identidade"""
+        from flask_jwt_extended import decode_token
+        token = auth_headers['Authorization'].split(' ')[1]
+        
+        with app.app_context():
+            claims = decode_token(token)
+        
+        assert claims['username'] == 'testuser'
+        assert claims['email'] == 'test@example.com'